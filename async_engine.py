@@ -0,0 +1,204 @@
+import os
+import time
+import asyncio
+from threading import Lock, Thread
+from tqdm import tqdm
+from http_utils import CHUNK_SIZE, get_max_connections
+from retry_policy import RetryPolicy
+from rate_limit import get_host_controller, get_rate_limiter
+from session_bridge import cookie_header
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+_engine = None
+_engine_lock = Lock()
+
+
+def engine_settings(config):
+    return (
+        config['timeout'],
+        config['retry_attempts'],
+        config.get('async_concurrency') or get_max_connections(config),
+        config.get('retry_delay', 2),
+        config.get('retry_max_delay', 60),
+        config.get('retry_budget_per_chapter'),
+        config.get('rate_limits'),
+        config.get('parallel_images', 1),
+        get_max_connections(config)
+    )
+
+
+def get_async_engine(config):
+    global _engine
+    with _engine_lock:
+        if _engine is not None and _engine.settings != engine_settings(config):
+            _engine.close()
+            _engine = None
+        if _engine is None:
+            _engine = AsyncDownloadEngine(config)
+        return _engine
+
+
+def use_async_engine(config):
+    return config.get('async_downloads', False) and AIOHTTP_AVAILABLE
+
+
+class AsyncDownloadEngine:
+    def __init__(self, config):
+        self.config = config
+        self.settings = engine_settings(config)
+        self.active = 0
+        self.closing = False
+        self.closed = False
+        self.state_lock = Lock()
+        self.concurrency = config.get('async_concurrency') or get_max_connections(config)
+        self.retry_policy = RetryPolicy.from_config(config)
+        self.rate_limiter = get_rate_limiter(config)
+        self.host_controller = get_host_controller(config)
+        self.loop = asyncio.new_event_loop()
+        self.session = None
+        self.semaphore = None
+        self.thread = Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._init_session(), self.loop).result()
+        print(f"[INFO] Motor asíncrono iniciado (concurrencia global: {self.concurrency})")
+
+    def close(self):
+        with self.state_lock:
+            self.closing = True
+            idle = self.active == 0 and not self.closed
+            self.closed = self.closed or idle
+        if idle:
+            self._shutdown()
+
+    def _shutdown(self):
+        async def close_session():
+            if self.session:
+                await self.session.close()
+            self.loop.stop()
+        asyncio.run_coroutine_threadsafe(close_session(), self.loop)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _init_session(self):
+        timeout = aiohttp.ClientTimeout(sock_connect=self.config['timeout'], sock_read=self.config['timeout'])
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def _acquire_host(self, url):
+        while True:
+            slot = self.host_controller.try_acquire(url)
+            if slot:
+                return slot
+            await asyncio.sleep(0.05)
+
+    async def _fetch(self, img_url, filepath, headers, cancel_check, retry_budget, cookies=None):
+        retry_attempts = self.config['retry_attempts']
+        part_path = filepath + '.part'
+        if cookies:
+            cookie = cookie_header(cookies, img_url)
+            if cookie:
+                headers = dict(headers, Cookie=cookie)
+
+        for attempt in range(retry_attempts):
+            if cancel_check and cancel_check():
+                return False, "Descarga cancelada"
+            try:
+                file_size = 0
+                delay = self.rate_limiter.reserve(img_url)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                async with self.semaphore:
+                    slot = await self._acquire_host(img_url)
+                    try:
+                        start = time.monotonic()
+                        async with self.session.get(img_url, headers=headers) as response:
+                            slot.status = response.status
+                            slot.latency = time.monotonic() - start
+                            response.raise_for_status()
+                            with open(part_path, 'wb') as f:
+                                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                                    if cancel_check and cancel_check():
+                                        raise InterruptedError("Descarga cancelada")
+                                    f.write(chunk)
+                                    file_size += len(chunk)
+                    except BaseException as e:
+                        if isinstance(e, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)):
+                            slot.error = ConnectionError(str(e))
+                        else:
+                            slot.error = e
+                        raise
+                    finally:
+                        self.host_controller.release(slot)
+
+                if file_size == 0:
+                    raise ValueError(f"Archivo vacío: {file_size} bytes")
+
+                os.replace(part_path, filepath)
+                return True, file_size
+            except Exception as e:
+                try:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                except OSError:
+                    pass
+                if not self.retry_policy.should_retry(e, attempt, retry_attempts, retry_budget):
+                    return False, str(e)
+                await asyncio.sleep(self.retry_policy.get_delay(attempt, e))
+
+        return False, "Max retries exceeded"
+
+    async def _download_one(self, img_index, img_url, filepath, headers, post_process, cancel_check, retry_budget, cookies):
+        success, result = await self._fetch(img_url, filepath, headers, cancel_check, retry_budget, cookies)
+        if success and post_process:
+            filepath = await self.loop.run_in_executor(None, post_process, filepath)
+        return img_index, img_url, filepath, success, result
+
+    async def _download_all(self, download_tasks, headers, post_process, cancel_check, desc, cookies):
+        retry_budget = self.retry_policy.new_budget()
+        coros = [self._download_one(img_index, img_url, filepath, headers, post_process, cancel_check, retry_budget, cookies)
+                 for img_index, img_url, filepath in download_tasks]
+        results = []
+        for coro in tqdm(asyncio.as_completed(coros), total=len(coros), desc=desc, leave=False, unit="img"):
+            results.append(await coro)
+        return results
+
+    def download_images(self, download_tasks, downloaded_files, total_found, skipped_files=0, headers=None, post_process=None, cancel_check=None, desc=None, cookies=None):
+        failed_downloads = []
+
+        if download_tasks:
+            with self.state_lock:
+                closed = self.closed
+                if not closed:
+                    self.active += 1
+            if closed:
+                return get_async_engine(self.config).download_images(download_tasks, downloaded_files, total_found, skipped_files, headers, post_process, cancel_check, desc, cookies)
+            try:
+                future = asyncio.run_coroutine_threadsafe(
+                    self._download_all(download_tasks, dict(headers or {}), post_process, cancel_check, desc, cookies),
+                    self.loop
+                )
+                results = future.result()
+            finally:
+                with self.state_lock:
+                    self.active -= 1
+                    idle = self.closing and self.active == 0 and not self.closed
+                    self.closed = self.closed or idle
+                if idle:
+                    self._shutdown()
+            for img_index, img_url, filepath, success, result in results:
+                if success:
+                    downloaded_files[img_index] = filepath
+                else:
+                    failed_downloads.append({'url': img_url, 'error': result, 'index': img_index, 'filepath': filepath})
+
+        total_downloaded = sum(1 for f in downloaded_files if f is not None)
+        return (downloaded_files, total_found, total_downloaded, failed_downloads, skipped_files)
@@ -0,0 +1,112 @@
+import io
+import os
+import sys
+import glob
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from manga_downloader import load_config, MangaDownloader
+from olympus_scan_downloader import OlympusScanDownloader
+from zonatmo_downloader import ZonaTMODownloader
+from mangatv_downloader import MangaTVDownloader
+
+BASE_URL = 'http://localhost/'
+PARSERS = {
+    'madara': MangaDownloader,
+    'olympus': OlympusScanDownloader,
+}
+LISTING_PARSERS = {
+    'zonatmo': ZonaTMODownloader,
+    'mangatv': MangaTVDownloader,
+}
+
+
+def measure(func, repeat):
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def measure_memory(func):
+    tracemalloc.start()
+    with redirect_stdout(io.StringIO()):
+        func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def listing_chapters(result):
+    if isinstance(result, tuple):
+        result = result[0]
+    return result or {}
+
+
+def benchmark_images(downloader, paths, repeat):
+    total_soup = total_fast = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            html_content = f.read()
+
+        soup_ms, soup_images = measure(lambda: downloader.extract_images_soup(html_content, BASE_URL), repeat)
+        fast_ms, fast_images = measure(lambda: downloader.extract_images_from_html(html_content, BASE_URL), repeat)
+        total_soup += soup_ms
+        total_fast += fast_ms
+
+        same = sorted(soup_images) == sorted(fast_images)
+        print(f"{os.path.basename(path)}: {len(html_content) / 1024:.0f} KB | BeautifulSoup {soup_ms:.1f} ms | lxml {fast_ms:.1f} ms | {len(fast_images)} imágenes{'' if same else ' [DIFERENCIAS]'}")
+
+    if total_fast:
+        print(f"[INFO] Total: BeautifulSoup {total_soup:.1f} ms, lxml {total_fast:.1f} ms ({total_soup / total_fast:.1f}x)")
+
+
+def benchmark_listing(downloader, paths, repeat):
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            html_content = f.read()
+
+        soup_ms, soup_result = measure(lambda: downloader.collect_chapters_soup(html_content), repeat)
+        stream_ms, stream_result = measure(lambda: downloader.collect_chapters_stream(html_content), repeat)
+        soup_mb = measure_memory(lambda: downloader.collect_chapters_soup(html_content))
+        stream_mb = measure_memory(lambda: downloader.collect_chapters_stream(html_content))
+
+        soup_chapters = listing_chapters(soup_result)
+        stream_chapters = listing_chapters(stream_result)
+        same = soup_chapters == stream_chapters
+        options = sum(len(opts) for opts in stream_chapters.values())
+        print(f"{os.path.basename(path)}: {len(html_content) / 1024:.0f} KB | {len(stream_chapters)} capítulos, {options} opciones{'' if same else ' [DIFERENCIAS]'}")
+        print(f"  BeautifulSoup {soup_ms:.1f} ms, pico {soup_mb:.1f} MB | streaming {stream_ms:.1f} ms, pico {stream_mb:.1f} MB")
+
+
+def main():
+    site = sys.argv[1] if len(sys.argv) > 1 else None
+    if site not in PARSERS and site not in LISTING_PARSERS:
+        print(f"Uso: python benchmark_parsing.py <{'|'.join(list(PARSERS) + list(LISTING_PARSERS))}> [archivo.html ...] [--repeat N]")
+        sys.exit(1)
+
+    args = sys.argv[2:]
+    repeat = 20
+    if '--repeat' in args:
+        index = args.index('--repeat')
+        repeat = int(args[index + 1])
+        del args[index:index + 2]
+
+    if not args:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        pattern = f'debug_html_{site}.html' if site in LISTING_PARSERS else '*.html'
+        args = sorted(glob.glob(os.path.join(script_dir, 'resources', 'debug', pattern)))
+    if not args:
+        print("[ERROR] No hay páginas guardadas para medir")
+        sys.exit(1)
+
+    config = dict(load_config(), fast_extract=True)
+    if site in LISTING_PARSERS:
+        benchmark_listing(LISTING_PARSERS[site](BASE_URL, config), args, repeat)
+    else:
+        benchmark_images(PARSERS[site](BASE_URL, config), args, repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,841 @@
+import os
+import atexit
+import json
+import shutil
+import time
+from threading import Condition, Lock, RLock
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    SELENIUM_AVAILABLE = True
+except ImportError:
+    SELENIUM_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+USER_AGENT_FULL = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+BLOCKED_URLS = [
+    '*googlesyndication.com*',
+    '*doubleclick.net*',
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*adservice.google.*',
+    '*facebook.net*',
+    '*hotjar.com*',
+    '*disqus.com*',
+    '*.woff*',
+    '*.ttf*',
+    '*.otf*',
+    '*.mp4*',
+    '*.webm*'
+]
+
+SITE_BLOCKED_URLS = {
+    'zonatmo': ['*popads.net*', '*propellerads.com*', '*onclickads.net*'],
+    'mangatv': ['*histats.com*']
+}
+
+IMAGE_URL_PATTERNS = ['*.jpg*', '*.jpeg*', '*.png*', '*.webp*', '*.gif*', '*.avif*']
+
+PROFILES = {
+    'pages': {'images': False, 'disable_cache': True, 'user_agent': USER_AGENT},
+    'reader': {'images': True, 'disable_cache': False, 'user_agent': USER_AGENT_FULL}
+}
+
+
+def build_chrome_options(images=False, disable_cache=True, user_agent=USER_AGENT, page_load_strategy=None, user_data_dir=None, cache_mb=200):
+    options = Options()
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    if user_data_dir:
+        options.add_argument(f'--user-data-dir={user_data_dir}')
+        options.add_argument(f'--disk-cache-size={cache_mb * 1024 * 1024}')
+    elif disable_cache:
+        options.add_argument('--disable-cache')
+        options.add_argument('--disable-application-cache')
+        options.add_argument('--disable-offline-load-stale-cache')
+        options.add_argument('--disk-cache-size=0')
+        options.add_argument('--media-cache-size=0')
+    options.add_argument(f'user-agent={user_agent}')
+    if not images:
+        prefs = {
+            "profile.default_content_setting_values": {
+                "images": 2
+            },
+            "profile.managed_default_content_settings": {
+                "images": 2
+            }
+        }
+        options.add_experimental_option("prefs", prefs)
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+def get_blocked_urls(config, site, block_images=False):
+    patterns = []
+    if config.get('selenium_block_requests', True):
+        patterns.extend(BLOCKED_URLS)
+        patterns.extend(SITE_BLOCKED_URLS.get(site, []))
+        patterns.extend(config.get('blocked_urls', {}).get(site, []))
+    if block_images:
+        patterns.extend(IMAGE_URL_PATTERNS)
+    return patterns
+
+
+def block_requests(driver, config, site, block_images=False):
+    patterns = get_blocked_urls(config, site, block_images)
+    if not patterns:
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    except Exception as e:
+        print(f"[ADVERTENCIA] No se pudo aplicar el bloqueo de peticiones: {e}")
+
+
+class BrowserBudget:
+    def __init__(self, max_browsers=4, max_rss_mb=0, timeout=600):
+        self.max_browsers = max(1, max_browsers)
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.timeout = timeout
+        self.active = {}
+        self.next_token = 0
+        self.reclaimers = []
+        self.condition = Condition()
+
+    def measure_rss(self):
+        if not PSUTIL_AVAILABLE:
+            return None
+        try:
+            children = psutil.Process().children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for child in children:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    def _admissible(self):
+        count = len(self.active)
+        if count >= self.max_browsers:
+            return False
+        if not self.max_rss or count == 0:
+            return True
+        rss = self.measure_rss()
+        if rss is None:
+            return True
+        return rss + rss / count <= self.max_rss
+
+    def _reclaim(self):
+        for reclaim in list(self.reclaimers):
+            try:
+                if reclaim():
+                    return True
+            except Exception:
+                continue
+        return False
+
+    def _describe(self):
+        rss = self.measure_rss()
+        memory = f", RSS {rss / (1024 * 1024):.0f} MB" if rss is not None else ""
+        return f"{len(self.active)}/{self.max_browsers} activos{memory}"
+
+    def acquire(self, owner):
+        start = time.monotonic()
+        while True:
+            with self.condition:
+                if self._admissible():
+                    self.next_token += 1
+                    token = self.next_token
+                    self.active[token] = owner
+                    break
+                if self.timeout and time.monotonic() - start >= self.timeout:
+                    raise RuntimeError(f"Sin presupuesto de navegadores para {owner} tras {self.timeout}s")
+            if not self._reclaim():
+                with self.condition:
+                    self.condition.wait(1)
+        print(f"[NAVEGADOR] Abierto para {owner} tras esperar {time.monotonic() - start:.1f}s ({self._describe()})")
+        return token
+
+    def release(self, token):
+        with self.condition:
+            owner = self.active.pop(token, None)
+            self.condition.notify_all()
+        if owner is not None:
+            print(f"[NAVEGADOR] Cerrado de {owner} ({self._describe()})")
+
+
+_budget = None
+_budget_lock = Lock()
+
+
+def get_browser_budget(config):
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            max_rss_mb = config.get('browser_budget_rss_mb', 0)
+            if not max_rss_mb and PSUTIL_AVAILABLE:
+                max_rss_mb = int(psutil.virtual_memory().total * 0.6 / (1024 * 1024))
+            _budget = BrowserBudget(
+                max_browsers=config.get('browser_budget_max', 4),
+                max_rss_mb=max_rss_mb,
+                timeout=config.get('browser_budget_timeout', 600)
+            )
+        return _budget
+
+
+def launch_chrome(options, owner, budget):
+    token = budget.acquire(owner)
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception:
+        budget.release(token)
+        raise
+    quit_driver = driver.quit
+    released = []
+
+    def quit():
+        if released:
+            return
+        released.append(True)
+        try:
+            quit_driver()
+        finally:
+            budget.release(token)
+    driver.quit = quit
+    return driver
+
+
+DOM_IMAGE_SOURCES_JS = """
+    return Array.from(document.images).map(function(img) {
+        return img.currentSrc || img.src || img.getAttribute('data-src') || '';
+    });
+"""
+
+
+def expand_viewport(driver, height=20000):
+    try:
+        driver.execute_cdp_cmd('Emulation.setDeviceMetricsOverride', {'width': 1280, 'height': height, 'deviceScaleFactor': 1, 'mobile': False})
+    except Exception as e:
+        print(f"[ADVERTENCIA] No se pudo ampliar la ventana del navegador: {e}")
+
+
+def order_by_dom(driver, urls):
+    try:
+        sources = driver.execute_script(DOM_IMAGE_SOURCES_JS) or []
+    except Exception:
+        return urls
+    positions = {}
+    for index, src in enumerate(sources):
+        positions.setdefault(src, index)
+    return sorted(urls, key=lambda url: positions.get(url, len(sources)))
+
+
+SCROLL_STEP_JS = """
+    window.scrollBy(0, window.innerHeight);
+    return window.innerHeight + window.scrollY >= document.body.scrollHeight;
+"""
+
+
+def harvest_until_complete(driver, recorder, wait, collect, reader_selector, timeout, max_rounds=20):
+    urls = []
+    expected = 0
+    for _ in range(max_rounds):
+        wait.network_quiet(recorder, timeout=timeout, stage='red_imagenes')
+        previous = len(urls)
+        urls = collect()
+        expected = wait.count(reader_selector)
+        if urls and expected and len(urls) >= expected:
+            return order_by_dom(driver, urls)
+        at_bottom = driver.execute_script(SCROLL_STEP_JS)
+        if at_bottom and len(urls) == previous:
+            if urls and not expected:
+                return order_by_dom(driver, urls)
+            break
+    if urls:
+        print(f"[ADVERTENCIA] Registro de red incompleto ({len(urls)}/{expected} imágenes), usando el DOM")
+    return []
+
+
+SITE_STORAGE_TYPES = 'local_storage,indexeddb,websql,service_workers,cache_storage'
+
+
+def clear_site_state(driver, keep_cookies=False):
+    try:
+        origin = driver.execute_script("return window.location.origin;")
+    except Exception:
+        origin = None
+    driver.get('about:blank')
+    if keep_cookies:
+        return
+    driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+    if origin and origin.startswith('http'):
+        driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': SITE_STORAGE_TYPES})
+
+
+class NetworkRecorder:
+    def __init__(self, driver):
+        self.driver = driver
+        self.requests = {}
+        self.order = []
+        self.pending = set()
+        self.last_activity = time.monotonic()
+        try:
+            driver.get_log('performance')
+        except Exception:
+            pass
+
+    def _handle(self, method, params):
+        request_id = params.get('requestId')
+        request = self.requests.get(request_id)
+        if method == 'Network.requestWillBeSent':
+            if request is None:
+                self.order.append(request_id)
+            self.requests[request_id] = {'url': params['request']['url'], 'type': params.get('type'), 'status': None, 'mime': None, 'size': 0, 'failed': False}
+            if params.get('type') == 'Image':
+                self.pending.add(request_id)
+        elif method == 'Network.responseReceived' and request:
+            response = params.get('response', {})
+            request['status'] = response.get('status')
+            request['mime'] = response.get('mimeType')
+        elif method == 'Network.loadingFinished' and request:
+            request['size'] = int(params.get('encodedDataLength', 0))
+            self.pending.discard(request_id)
+        elif method == 'Network.loadingFailed' and request:
+            request['failed'] = True
+            self.pending.discard(request_id)
+        else:
+            return
+        self.last_activity = time.monotonic()
+
+    def poll(self):
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            return 0
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+                self._handle(message.get('method'), message.get('params', {}))
+            except (ValueError, KeyError):
+                continue
+        return len(entries)
+
+    def is_quiet(self, idle_ms):
+        self.poll()
+        return not self.pending and (time.monotonic() - self.last_activity) * 1000 >= idle_ms
+
+    def image_urls(self):
+        self.poll()
+        urls = []
+        for request_id in self.order:
+            request = self.requests[request_id]
+            if request['type'] == 'Image' and request['url'].startswith('http') and request['url'] not in urls:
+                urls.append(request['url'])
+        return urls
+
+    def image_responses(self, min_size=0):
+        self.poll()
+        images = []
+        seen = set()
+        for request_id in self.order:
+            request = self.requests[request_id]
+            if request['type'] != 'Image' or request['status'] != 200 or request['failed']:
+                continue
+            if request['size'] < min_size or request['url'] in seen or not request['url'].startswith('http'):
+                continue
+            seen.add(request['url'])
+            images.append({'url': request['url'], 'mime': request['mime'], 'size': request['size']})
+        return images
+
+
+def get_profile_root(config):
+    path = config.get('browser_profile_dir')
+    if not path:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        path = os.path.join(script_dir, 'resources', 'cache', 'chrome_profiles')
+    return path
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+def purge_browser_profiles(config, site=None):
+    root = get_profile_root(config)
+    target = os.path.join(root, site) if site else root
+    size = directory_size(target)
+    shutil.rmtree(target, ignore_errors=True)
+    return size
+
+
+class PooledDriver:
+    def __init__(self, driver, slot=None):
+        self.driver = driver
+        self.slot = slot
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    def __init__(self, name, profile, max_size=2, max_uses=50, budget=None, profile_dir=None, cache_mb=200):
+        self.name = name
+        self.profile = profile
+        self.budget = budget or BrowserBudget(max_browsers=max_size)
+        self.profile_dir = profile_dir
+        self.cache_mb = cache_mb
+        self.slots = set()
+        self.max_size = max(1, max_size)
+        self.max_uses = max(1, max_uses)
+        self.idle = []
+        self.leased = {}
+        self.size = 0
+        self.condition = Condition()
+        self.closed = False
+
+    def _create_driver(self):
+        slot = None
+        user_data_dir = None
+        if self.profile_dir:
+            with self.condition:
+                slot = 0
+                while slot in self.slots:
+                    slot += 1
+                self.slots.add(slot)
+            user_data_dir = os.path.join(self.profile_dir, str(slot))
+        options = build_chrome_options(
+            images=self.profile.get('images', False),
+            disable_cache=self.profile.get('disable_cache', True),
+            user_agent=self.profile.get('user_agent', USER_AGENT),
+            user_data_dir=user_data_dir,
+            cache_mb=self.cache_mb
+        )
+        try:
+            driver = launch_chrome(options, f"pool '{self.name}'", self.budget)
+        except Exception:
+            with self.condition:
+                self.slots.discard(slot)
+            raise
+        if self.profile.get('disable_cache', True) and not user_data_dir:
+            try:
+                driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': True})
+            except Exception:
+                pass
+        print(f"[INFO] Navegador creado para pool '{self.name}' ({self.size}/{self.max_size})")
+        return PooledDriver(driver, slot)
+
+    def _is_alive(self, pooled):
+        try:
+            pooled.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+        with self.condition:
+            self.slots.discard(pooled.slot)
+
+    def _reset(self, pooled):
+        driver = pooled.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        clear_site_state(driver, keep_cookies=bool(self.profile_dir))
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+        driver.execute_cdp_cmd('Emulation.clearDeviceMetricsOverride', {})
+        driver.get_log('performance')
+
+    def acquire(self):
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise RuntimeError(f"Pool de navegadores '{self.name}' cerrado")
+                while self.idle:
+                    pooled = self.idle.pop()
+                    if self._is_alive(pooled):
+                        pooled.uses += 1
+                        self.leased[id(pooled.driver)] = pooled
+                        return pooled.driver
+                    self._quit(pooled)
+                    self.size -= 1
+                if self.size < self.max_size:
+                    self.size += 1
+                    break
+                self.condition.wait()
+
+        try:
+            pooled = self._create_driver()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+        pooled.uses += 1
+        with self.condition:
+            self.leased[id(pooled.driver)] = pooled
+        return pooled.driver
+
+    def release(self, driver, broken=False):
+        if driver is None:
+            return
+        with self.condition:
+            pooled = self.leased.pop(id(driver), None)
+        if pooled is None:
+            return
+
+        recycle = broken or self.closed or pooled.uses >= self.max_uses
+        if not recycle:
+            try:
+                self._reset(pooled)
+            except Exception:
+                recycle = True
+
+        with self.condition:
+            if recycle:
+                self.size -= 1
+            else:
+                self.idle.append(pooled)
+            self.condition.notify()
+
+        if recycle:
+            self._quit(pooled)
+            if not broken:
+                print(f"[INFO] Navegador del pool '{self.name}' reciclado tras {pooled.uses} páginas")
+
+    def shed_idle(self):
+        with self.condition:
+            if not self.idle:
+                return False
+            pooled = self.idle.pop(0)
+            self.size -= 1
+            self.condition.notify()
+        self._quit(pooled)
+        return True
+
+    def shutdown(self):
+        with self.condition:
+            self.closed = True
+            idle = self.idle
+            leased = list(self.leased.values())
+            self.idle = []
+            self.leased = {}
+            self.size = 0
+            self.condition.notify_all()
+        for pooled in idle + leased:
+            self._quit(pooled)
+
+
+class TabDriver:
+    def __init__(self, pool, handle, target_id):
+        self.pool = pool
+        self.handle = handle
+        self.target_id = target_id
+        self.uses = 0
+        self.log = []
+
+    def _call(self, action):
+        with self.pool.lock:
+            driver = self.pool.driver
+            if self.pool.current != self.handle:
+                driver.switch_to.window(self.handle)
+                self.pool.current = self.handle
+            return action(driver)
+
+    def get(self, url):
+        self._call(lambda driver: driver.get(url))
+        if url == 'about:blank':
+            return
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and self.current_url == 'about:blank':
+            time.sleep(0.05)
+
+    def execute_script(self, script, *args):
+        return self._call(lambda driver: driver.execute_script(script, *args))
+
+    def execute_cdp_cmd(self, cmd, params):
+        return self._call(lambda driver: driver.execute_cdp_cmd(cmd, params))
+
+    def get_cookies(self):
+        return self._call(lambda driver: driver.get_cookies())
+
+    def get_log(self, log_type):
+        if log_type != 'performance':
+            return self._call(lambda driver: driver.get_log(log_type))
+        self.pool.dispatch_log()
+        with self.pool.lock:
+            entries, self.log = self.log, []
+        return entries
+
+    @property
+    def page_source(self):
+        return self._call(lambda driver: driver.page_source)
+
+    @property
+    def current_url(self):
+        return self._call(lambda driver: driver.current_url)
+
+    @property
+    def title(self):
+        return self._call(lambda driver: driver.title)
+
+
+class TabPool:
+    def __init__(self, name, profile, max_tabs=4, max_uses=50, budget=None, profile_dir=None, cache_mb=200):
+        self.name = name
+        self.profile = profile
+        self.budget = budget or BrowserBudget(max_browsers=1)
+        self.profile_dir = profile_dir
+        self.cache_mb = cache_mb
+        self.max_tabs = max(1, max_tabs)
+        self.max_uses = max(1, max_uses)
+        self.driver = None
+        self.anchor = None
+        self.current = None
+        self.tabs = {}
+        self.lock = RLock()
+        self.idle = []
+        self.leased = {}
+        self.size = 0
+        self.condition = Condition()
+        self.closed = False
+
+    def _start_browser(self):
+        options = build_chrome_options(
+            images=self.profile.get('images', False),
+            disable_cache=self.profile.get('disable_cache', True),
+            user_agent=self.profile.get('user_agent', USER_AGENT),
+            page_load_strategy='none',
+            user_data_dir=os.path.join(self.profile_dir, '0') if self.profile_dir else None,
+            cache_mb=self.cache_mb
+        )
+        self.driver = launch_chrome(options, f"pool '{self.name}' (pestañas)", self.budget)
+        self.anchor = self.current = self.driver.current_window_handle
+        self.tabs = {}
+        print(f"[INFO] Navegador compartido creado para pool '{self.name}' (hasta {self.max_tabs} pestañas)")
+
+    def _browser_alive(self):
+        try:
+            self.driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def _open_tab(self):
+        with self.lock:
+            if self.driver is not None and not self._browser_alive():
+                print(f"[ADVERTENCIA] El navegador compartido del pool '{self.name}' dejó de responder, se reinicia")
+                self._quit_browser()
+            if self.driver is None:
+                self._start_browser()
+            target_id = self.driver.execute_cdp_cmd('Target.createTarget', {'url': 'about:blank'})['targetId']
+            handle = next((h for h in self.driver.window_handles if h.replace('CDwindow-', '') == target_id), target_id)
+            tab = TabDriver(self, handle, target_id)
+            self.tabs[target_id] = tab
+        if self.profile.get('disable_cache', True) and not self.profile_dir:
+            try:
+                tab.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': True})
+            except Exception:
+                pass
+        return tab
+
+    def _close_tab(self, tab):
+        with self.lock:
+            self.tabs.pop(tab.target_id, None)
+            if self.driver is None:
+                return
+            try:
+                self.driver.execute_cdp_cmd('Target.closeTarget', {'targetId': tab.target_id})
+            except Exception:
+                pass
+            if self.current == tab.handle:
+                try:
+                    self.driver.switch_to.window(self.anchor)
+                    self.current = self.anchor
+                except Exception:
+                    self.current = None
+
+    def _quit_browser(self):
+        with self.lock:
+            driver, self.driver = self.driver, None
+            self.tabs = {}
+            self.current = self.anchor = None
+        if driver:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def _reset(self, tab):
+        with self.condition:
+            shared = bool(self.leased)
+        clear_site_state(tab, keep_cookies=bool(self.profile_dir) or shared)
+        tab.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+        tab.execute_cdp_cmd('Emulation.clearDeviceMetricsOverride', {})
+        tab.get_log('performance')
+
+    def dispatch_log(self):
+        with self.lock:
+            try:
+                entries = self.driver.get_log('performance')
+            except Exception:
+                return
+            for entry in entries:
+                try:
+                    webview = json.loads(entry['message']).get('webview', '')
+                except (ValueError, KeyError):
+                    continue
+                tab = self.tabs.get(webview.replace('CDwindow-', ''))
+                if tab:
+                    tab.log.append(entry)
+
+    def acquire(self):
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise RuntimeError(f"Pool de navegadores '{self.name}' cerrado")
+                while self.idle:
+                    tab = self.idle.pop()
+                    if tab.target_id in self.tabs:
+                        tab.uses += 1
+                        self.leased[id(tab)] = tab
+                        return tab
+                    self.size -= 1
+                if self.size < self.max_tabs:
+                    self.size += 1
+                    break
+                self.condition.wait()
+
+        try:
+            tab = self._open_tab()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+        tab.uses += 1
+        with self.condition:
+            self.leased[id(tab)] = tab
+        return tab
+
+    def release(self, tab, broken=False):
+        if tab is None:
+            return
+        with self.condition:
+            tab = self.leased.pop(id(tab), None)
+        if tab is None:
+            return
+
+        recycle = broken or self.closed or tab.uses >= self.max_uses
+        if not recycle:
+            try:
+                self._reset(tab)
+            except Exception:
+                recycle = True
+        if recycle:
+            self._close_tab(tab)
+
+        with self.condition:
+            if recycle:
+                self.size -= 1
+            else:
+                self.idle.append(tab)
+            self.condition.notify()
+
+    def shed_idle(self):
+        with self.condition:
+            if self.leased or self.driver is None:
+                return False
+            self.idle = []
+            self.size = 0
+            self.condition.notify_all()
+        self._quit_browser()
+        return True
+
+    def shutdown(self):
+        with self.condition:
+            self.closed = True
+            self.idle = []
+            self.leased = {}
+            self.size = 0
+            self.condition.notify_all()
+        self._quit_browser()
+
+
+_pools = {}
+_pools_lock = Lock()
+
+
+def get_driver_pool(config, profile_name='pages', site=None):
+    persistent = bool(site and config.get('browser_profiles', False))
+    key = (profile_name, site if persistent else None)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            default_size = min(config.get('parallel_tomos', 1) * config.get('parallel_chapters', 1), 4)
+            budget = get_browser_budget(config)
+            name = f"{profile_name}:{site}" if persistent else profile_name
+            profile_dir = os.path.join(get_profile_root(config), site, profile_name) if persistent else None
+            cache_mb = config.get('browser_profile_cache_mb', 200)
+            if profile_name == 'reader' and config.get('browser_tabs', 0):
+                pool = TabPool(
+                    name,
+                    PROFILES[profile_name],
+                    max_tabs=config['browser_tabs'],
+                    max_uses=config.get('browser_max_pages', 50),
+                    budget=budget,
+                    profile_dir=profile_dir,
+                    cache_mb=cache_mb
+                )
+            else:
+                pool = DriverPool(
+                    name,
+                    PROFILES[profile_name],
+                    max_size=config.get('browser_pool_size') or default_size,
+                    max_uses=config.get('browser_max_pages', 50),
+                    budget=budget,
+                    profile_dir=profile_dir,
+                    cache_mb=cache_mb
+                )
+            budget.reclaimers.append(pool.shed_idle)
+            _pools[key] = pool
+        return pool
+
+
+def shutdown_driver_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+atexit.register(shutdown_driver_pools)
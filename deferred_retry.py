@@ -0,0 +1,70 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.webp', '.gif']
+
+
+class DeferredRetryPool:
+    def __init__(self):
+        self.items = []
+        self.lock = Lock()
+
+    def add(self, chapter_name, chapter_dir, failed, referer_url=None):
+        with self.lock:
+            self.items.append({
+                'chapter_name': chapter_name,
+                'chapter_dir': chapter_dir,
+                'url': failed['url'],
+                'index': failed['index'],
+                'filepath': failed.get('filepath'),
+                'referer_url': referer_url,
+                'error': failed.get('error')
+            })
+
+    def __len__(self):
+        with self.lock:
+            return len(self.items)
+
+    def get_target_path(self, item):
+        source = item.get('filepath') or item['url'].split('?')[0]
+        file_ext = os.path.splitext(source)[1].lower()
+        if file_ext not in IMAGE_EXTENSIONS:
+            file_ext = '.jpg'
+        return os.path.join(item['chapter_dir'], f"{item['index'] + 1:03d}{file_ext}")
+
+    def drain(self, retry_func, max_workers=4, rounds=1, cancel_check=None):
+        recovered = {}
+        for _ in range(rounds):
+            with self.lock:
+                pending = self.items
+                self.items = []
+            if not pending:
+                break
+
+            print(f"[INFO] Reintentando {len(pending)} imágenes fallidas del volumen")
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+                futures = {executor.submit(retry_func, item, self.get_target_path(item)): item for item in pending}
+                for future in as_completed(futures):
+                    item = futures[future]
+                    try:
+                        success = future.result()
+                    except Exception as e:
+                        item['error'] = str(e)
+                        success = False
+                    if success:
+                        recovered[item['chapter_name']] = recovered.get(item['chapter_name'], 0) + 1
+                    else:
+                        with self.lock:
+                            self.items.append(item)
+
+            if cancel_check and cancel_check():
+                break
+
+        if recovered:
+            print(f"[OK] Recuperadas {sum(recovered.values())} imágenes en reintentos diferidos")
+        return recovered
+
+    def get_failed(self):
+        with self.lock:
+            return list(self.items)
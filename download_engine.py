@@ -0,0 +1,477 @@
+import os
+import re
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from threading import Lock
+from urllib.parse import urlparse
+from tqdm import tqdm
+from http_utils import stream_to_file, get_max_connections
+from rate_limit import get_host_controller, get_rate_limiter
+from retry_policy import RetryPolicy
+from async_engine import use_async_engine, get_async_engine
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.webp', '.gif']
+SEQUENCE_NAME = re.compile(r'^\d{3}$')
+MANIFEST_NAME = 'manifest.json'
+
+
+_engine = None
+_engine_lock = Lock()
+
+
+def engine_settings(config):
+    return (
+        config.get('engine_workers') or get_max_connections(config),
+        config.get('parallel_images', 1),
+        config.get('parallel_chapters', 1),
+        config['timeout'],
+        config['retry_attempts'],
+        config.get('retry_failed_images', 2),
+        config.get('retry_delay', 2),
+        config.get('retry_max_delay', 60),
+        config.get('retry_budget_per_chapter'),
+        config.get('delay_between_images', 0),
+        config.get('rate_limits'),
+        config.get('async_downloads', False),
+        config.get('async_concurrency'),
+        config.get('force_redownload', False)
+    )
+
+
+def get_download_engine(config):
+    global _engine
+    with _engine_lock:
+        if _engine is not None and _engine.settings != engine_settings(config):
+            _engine.close()
+            _engine = None
+        if _engine is None:
+            _engine = DownloadEngine(config)
+        return _engine
+
+
+def chapter_plan(name, directory, images, referer=None, convert_webp=False, source_url=None):
+    return {
+        'name': name,
+        'dir': directory,
+        'images': images,
+        'referer': referer,
+        'convert_webp': convert_webp,
+        'source_url': source_url
+    }
+
+
+def image_extension(img_url):
+    ext = os.path.splitext(urlparse(img_url).path)[1].lower()
+    return ext if ext in IMAGE_EXTENSIONS else '.jpg'
+
+
+def is_webp(filepath):
+    try:
+        with open(filepath, 'rb') as f:
+            header = f.read(12)
+        return header[:4] == b'RIFF' and header[8:12] == b'WEBP'
+    except OSError:
+        return False
+
+
+def convert_webp_to_jpg(webp_path, jpg_path, quality=95):
+    try:
+        if not PIL_AVAILABLE:
+            return False
+
+        img = Image.open(webp_path)
+
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        img.save(jpg_path, 'JPEG', quality=quality, optimize=True)
+        return True
+    except Exception as e:
+        print(f"[ERROR] Error al convertir WebP a JPG: {e}")
+        return False
+
+
+def convert_image(filepath):
+    if not PIL_AVAILABLE or not is_webp(filepath):
+        return filepath
+    jpg_filepath = os.path.splitext(filepath)[0] + '.jpg'
+    if jpg_filepath == filepath:
+        temp_filepath = filepath + '.webp'
+        os.replace(filepath, temp_filepath)
+        filepath = temp_filepath
+    if convert_webp_to_jpg(filepath, jpg_filepath):
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+        return jpg_filepath
+    return filepath
+
+
+def sequence_files(chapter_dir):
+    files = {}
+    for file in os.listdir(chapter_dir):
+        stem, ext = os.path.splitext(file)
+        file_path = os.path.join(chapter_dir, file)
+        if SEQUENCE_NAME.match(stem) and ext.lower() in IMAGE_EXTENSIONS and os.path.getsize(file_path) > 0:
+            files[stem] = file_path
+    return files
+
+
+def file_digest(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(chapter_dir):
+    try:
+        with open(os.path.join(chapter_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(chapter_dir, source_url, images, previous=None):
+    existing = sequence_files(chapter_dir)
+    known = {record['name']: record for record in (previous or {}).get('files', []) if record}
+    files = []
+    for index in range(len(images)):
+        file_path = existing.get(f"{index + 1:03d}")
+        if file_path is None:
+            files.append(None)
+            continue
+        name = os.path.basename(file_path)
+        size = os.path.getsize(file_path)
+        record = known.get(name)
+        if not record or record.get('size') != size:
+            record = {'name': name, 'size': size, 'sha256': file_digest(file_path)}
+        files.append(record)
+
+    manifest = {
+        'source_url': source_url,
+        'expected': len(images),
+        'images': list(images),
+        'files': files,
+        'complete': all(files)
+    }
+    manifest_path = os.path.join(chapter_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path + '.part', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(manifest_path + '.part', manifest_path)
+    except OSError as e:
+        print(f"[ADVERTENCIA] No se pudo guardar el manifiesto de {chapter_dir}: {e}")
+    return manifest
+
+
+def refresh_manifest(chapter_dir):
+    manifest = read_manifest(chapter_dir)
+    if manifest and manifest.get('images'):
+        write_manifest(chapter_dir, manifest.get('source_url'), manifest['images'], manifest)
+
+
+def manifest_status(chapter_dir, source_url=None):
+    manifest = read_manifest(chapter_dir)
+    if not manifest or not manifest.get('expected'):
+        return None
+    if source_url and manifest.get('source_url') and manifest['source_url'] != source_url:
+        return None
+
+    existing = sequence_files(chapter_dir)
+    files = manifest.get('files') or []
+    for index in range(manifest['expected']):
+        file_path = existing.get(f"{index + 1:03d}")
+        if file_path is None:
+            return False
+        record = files[index] if index < len(files) else None
+        if record and record.get('name') == os.path.basename(file_path) and record.get('size') != os.path.getsize(file_path):
+            return False
+    return True
+
+
+def chapter_stat(name, result):
+    if len(result) == 5:
+        images, total_found, total_downloaded, failed, skipped = result
+    else:
+        images, total_found, total_downloaded, failed = result
+        skipped = 0
+    return {
+        'name': name,
+        'total_found': total_found,
+        'total_downloaded': total_downloaded,
+        'failed': len(failed),
+        'skipped': skipped
+    }
+
+
+def empty_stat(name, failed=0):
+    return {'name': name, 'total_found': 0, 'total_downloaded': 0, 'failed': failed, 'skipped': 0}
+
+
+def apply_recovered(chapter_stats, recovered):
+    for stat in chapter_stats:
+        recovered_count = recovered.get(stat['name'], 0)
+        if recovered_count:
+            stat['total_downloaded'] += recovered_count
+            stat['failed'] = max(stat['failed'] - recovered_count, 0)
+
+
+def collect_failed_chapters(chapter_stats, tomo_number=None):
+    failed = []
+    for stat in chapter_stats:
+        total_found = stat.get('total_found', 0)
+        total_downloaded = stat.get('total_downloaded', 0)
+        if total_downloaded < total_found:
+            failed_chapter = {
+                'chapter_name': stat['name'],
+                'downloaded': total_downloaded,
+                'total': total_found
+            }
+            if tomo_number is not None:
+                failed_chapter['tomo_number'] = tomo_number
+            failed.append(failed_chapter)
+    return failed
+
+
+class DownloadEngine:
+    def __init__(self, config):
+        self.config = config
+        self.settings = engine_settings(config)
+        self.active = 0
+        self.closing = False
+        self.closed = False
+        self.state_lock = Lock()
+        self.workers = config.get('engine_workers') or get_max_connections(config)
+        self.per_chapter = max(1, config.get('parallel_images', 1))
+        self.retry_policy = RetryPolicy.from_config(config)
+        self.host_controller = get_host_controller(config)
+        self.rate_limiter = get_rate_limiter(config)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='imagenes')
+
+    def close(self):
+        with self.state_lock:
+            self.closing = True
+            idle = self.active == 0 and not self.closed
+            self.closed = self.closed or idle
+        if idle:
+            self.executor.shutdown(wait=False)
+
+    def pause(self, url, delay_key):
+        if not self.rate_limiter.has_limit(url):
+            time.sleep(self.config.get(delay_key, 0))
+
+    def fetch_image(self, session, img_url, filepath, referer=None, convert_webp=False, max_retries=None, retry_budget=None, cancel_check=None):
+        if max_retries is None:
+            max_retries = self.config['retry_attempts']
+        headers = {'Referer': referer} if referer else None
+
+        for attempt in range(max_retries):
+            if cancel_check and cancel_check():
+                return False, "Descarga cancelada"
+            try:
+                stream_to_file(session, img_url, filepath, timeout=self.config['timeout'], headers=headers, cancel_check=cancel_check, limiter=self.host_controller)
+                if convert_webp:
+                    filepath = convert_image(filepath)
+                return True, filepath
+            except Exception as e:
+                if self.retry_policy.should_retry(e, attempt, max_retries, retry_budget):
+                    time.sleep(self.retry_policy.get_delay(attempt, e))
+                else:
+                    return False, str(e)
+
+        return False, "Max retries exceeded"
+
+    def _download_task(self, session, plan, task, retry_budget, cancel_check):
+        img_index, img_url, filepath = task
+        success, result = self.fetch_image(session, img_url, filepath, plan['referer'], plan['convert_webp'], retry_budget=retry_budget, cancel_check=cancel_check)
+        if self.per_chapter == 1:
+            self.pause(img_url, 'delay_between_images')
+        return img_index, img_url, filepath, success, result
+
+    def _run_threaded(self, session, plan, download_tasks, downloaded_files, cancel_check, desc):
+        retry_budget = self.retry_policy.new_budget()
+        failed_downloads = []
+        pending_tasks = list(download_tasks)
+        running = set()
+
+        with tqdm(total=len(download_tasks), desc=desc, leave=False, unit="img") as progress:
+            while pending_tasks or running:
+                while pending_tasks and len(running) < self.per_chapter:
+                    if cancel_check and cancel_check():
+                        pending_tasks = []
+                        break
+                    running.add(self.executor.submit(self._download_task, session, plan, pending_tasks.pop(0), retry_budget, cancel_check))
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    progress.update(1)
+                    img_index, img_url, filepath, success, result = future.result()
+                    if success:
+                        downloaded_files[img_index] = result
+                    else:
+                        failed_downloads.append({'url': img_url, 'error': result, 'index': img_index, 'filepath': filepath})
+
+        return failed_downloads
+
+    def _retry_failed(self, session, plan, failed_downloads, downloaded_files, cancel_check):
+        retry_budget = self.retry_policy.new_budget()
+        for _ in range(self.config.get('retry_failed_images', 2)):
+            if not failed_downloads or (cancel_check and cancel_check()):
+                break
+            retry_failed = failed_downloads
+            failed_downloads = []
+            for failed in retry_failed:
+                success, result = self.fetch_image(session, failed['url'], failed['filepath'], plan['referer'], plan['convert_webp'], max_retries=3, retry_budget=retry_budget, cancel_check=cancel_check)
+                if success:
+                    downloaded_files[failed['index']] = result
+                else:
+                    failed['error'] = result
+                    failed_downloads.append(failed)
+        return failed_downloads
+
+    def _cleanup(self, chapter_dir):
+        for file in os.listdir(chapter_dir):
+            file_path = os.path.join(chapter_dir, file)
+            stem, ext = os.path.splitext(file)
+            if ext.lower() == '.part' or (ext.lower() in IMAGE_EXTENSIONS and (stem.startswith('temp_') or stem.endswith('-webp'))):
+                try:
+                    os.remove(file_path)
+                except OSError as e:
+                    print(f"[ADVERTENCIA] No se pudo eliminar archivo temporal {file}: {e}")
+
+    def download_chapter(self, session, plan, cancel_check=None, deferred_retry=None, desc=None):
+        with self.state_lock:
+            closed = self.closed
+            if not closed:
+                self.active += 1
+        if closed:
+            return get_download_engine(self.config).download_chapter(session, plan, cancel_check, deferred_retry, desc)
+        try:
+            return self._download_chapter(session, plan, cancel_check, deferred_retry, desc)
+        finally:
+            with self.state_lock:
+                self.active -= 1
+                idle = self.closing and self.active == 0 and not self.closed
+                self.closed = self.closed or idle
+            if idle:
+                self.executor.shutdown(wait=False)
+
+    def _download_chapter(self, session, plan, cancel_check=None, deferred_retry=None, desc=None):
+        images = plan['images']
+        chapter_dir = plan['dir']
+        total_found = len(images)
+        if total_found == 0:
+            return ([], 0, 0, [], 0)
+        os.makedirs(chapter_dir, exist_ok=True)
+
+        existing = {} if self.config.get('force_redownload', False) else sequence_files(chapter_dir)
+
+        downloaded_files = [None] * total_found
+        download_tasks = []
+        for img_index, img_url in enumerate(images):
+            stem = f"{img_index + 1:03d}"
+            if stem in existing:
+                downloaded_files[img_index] = convert_image(existing[stem]) if plan['convert_webp'] else existing[stem]
+            else:
+                download_tasks.append((img_index, img_url, os.path.join(chapter_dir, stem + image_extension(img_url))))
+        skipped_files = total_found - len(download_tasks)
+
+        failed_downloads = []
+        if download_tasks:
+            if desc is None:
+                desc = f"  {plan['name']}"
+            if use_async_engine(self.config):
+                headers = dict(session.headers)
+                if plan['referer']:
+                    headers['Referer'] = plan['referer']
+                engine = get_async_engine(self.config)
+                downloaded_files, _, _, failed_downloads, _ = engine.download_images(download_tasks, downloaded_files, total_found, skipped_files, headers=headers, post_process=convert_image if plan['convert_webp'] else None, cancel_check=cancel_check, cookies=session.cookies, desc=desc)
+            else:
+                failed_downloads = self._run_threaded(session, plan, download_tasks, downloaded_files, cancel_check, desc)
+            if cancel_check and cancel_check():
+                return ([], total_found, 0, [], skipped_files)
+
+        if failed_downloads and self.config.get('retry_failed_images', 2) > 0:
+            if deferred_retry is not None:
+                for failed in failed_downloads:
+                    deferred_retry.add(plan['name'], chapter_dir, failed, referer_url=plan['referer'])
+            else:
+                failed_downloads = self._retry_failed(session, plan, failed_downloads, downloaded_files, cancel_check)
+
+        self._cleanup(chapter_dir)
+        write_manifest(chapter_dir, plan.get('source_url'), images, read_manifest(chapter_dir))
+        downloaded_files = [f for f in downloaded_files if f is not None and os.path.exists(f)]
+        return (downloaded_files, total_found, len(downloaded_files), failed_downloads, skipped_files)
+
+    def drain_deferred(self, session, deferred_retry, convert_webp=False, cancel_check=None):
+        if len(deferred_retry) == 0 or (cancel_check and cancel_check()):
+            return {}
+
+        def retry_item(item, target_path):
+            if cancel_check and cancel_check():
+                return False
+            success, result = self.fetch_image(session, item['url'], target_path, item.get('referer_url'), convert_webp, max_retries=3, cancel_check=cancel_check)
+            return success
+
+        chapter_dirs = {item['chapter_dir'] for item in deferred_retry.get_failed()}
+        recovered = deferred_retry.drain(
+            retry_item,
+            max_workers=self.per_chapter,
+            rounds=self.config.get('retry_failed_images', 2),
+            cancel_check=cancel_check
+        )
+        if recovered:
+            for chapter_dir in chapter_dirs:
+                refresh_manifest(chapter_dir)
+        return recovered
+
+    def run_chapters(self, chapters, worker, cancel_check=None, on_error=None):
+        results = []
+        parallel_chapters = self.config.get('parallel_chapters', 1)
+
+        if parallel_chapters > 1 and len(chapters) > 1:
+            with ThreadPoolExecutor(max_workers=parallel_chapters) as executor:
+                futures = {executor.submit(worker, chapter, idx, len(chapters)): chapter
+                           for idx, chapter in enumerate(chapters, start=1)}
+
+                for future in as_completed(futures):
+                    if cancel_check and cancel_check():
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        print(f"  [ERROR] Error en capítulo: {e}")
+                        if on_error:
+                            results.append(on_error(futures[future]))
+        else:
+            for idx, chapter in enumerate(chapters, start=1):
+                if cancel_check and cancel_check():
+                    break
+                try:
+                    results.append(worker(chapter, idx, len(chapters)))
+                except Exception as e:
+                    print(f"  [ERROR] Error en capítulo: {e}")
+                    if on_error:
+                        results.append(on_error(chapter))
+
+        return results
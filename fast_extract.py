@@ -0,0 +1,82 @@
+from io import BytesIO
+from lxml import etree
+from lxml import html as lxml_html
+
+MADARA_IMAGES_XPATH = (
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' page-break ')]"
+    "/descendant::img[contains(concat(' ', normalize-space(@class), ' '), ' wp-manga-chapter-img ')][1]"
+)
+
+OLYMPUS_IMAGES_XPATH = "(//section)[1]//div[contains(@class, 'relative')]/descendant::img[1]"
+
+
+def parse_html(html_content):
+    if not html_content:
+        return None
+    try:
+        parser = lxml_html.HTMLParser(encoding='utf-8')
+        return lxml_html.document_fromstring(html_content.encode('utf-8'), parser=parser)
+    except (ValueError, etree.ParserError):
+        return None
+
+
+def select_images(html_content, xpath):
+    tree = parse_html(html_content)
+    if tree is None:
+        return []
+    return tree.xpath(xpath)
+
+
+def has_class(element, name):
+    return name in (element.get('class') or '').split()
+
+
+def find_first(element, tag, predicate=None):
+    for node in element.iterdescendants(tag):
+        if predicate is None or predicate(node):
+            return node
+    return None
+
+
+def element_text(element):
+    parts = []
+    for node in element.iter():
+        if isinstance(node.tag, str) and node.text:
+            parts.append(node.text.strip())
+        if node is not element and node.tail:
+            parts.append(node.tail.strip())
+    return ''.join(parts)
+
+
+def release(element):
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def stream_matches(html_content, within, match, handle):
+    if not html_content:
+        return False
+    scopes = []
+    try:
+        events = etree.iterparse(BytesIO(html_content.encode('utf-8')), events=('start', 'end'), html=True, encoding='utf-8')
+        for event, element in events:
+            if not isinstance(element.tag, str):
+                continue
+            if event == 'start':
+                if within(element):
+                    scopes.append(element)
+                continue
+            if scopes and scopes[-1] is element:
+                scopes.pop()
+            elif scopes:
+                if match(element):
+                    handle(element)
+                    release(element)
+                continue
+            release(element)
+    except (ValueError, etree.LxmlError):
+        return False
+    return True
@@ -0,0 +1,128 @@
+import os
+import re
+import json
+import time
+from threading import Lock
+
+METHODS = ('http', 'selenium')
+
+
+_strategy = None
+_strategy_lock = Lock()
+
+
+def get_fetch_strategy(config):
+    global _strategy
+    with _strategy_lock:
+        if _strategy is None:
+            path = config.get('fetch_strategy_file')
+            if not path:
+                script_dir = os.path.dirname(os.path.abspath(__file__))
+                path = os.path.join(script_dir, 'resources', 'cache', 'fetch_strategy.json')
+            _strategy = FetchStrategy(path, overrides=config.get('fetch_strategy', {}), recheck_hours=config.get('fetch_strategy_recheck_hours', 24))
+        return _strategy
+
+
+def complete_listing(parse, pattern, min_items=1):
+    marker = re.compile(pattern)
+
+    def check(html_content):
+        if not html_content or not marker.search(html_content):
+            return None
+        items = parse(html_content)
+        if not items or len(items) < min_items:
+            return None
+        return items
+    return check
+
+
+def listing_size(items):
+    try:
+        return len(items)
+    except TypeError:
+        return 1
+
+
+class FetchStrategy:
+    def __init__(self, path, overrides=None, recheck_hours=24):
+        self.path = path
+        self.overrides = overrides or {}
+        self.recheck = recheck_hours * 3600
+        self.lock = Lock()
+        self.table = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.table, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"[ADVERTENCIA] No se pudo guardar la tabla de estrategias: {e}")
+
+    def order(self, site, page_type, bridge=None):
+        forced = self.overrides.get(site, {}).get(page_type)
+        if forced in METHODS:
+            return [forced]
+        with self.lock:
+            entry = self.table.get(site, {}).get(page_type)
+        if entry and entry['method'] == 'selenium' and time.time() - entry['checked_at'] < self.recheck:
+            if not (bridge and bridge.usable_for(page_type)):
+                return ['selenium']
+        return ['http', 'selenium']
+
+    def record(self, site, page_type, method, success, bridge=None):
+        if bridge and method == 'http':
+            bridge.report(page_type, success)
+        if not success:
+            return
+        with self.lock:
+            pages = self.table.setdefault(site, {})
+            entry = pages.get(page_type)
+            if entry and entry['method'] == method and time.time() - entry['checked_at'] < self.recheck:
+                return
+            pages[page_type] = {'method': method, 'checked_at': time.time()}
+            self._save()
+        if not entry or entry['method'] != method:
+            print(f"[INFO] Estrategia para {site}/{page_type}: {method}")
+
+    def needs_recheck(self, site, page_type, method):
+        if self.overrides.get(site, {}).get(page_type) in METHODS:
+            return False
+        with self.lock:
+            entry = self.table.get(site, {}).get(page_type)
+        return bool(entry) and entry['method'] == method and time.time() - entry['checked_at'] >= self.recheck
+
+    def fetch(self, site, page_type, fetch_page, is_usable, selenium_available=True, bridge=None):
+        recheck_http = selenium_available and self.needs_recheck(site, page_type, 'http')
+        http_result = None
+        for method in self.order(site, page_type, bridge):
+            if method == 'selenium' and not selenium_available:
+                continue
+            result = fetch_page(method == 'selenium')
+            try:
+                usable = is_usable(result) if result else None
+            except Exception:
+                usable = None
+            success = bool(usable)
+            if method == 'http' and success and recheck_http:
+                print(f"[INFO] Revalidando la estrategia http para {site}/{page_type} con el navegador")
+                http_result = (result, listing_size(usable))
+                continue
+            if http_result and (not success or listing_size(usable) <= http_result[1]):
+                break
+            self.record(site, page_type, method, success, bridge)
+            if success:
+                return result
+        if http_result:
+            self.record(site, page_type, 'http', True, bridge)
+            return http_result[0]
+        return None
@@ -0,0 +1,101 @@
+import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+CHUNK_SIZE = 64 * 1024
+MAX_CONNECTIONS = 50
+DEFAULT_POOL_SIZE = 10
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+def get_max_connections(config):
+    max_connections = config.get('parallel_tomos', 1) * config.get('parallel_chapters', 1) * config.get('parallel_images', 1)
+    return max(1, min(max_connections, MAX_CONNECTIONS))
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    def __init__(self, rate_limiter=None, **kwargs):
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.rate_limiter:
+            self.rate_limiter.acquire(request.url)
+        start = time.monotonic()
+        response = super().send(request, **kwargs)
+        response.round_trip = time.monotonic() - start
+        return response
+
+
+def create_session(config, user_agent=DEFAULT_USER_AGENT, rate_limiter=None):
+    pool_size = max(get_max_connections(config), DEFAULT_POOL_SIZE)
+    session = requests.Session()
+    adapter = RateLimitedAdapter(rate_limiter=rate_limiter, pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': user_agent
+    })
+    return session
+
+
+def get_pool_stats(session):
+    hits = 0
+    misses = 0
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        manager = getattr(adapter, 'poolmanager', None)
+        if manager is None:
+            continue
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            misses += pool.num_connections
+            hits += max(pool.num_requests - pool.num_connections, 0)
+    return hits, misses
+
+
+def format_pool_stats(session):
+    hits, misses = get_pool_stats(session)
+    total = hits + misses
+    ratio = (hits / total * 100) if total else 0
+    return f"[INFO] Conexiones HTTP: {hits} reutilizadas, {misses} nuevas ({ratio:.1f}% reutilización)"
+
+
+def stream_to_file(session, url, filepath, timeout=30, headers=None, chunk_size=CHUNK_SIZE, cancel_check=None, limiter=None):
+    part_path = filepath + '.part'
+    file_size = 0
+    slot = limiter.acquire(url) if limiter else None
+    try:
+        with session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+            if slot:
+                slot.status = response.status_code
+                slot.latency = getattr(response, 'round_trip', response.elapsed.total_seconds())
+            response.raise_for_status()
+            with open(part_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if cancel_check and cancel_check():
+                        raise InterruptedError("Descarga cancelada")
+                    if chunk:
+                        f.write(chunk)
+                        file_size += len(chunk)
+
+        if file_size == 0:
+            raise ValueError(f"Archivo vacío: {file_size} bytes")
+
+        os.replace(part_path, filepath)
+        return file_size
+    except BaseException as e:
+        if slot:
+            slot.error = e
+        try:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        if slot:
+            limiter.release(slot)
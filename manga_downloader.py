@@ -6,19 +6,18 @@ import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import time
-from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock, Semaphore
-
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
+from threading import Lock
+from http_utils import create_session, format_pool_stats
+from rate_limit import get_rate_limiter
+from page_cache import get_page_cache
+from fetch_strategy import get_fetch_strategy, complete_listing
+from session_bridge import SessionBridge
+from deferred_retry import DeferredRetryPool
+from download_engine import get_download_engine, chapter_plan, chapter_stat, empty_stat, apply_recovered, collect_failed_chapters, manifest_status
+from fast_extract import MADARA_IMAGES_XPATH, select_images
+from browser_pool import SELENIUM_AVAILABLE, get_driver_pool, block_requests
+from selenium_waits import WaitEngine, format_wait_stats
 
 
 def load_config():
@@ -38,7 +37,37 @@ def load_config():
         "parallel_chapters": 2,
         "parallel_images": 8,
         "retry_failed_images": 5,
-        "force_redownload": False
+        "force_redownload": False,
+        "async_downloads": False,
+        "async_concurrency": 0,
+        "engine_workers": 0,
+        "retry_max_delay": 60,
+        "retry_budget_per_chapter": 30,
+        "page_cache_enabled": True,
+        "page_cache_ttl": 600,
+        "page_cache_max_mb": 200,
+        "browser_pool_size": 0,
+        "browser_max_pages": 50,
+        "browser_tabs": 0,
+        "browser_budget_max": 4,
+        "browser_budget_rss_mb": 0,
+        "browser_budget_timeout": 600,
+        "browser_profiles": False,
+        "browser_profile_dir": "",
+        "browser_profile_cache_mb": 200,
+        "selenium_wait_log": False,
+        "selenium_block_requests": True,
+        "selenium_block_images": True,
+        "network_image_harvest": True,
+        "network_image_min_kb": 5,
+        "fetch_strategy_recheck_hours": 24,
+        "fetch_strategy": {},
+        "session_bridge": True,
+        "listing_api": True,
+        "fast_extract": True,
+        "rate_limits": {
+            "default": {"rps": 0, "burst": 0}
+        }
     }
     
     if os.path.exists(config_path):
@@ -91,23 +120,31 @@ class MangaDownloader:
     def __init__(self, base_url, config):
         self.base_url = base_url
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        max_connections = config.get('parallel_tomos', 1) * config.get('parallel_chapters', 1) * config.get('parallel_images', 1)
-        self.connection_semaphore = Semaphore(min(max_connections, 50))
+        self.rate_limiter = get_rate_limiter(config)
+        self.session = create_session(config, rate_limiter=self.rate_limiter)
+        self.page_cache = get_page_cache(config)
+        self.fetch_strategy = get_fetch_strategy(config)
+        self.session_bridge = SessionBridge(self.session, 'inventario_oculto', config)
+        self.driver_pool = get_driver_pool(config, site='inventario_oculto')
+        self.engine = get_download_engine(config)
+        self.api_volumes = {}
         self.print_lock = Lock()
         self.cancelled = False
     
     def cancel(self):
         self.cancelled = True
     
+    def pause(self, delay_key):
+        if not self.rate_limiter.has_limit(self.base_url):
+            time.sleep(self.config.get(delay_key, 0))
+    
     def get_page(self, url, use_selenium=False):
         if use_selenium and SELENIUM_AVAILABLE:
             return self.get_page_selenium(url)
         
         try:
+            if self.page_cache:
+                return self.page_cache.get(self.session, url, timeout=self.config['timeout'])
             response = self.session.get(url, timeout=self.config['timeout'])
             response.raise_for_status()
             return response.text
@@ -115,54 +152,34 @@ class MangaDownloader:
             print(f"Error al descargar la página: {e}")
             return None
     
+    def get_listing_page(self, url):
+        if self.config.get('listing_api', True):
+            html_content = self.get_page(url)
+            if html_content and self.get_volumes_api(html_content):
+                return html_content
+        return self.fetch_strategy.fetch(
+            'inventario_oculto', 'listado',
+            lambda use_selenium: self.get_page(url, use_selenium=use_selenium),
+            complete_listing(self.parse_volumes, r'class=["\'][^"\']*\bvolumns\b'),
+            selenium_available=SELENIUM_AVAILABLE,
+            bridge=self.session_bridge
+        )
+    
     def get_page_selenium(self, url):
         if not SELENIUM_AVAILABLE:
             print("[ERROR] Selenium no esta disponible. Instala con: pip install selenium")
             return None
         
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--disable-cache')
-        options.add_argument('--disable-application-cache')
-        options.add_argument('--disable-offline-load-stale-cache')
-        options.add_argument('--disk-cache-size=0')
-        options.add_argument('--media-cache-size=0')
-        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        
-        prefs = {
-            "profile.default_content_setting_values": {
-                "images": 2
-            },
-            "profile.managed_default_content_settings": {
-                "images": 2
-            }
-        }
-        options.add_experimental_option("prefs", prefs)
-        
         driver = None
         try:
-            driver = webdriver.Chrome(options=options)
-            driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': True})
+            driver = self.driver_pool.acquire()
+            block_requests(driver, self.config, 'inventario_oculto')
             driver.get(url)
+            wait = WaitEngine(driver, 'inventario_oculto', self.config)
             
-            try:
-                WebDriverWait(driver, self.config['selenium_wait_time']).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".page-content-listing, .listing-chapters_wrap, ul.version-chap"))
-                )
-            except:
-                pass
-            
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            
-            driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
-            
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(self.config['selenium_extra_wait'])
+            wait.selector_present(".page-content-listing, .listing-chapters_wrap, ul.version-chap", timeout=self.config['selenium_wait_time'], stage='listado')
+            wait.scroll_to_end()
+            wait.network_idle(timeout=self.config['selenium_extra_wait'])
             
             driver.execute_script("""
                 var volumes = document.querySelectorAll('li.parent.has-child a.has-child');
@@ -173,64 +190,132 @@ class MangaDownloader:
                     }
                 });
             """)
-            time.sleep(2)
+            wait.network_idle(timeout=2, stage='tomos')
             
             html = driver.page_source
+            self.session_bridge.import_driver(driver)
             return html
         except Exception as e:
             print(f"Error con Selenium: {e}")
             return None
         finally:
-            if driver:
-                driver.quit()
+            self.driver_pool.release(driver)
     
-    def get_chapters_ajax(self, manga_id, debug=False):
-        from urllib.parse import urlparse
+    def get_chapter_endpoints(self, manga_id, manga_url):
         parsed = urlparse(self.base_url)
         base_url = f"{parsed.scheme}://{parsed.netloc}"
         ajax_url = f"{base_url}/wp-admin/admin-ajax.php"
         
-        rest_url = f"{base_url}/wp-json/wp-manga/v1/chapters/{manga_id}"
-        try:
-            if debug:
-                print(f"  Intentando API REST: {rest_url}")
-            response = self.session.get(rest_url, timeout=self.config['timeout'])
-            if response.status_code == 200:
-                content = response.text
-                if debug:
-                    print(f"  [OK] API REST devolvio contenido")
-                return content
-        except Exception as e:
-            if debug:
-                print(f"  Error con API REST: {e}")
-        
-        actions = [
-            ('manga_get_chapters', {'action': 'manga_get_chapters', 'manga': manga_id}),
-            ('wp_manga_get_chapters', {'action': 'wp_manga_get_chapters', 'manga_id': manga_id}),
-            ('get_manga_chapters', {'action': 'get_manga_chapters', 'manga_id': manga_id}),
-            ('manga_chapters', {'action': 'manga_chapters', 'manga': manga_id, 'manga_id': manga_id}),
-        ]
-        
-        for action_name, data in actions:
+        endpoints = []
+        if manga_url:
+            endpoints.append(('ajax/chapters', 'post', manga_url.rstrip('/') + '/ajax/chapters/', {}, 't'))
+        endpoints.append(('api_rest', 'get', f"{base_url}/wp-json/wp-manga/v1/chapters/{manga_id}", {}, 'page'))
+        endpoints.extend([
+            ('manga_get_chapters', 'post', ajax_url, {'action': 'manga_get_chapters', 'manga': manga_id}, 'page'),
+            ('wp_manga_get_chapters', 'post', ajax_url, {'action': 'wp_manga_get_chapters', 'manga_id': manga_id}, 'page'),
+            ('get_manga_chapters', 'post', ajax_url, {'action': 'get_manga_chapters', 'manga_id': manga_id}, 'page'),
+            ('manga_chapters', 'post', ajax_url, {'action': 'manga_chapters', 'manga': manga_id, 'manga_id': manga_id}, 'page'),
+        ])
+        return endpoints
+    
+    def request_chapter_page(self, endpoint, page=1):
+        name, method, url, data, page_param = endpoint
+        params = {page_param: page} if page > 1 else None
+        if method == 'get':
+            response = self.session.get(url, params=params, timeout=self.config['timeout'])
+        elif url.endswith('admin-ajax.php'):
+            response = self.session.post(url, data=dict(data, **(params or {})), timeout=self.config['timeout'])
+        else:
+            response = self.session.post(url, params=params, data=data, timeout=self.config['timeout'])
+        if response.status_code != 200:
+            return None
+        return response.text
+    
+    def iter_chapters_ajax(self, manga_id, debug=False, manga_url=None):
+        for endpoint in self.get_chapter_endpoints(manga_id, manga_url):
             try:
                 if debug:
-                    print(f"  Intentando accion: {action_name}")
-                response = self.session.post(ajax_url, data=data, timeout=self.config['timeout'])
-                if response.status_code == 200:
-                    content = response.text
+                    print(f"  Intentando accion: {endpoint[0]}")
+                content = self.request_chapter_page(endpoint)
+                if content:
                     if debug:
                         print(f"  Respuesta (primeros 500 chars): {content[:500]}")
                     
-                    if 'version-chap' in content or 'volumns' in content or 'wp-manga-chapter' in content or len(content) > 100:
+                    if self.find_volume_container(BeautifulSoup(content, 'lxml')):
                         if debug:
-                            print(f"  [OK] Accion '{action_name}' devolvio contenido valido")
-                        return content
+                            print(f"  [OK] Accion '{endpoint[0]}' devolvio contenido valido")
+                        yield endpoint, content
+                    elif debug:
+                        print(f"  Accion '{endpoint[0]}' sin contenedor de capitulos")
             except requests.RequestException as e:
                 if debug:
-                    print(f"  Error con accion '{action_name}': {e}")
+                    print(f"  Error con accion '{endpoint[0]}': {e}")
                 continue
+    
+    def get_chapters_ajax(self, manga_id, debug=False, manga_url=None):
+        return next(self.iter_chapters_ajax(manga_id, debug=debug, manga_url=manga_url), (None, None))
+    
+    def get_last_listing_page(self, content, page_param):
+        pages = [int(page) for page in re.findall(rf'[?&]{page_param}=(\d+)', content)]
+        pages.extend(int(page) for page in re.findall(r'data-page="(\d+)"', content))
+        return max(pages) if pages else 1
+    
+    def get_volumes_api(self, html_content, debug=False):
+        soup = BeautifulSoup(html_content, 'lxml')
+        manga_id = self.extract_manga_id(soup)
+        if not manga_id:
+            return []
+        if manga_id in self.api_volumes:
+            return self.api_volumes[manga_id]
+        
+        canonical = soup.find('link', rel='canonical') or soup.find('meta', property='og:url')
+        manga_url = (canonical.get('href') or canonical.get('content')) if canonical else self.base_url
+        
+        for endpoint, first_page in self.iter_chapters_ajax(manga_id, debug=debug, manga_url=manga_url):
+            volumes, page_count = self.collect_api_volumes(endpoint, first_page)
+            if volumes:
+                print(f"[INFO] Listado obtenido por API ({endpoint[0]}, {page_count} páginas, {len(volumes)} volúmenes)")
+                self.api_volumes[manga_id] = volumes
+                return volumes
+            if debug:
+                print(f"  Accion '{endpoint[0]}' no devolvio capitulos, probando la siguiente")
+        return []
+    
+    def collect_api_volumes(self, endpoint, first_page):
+        def fetch_page(page):
+            try:
+                return self.request_chapter_page(endpoint, page)
+            except requests.RequestException as e:
+                print(f"[ADVERTENCIA] No se pudo obtener la página {page} del listado: {e}")
+                return None
         
-        return None
+        pages = [first_page]
+        last_page = min(self.get_last_listing_page(first_page, endpoint[4]), 100)
+        if last_page > 1:
+            workers = max(1, min(self.config.get('parallel_images', 1), last_page - 1))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pages.extend(executor.map(fetch_page, range(2, last_page + 1)))
+        
+        volumes = []
+        seen_urls = set()
+        for content in pages:
+            if not content:
+                continue
+            volume_container = self.find_volume_container(BeautifulSoup(content, 'lxml'))
+            if not volume_container:
+                continue
+            for volume in self.volumes_from_container(volume_container):
+                existing = next((v for v in volumes if v['name'] == volume['name']), None)
+                if existing is None:
+                    existing = {'name': volume['name'], 'chapters': []}
+                    volumes.append(existing)
+                for chapter in volume['chapters']:
+                    if chapter['url'] not in seen_urls:
+                        seen_urls.add(chapter['url'])
+                        existing['chapters'].append(chapter)
+        
+        volumes = [volume for volume in volumes if volume['chapters']]
+        return volumes, len(pages)
     
     def get_manga_title(self, html_content):
         soup = BeautifulSoup(html_content, 'lxml')
@@ -274,22 +359,14 @@ class MangaDownloader:
         return sorted(chapters, key=get_chapter_sort_key)
     
     def parse_volumes(self, html_content, debug=False):
+        if self.config.get('listing_api', True):
+            volumes = self.get_volumes_api(html_content, debug=debug)
+            if volumes:
+                return volumes
+        
         soup = BeautifulSoup(html_content, 'lxml')
         volumes = []
-        
-        manga_id = None
-        chapters_holder = soup.find('div', id='manga-chapters-holder')
-        if chapters_holder:
-            manga_id = chapters_holder.get('data-id')
-        
-        if not manga_id:
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string and 'manga_id' in script.string:
-                    match = re.search(r'"manga_id"\s*:\s*"(\d+)"', script.string)
-                    if match:
-                        manga_id = match.group(1)
-                        break
+        manga_id = self.extract_manga_id(soup)
         
         if debug:
             print("\n=== MODO DEPURACIÓN ===")
@@ -313,30 +390,21 @@ class MangaDownloader:
             for ul in vol_uls:
                 print(f"  - Clases: {ul.get('class', [])}")
         
-        volume_container = soup.find('ul', class_='main version-chap volumns active')
-        if not volume_container:
-            volume_container = soup.find('ul', class_='main version-chap volumns')
-        
-        if not volume_container:
-            volume_container = soup.find('ul', class_=lambda x: x and 'volumns' in ' '.join(x))
+        volume_container = self.find_volume_container(soup)
         
         if not volume_container:
             page_content = soup.find('div', class_='page-content-listing')
             if page_content:
                 volume_container = page_content.find('ul', class_=lambda x: x and 'volumns' in ' '.join(x) if x else False)
         
-        if not volume_container and manga_id:
+        if not volume_container and manga_id and not self.config.get('listing_api', True):
             if debug:
                 print(f"\n[INFO] Intentando cargar capitulos mediante AJAX (manga_id: {manga_id})")
             
-            ajax_content = self.get_chapters_ajax(manga_id, debug=debug)
+            endpoint, ajax_content = self.get_chapters_ajax(manga_id, debug=debug, manga_url=self.base_url)
             if ajax_content:
                 ajax_soup = BeautifulSoup(ajax_content, 'lxml')
-                volume_container = ajax_soup.find('ul', class_='main version-chap volumns active')
-                if not volume_container:
-                    volume_container = ajax_soup.find('ul', class_='main version-chap volumns')
-                if not volume_container:
-                    volume_container = ajax_soup.find('ul', class_=lambda x: x and 'volumns' in ' '.join(x) if x else False)
+                volume_container = self.find_volume_container(ajax_soup)
                 
                 if volume_container:
                     if debug:
@@ -373,6 +441,35 @@ class MangaDownloader:
                 f.write(html_content)
             print(f"  HTML guardado en '{debug_file}' para inspeccion")
         
+        volumes = self.volumes_from_container(volume_container, debug=debug)
+        
+        if debug:
+            print(f"\n[DEBUG] Total de volúmenes con capítulos: {len(volumes)}")
+        
+        return volumes
+    
+    def extract_manga_id(self, soup):
+        chapters_holder = soup.find('div', id='manga-chapters-holder')
+        if chapters_holder and chapters_holder.get('data-id'):
+            return chapters_holder.get('data-id')
+        
+        for script in soup.find_all('script'):
+            if script.string and 'manga_id' in script.string:
+                match = re.search(r'"manga_id"\s*:\s*"(\d+)"', script.string)
+                if match:
+                    return match.group(1)
+        return None
+    
+    def find_volume_container(self, soup):
+        volume_container = soup.find('ul', class_='main version-chap volumns active')
+        if not volume_container:
+            volume_container = soup.find('ul', class_='main version-chap volumns')
+        if not volume_container:
+            volume_container = soup.find('ul', class_=lambda x: x and 'volumns' in ' '.join(x))
+        return volume_container
+    
+    def volumes_from_container(self, volume_container, debug=False):
+        volumes = []
         volume_items = volume_container.find_all('li', class_=lambda x: x and 'parent' in x and 'has-child' in x)
         
         if debug:
@@ -413,106 +510,77 @@ class MangaDownloader:
                     if debug:
                         print(f"  [ADVERTENCIA] Volumen '{volume_name}' sin capítulos, se omite")
         
-        if debug:
-            print(f"\n[DEBUG] Total de volúmenes con capítulos: {len(volumes)}")
-        
         return volumes
     
-    def download_image_with_retry(self, img_url, filepath, max_retries=None):
-        if max_retries is None:
-            max_retries = self.config['retry_attempts']
+    def image_url_from_tag(self, img_tag, chapter_url):
+        img_url = None
         
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(img_url, timeout=self.config['timeout'])
-                response.raise_for_status()
-                
-                content = response.content
-                file_size = len(content)
-                
-                if file_size == 0:
-                    raise ValueError(f"Archivo vacío: {file_size} bytes")
-                
-                with open(filepath, 'wb') as f:
-                    f.write(content)
+        for attr in ['data-src', 'data-full-url', 'data-original', 'data-lazy-src', 'src']:
+            if img_tag.get(attr):
+                img_url = img_tag.get(attr).strip()
+                break
+        
+        if img_tag.get('srcset'):
+            srcset = img_tag.get('srcset', '')
+            if srcset:
+                srcset_parts = [s.strip() for s in srcset.split(',')]
+                largest_url = None
+                largest_size = 0
+                for part in srcset_parts:
+                    if ' ' in part:
+                        url_part, size_part = part.rsplit(' ', 1)
+                        try:
+                            if size_part.endswith('w'):
+                                size = int(size_part[:-1])
+                            elif size_part.endswith('x'):
+                                size = float(size_part[:-1]) * 1000
+                            else:
+                                size = 0
+                            
+                            if size > largest_size:
+                                largest_size = size
+                                largest_url = url_part.strip()
+                        except:
+                            pass
                 
-                return True, file_size
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep(self.config['retry_delay'])
-                else:
-                    return False, str(e)
+                if largest_url:
+                    img_url = largest_url
+        
+        if img_url:
+            img_url = re.sub(r'\s+', '', img_url)
+            
+            parsed = urlparse(img_url)
+            clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+            img_url = clean_url
+            
+            if not img_url.startswith('http'):
+                img_url = urljoin(chapter_url, img_url)
         
-        return False, "Max retries exceeded"
+        return img_url
     
-    def download_image_with_semaphore(self, img_url, filepath, img_index, total_images):
-        with self.connection_semaphore:
-            success, result = self.download_image_with_retry(img_url, filepath)
-            return (img_index, success, result, filepath)
+    def extract_images_soup(self, html_content, chapter_url):
+        soup = BeautifulSoup(html_content, 'lxml')
+        images = []
+        
+        for div in soup.find_all('div', class_='page-break'):
+            img_tag = div.find('img', class_='wp-manga-chapter-img')
+            if img_tag:
+                img_url = self.image_url_from_tag(img_tag, chapter_url)
+                if img_url:
+                    images.append(img_url)
+        
+        return images
     
-    def download_chapter_images(self, chapter_url, chapter_name, output_dir):
-        try:
-            html_content = self.get_page(chapter_url)
-            if not html_content:
-                return ([], 0, 0, [])
-        except Exception as e:
-            return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al obtener HTML: {str(e)}", 'index': -1}])
+    def extract_images_from_html(self, html_content, chapter_url):
+        images = []
+        if self.config.get('fast_extract', True):
+            for img_tag in select_images(html_content, MADARA_IMAGES_XPATH):
+                img_url = self.image_url_from_tag(img_tag, chapter_url)
+                if img_url:
+                    images.append(img_url)
         
-        try:
-            soup = BeautifulSoup(html_content, 'lxml')
-            images = []
-            
-            image_divs = soup.find_all('div', class_='page-break')
-            
-            for div in image_divs:
-                img_tag = div.find('img', class_='wp-manga-chapter-img')
-                if img_tag:
-                    img_url = None
-                    
-                    for attr in ['data-src', 'data-full-url', 'data-original', 'data-lazy-src', 'src']:
-                        if img_tag.get(attr):
-                            img_url = img_tag.get(attr).strip()
-                            break
-                    
-                    if img_tag.get('srcset'):
-                        srcset = img_tag.get('srcset', '')
-                        if srcset:
-                            srcset_parts = [s.strip() for s in srcset.split(',')]
-                            largest_url = None
-                            largest_size = 0
-                            for part in srcset_parts:
-                                if ' ' in part:
-                                    url_part, size_part = part.rsplit(' ', 1)
-                                    try:
-                                        if size_part.endswith('w'):
-                                            size = int(size_part[:-1])
-                                        elif size_part.endswith('x'):
-                                            size = float(size_part[:-1]) * 1000
-                                        else:
-                                            size = 0
-                                        
-                                        if size > largest_size:
-                                            largest_size = size
-                                            largest_url = url_part.strip()
-                                    except:
-                                        pass
-                            
-                            if largest_url:
-                                img_url = largest_url
-                    
-                    if img_url:
-                        img_url = re.sub(r'\s+', '', img_url)
-                        
-                        parsed = urlparse(img_url)
-                        clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-                        img_url = clean_url
-                        
-                        if not img_url.startswith('http'):
-                            img_url = urljoin(chapter_url, img_url)
-                        
-                        images.append(img_url)
-        except Exception as e:
-            return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al parsear HTML: {str(e)}", 'index': -1}])
+        if not images:
+            images = self.extract_images_soup(html_content, chapter_url)
         
         def extract_number(url):
             match = re.search(r'(\d+)\.\d+-(\d+)', url)
@@ -524,159 +592,24 @@ class MangaDownloader:
             return (0, 0)
         
         images.sort(key=extract_number)
+        return images
+    
+    def download_chapter_images(self, chapter_url, chapter_name, output_dir, deferred_retry=None):
+        try:
+            html_content = self.get_page(chapter_url)
+            if not html_content:
+                return ([], 0, 0, [])
+        except Exception as e:
+            return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al obtener HTML: {str(e)}", 'index': -1}])
         
-        safe_chapter_name = re.sub(r'[<>:"/\\|?*]', '_', chapter_name)
-        chapter_dir = os.path.join(output_dir, safe_chapter_name)
-        os.makedirs(chapter_dir, exist_ok=True)
-        
-        total_found = len(images)
-        if total_found == 0:
-            return ([], 0, 0, [])
-        
-        downloaded_files = [None] * total_found
-        failed_downloads = []
-        skipped_files = 0
-        
-        parallel_images = self.config.get('parallel_images', 1)
-        
-        def prepare_download(img_index, img_url):
-            parsed_url = urlparse(img_url)
-            filename = os.path.basename(parsed_url.path)
-            
-            if not filename or '.' not in filename:
-                path_part = parsed_url.path
-                if '.' in path_part:
-                    ext = path_part.split('.')[-1].lower()
-                    if ext in ['png', 'jpg', 'jpeg', 'webp', 'gif']:
-                        filename = f"image_{img_index:04d}_{hash(img_url) % 10000}.{ext}"
-                    else:
-                        filename = f"image_{img_index:04d}_{hash(img_url) % 10000}.png"
-                else:
-                    filename = f"image_{img_index:04d}_{hash(img_url) % 10000}.png"
-            
-            if '?' in filename:
-                filename = filename.split('?')[0]
-            
-            filepath = os.path.join(chapter_dir, filename)
-            return (img_index, img_url, filepath)
-        
-        download_tasks = []
-        for idx, img_url in enumerate(images):
-            img_index, img_url, filepath = prepare_download(idx, img_url)
-            
-            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                downloaded_files[img_index] = filepath
-                skipped_files += 1
-            else:
-                download_tasks.append((img_index, img_url, filepath))
-        
-        if download_tasks:
-            if parallel_images > 1:
-                with ThreadPoolExecutor(max_workers=parallel_images) as executor:
-                    futures = {executor.submit(self.download_image_with_semaphore, img_url, filepath, idx, total_found): (idx, img_url) 
-                              for idx, img_url, filepath in download_tasks}
-                    
-                    for future in tqdm(as_completed(futures), total=len(download_tasks), desc=f"  {safe_chapter_name}", leave=False, unit="img"):
-                        if self.cancelled:
-                            executor.shutdown(wait=False, cancel_futures=True)
-                            return ([], total_found, 0, [])
-                        idx, img_url = futures[future]
-                        try:
-                            img_index, success, result, filepath = future.result()
-                            if success:
-                                downloaded_files[img_index] = filepath
-                            else:
-                                failed_downloads.append({'url': img_url, 'error': result, 'index': img_index, 'filepath': filepath})
-                        except Exception as e:
-                            failed_downloads.append({'url': img_url, 'error': str(e), 'index': idx, 'filepath': filepath})
-            else:
-                for idx, img_url, filepath in tqdm(download_tasks, desc=f"  {safe_chapter_name}", leave=False, unit="img"):
-                    if self.cancelled:
-                        return ([], total_found, 0, [])
-                    try:
-                        success, result = self.download_image_with_retry(img_url, filepath)
-                        if success:
-                            downloaded_files[idx] = filepath
-                        else:
-                            failed_downloads.append({'url': img_url, 'error': result, 'index': idx, 'filepath': filepath})
-                        time.sleep(self.config['delay_between_images'])
-                    except Exception as e:
-                        failed_downloads.append({'url': img_url, 'error': str(e), 'index': idx, 'filepath': filepath})
-        
-        if failed_downloads:
-            retry_attempts = self.config.get('retry_failed_images', 2)
-            if retry_attempts > 0:
-                for retry in range(retry_attempts):
-                    if not failed_downloads:
-                        break
-                    
-                    retry_failed = failed_downloads.copy()
-                    failed_downloads = []
-                    
-                    for failed in retry_failed:
-                        if 'filepath' in failed:
-                            try:
-                                success, result = self.download_image_with_retry(failed['url'], failed['filepath'], max_retries=3)
-                                if success:
-                                    downloaded_files[failed['index']] = failed['filepath']
-                                else:
-                                    failed_downloads.append(failed)
-                            except Exception as e:
-                                failed_downloads.append(failed)
-        
-        files_with_index = []
-        for idx, filepath in enumerate(downloaded_files):
-            if filepath is not None and os.path.exists(filepath):
-                files_with_index.append((idx, filepath))
-        
-        files_with_index.sort(key=lambda x: x[0])
-        
-        renamed_files = []
-        for original_idx, old_filepath in files_with_index:
-            if not os.path.exists(old_filepath):
-                continue
-            
-            file_ext = os.path.splitext(old_filepath)[1].lower()
-            if not file_ext or file_ext not in ['.png', '.jpg', '.jpeg', '.webp', '.gif']:
-                file_ext = '.jpg'
-            
-            seq_num = original_idx + 1
-            new_filename = f"{seq_num:03d}{file_ext}"
-            new_filepath = os.path.join(chapter_dir, new_filename)
-            
-            if old_filepath != new_filepath:
-                if os.path.exists(new_filepath):
-                    temp_name = f"temp_{seq_num:03d}_{hash(old_filepath) % 10000}{file_ext}"
-                    temp_filepath = os.path.join(chapter_dir, temp_name)
-                    try:
-                        os.rename(old_filepath, temp_filepath)
-                        old_filepath = temp_filepath
-                    except Exception as e:
-                        print(f"[ADVERTENCIA] No se pudo crear archivo temporal: {e}")
-                        renamed_files.append(old_filepath)
-                        continue
-                
-                try:
-                    os.rename(old_filepath, new_filepath)
-                    renamed_files.append(new_filepath)
-                except Exception as e:
-                    print(f"[ADVERTENCIA] No se pudo renombrar {os.path.basename(old_filepath)}: {e}")
-                    renamed_files.append(old_filepath)
-            else:
-                renamed_files.append(new_filepath)
-        
-        downloaded_files = renamed_files
-        total_downloaded = len(downloaded_files)
-        
-        for file in os.listdir(chapter_dir):
-            if file.lower().startswith('temp_') and file.lower().endswith(('.png', '.jpg', '.jpeg', '.webp', '.gif')):
-                temp_file_path = os.path.join(chapter_dir, file)
-                try:
-                    os.remove(temp_file_path)
-                except Exception as e:
-                    print(f"[ADVERTENCIA] No se pudo eliminar archivo temporal {file}: {e}")
+        try:
+            images = self.extract_images_from_html(html_content, chapter_url)
+        except Exception as e:
+            return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al parsear HTML: {str(e)}", 'index': -1}])
         
-        return (downloaded_files, total_found, total_downloaded, failed_downloads, skipped_files)
+        safe_chapter_name = re.sub(r'[<>:"/\\|?*]', '_', chapter_name)
+        plan = chapter_plan(chapter_name, os.path.join(output_dir, safe_chapter_name), images, source_url=chapter_url)
+        return self.engine.download_chapter(self.session, plan, cancel_check=lambda: self.cancelled, deferred_retry=deferred_retry, desc=f"  {safe_chapter_name}")
     
     def get_chapter_image_count(self, chapter_url):
         try:
@@ -715,6 +648,12 @@ class MangaDownloader:
             chapter_dir = os.path.join(volume_dir, safe_chapter_name)
             
             if os.path.exists(chapter_dir):
+                status = manifest_status(chapter_dir, chapter['url'])
+                if status is not None:
+                    if status:
+                        complete_chapters += 1
+                    continue
+                
                 image_files = [f for f in os.listdir(chapter_dir) 
                              if f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp', '.gif'))]
                 downloaded_count = len(image_files)
@@ -773,119 +712,36 @@ class MangaDownloader:
         print(f"Capítulos encontrados: {len(chapters)}")
         print(f"{'='*60}\n")
         
-        all_images = []
-        chapter_stats = []
-        
-        parallel_chapters = self.config.get('parallel_chapters', 1)
+        deferred_retry = DeferredRetryPool()
         
         def download_single_chapter(chapter, idx, total):
             if self.cancelled:
-                return ({'name': chapter['name'], 'total_found': 0, 'total_downloaded': 0, 'failed': 0, 'skipped': 0}, [])
-            try:
-                with self.print_lock:
-                    print(f"\n[Tomo {tomo_number}] [{idx}/{total}] Procesando: {chapter['name']}")
-                
-                result = self.download_chapter_images(chapter['url'], chapter['name'], volume_dir)
-                
-                if len(result) == 5:
-                    images, total_found, total_downloaded, failed, skipped = result
-                else:
-                    images, total_found, total_downloaded, failed = result
-                    skipped = 0
-                
-                stat = {
-                    'name': chapter['name'],
-                    'total_found': total_found,
-                    'total_downloaded': total_downloaded,
-                    'failed': len(failed),
-                    'skipped': skipped
-                }
-                
+                return (empty_stat(chapter['name']), [])
+            with self.print_lock:
+                print(f"\n[Tomo {tomo_number}] [{idx}/{total}] Procesando: {chapter['name']}")
+            
+            result = self.download_chapter_images(chapter['url'], chapter['name'], volume_dir, deferred_retry=deferred_retry)
+            stat = chapter_stat(chapter['name'], result)
+            total_found = stat['total_found']
+            total_downloaded = stat['total_downloaded']
+            
+            with self.print_lock:
                 if total_found > 0:
                     if total_downloaded == total_found:
-                        with self.print_lock:
-                            print(f"  [OK] {chapter['name']}: {total_downloaded}/{total_found} imágenes")
+                        print(f"  [OK] {chapter['name']}: {total_downloaded}/{total_found} imágenes")
                     else:
-                        with self.print_lock:
-                            print(f"  [ADVERTENCIA] {chapter['name']}: {total_downloaded}/{total_found} imágenes ({total_found - total_downloaded} fallaron)")
+                        print(f"  [ADVERTENCIA] {chapter['name']}: {total_downloaded}/{total_found} imágenes ({total_found - total_downloaded} fallaron)")
                 else:
-                    with self.print_lock:
-                        print(f"  [ADVERTENCIA] {chapter['name']}: No se encontraron imágenes")
-                
-                time.sleep(self.config['delay_between_chapters'])
-                return (stat, images)
-            except Exception as e:
-                with self.print_lock:
-                    print(f"  [ERROR] Error en capítulo {chapter['name']}: {str(e)}")
-                return ({
-                    'name': chapter['name'],
-                    'total_found': 0,
-                    'total_downloaded': 0,
-                    'failed': 1,
-                    'skipped': 0
-                }, [])
+                    print(f"  [ADVERTENCIA] {chapter['name']}: No se encontraron imágenes")
+            
+            self.pause('delay_between_chapters')
+            return (stat, result[0])
         
-        if parallel_chapters > 1 and len(chapters) > 1:
-            with ThreadPoolExecutor(max_workers=parallel_chapters) as executor:
-                futures = {executor.submit(download_single_chapter, chapter, idx+1, len(chapters)): idx 
-                          for idx, chapter in enumerate(chapters)}
-                
-                for future in as_completed(futures):
-                    if self.cancelled:
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        break
-                    idx = futures[future]
-                    try:
-                        stat, images = future.result()
-                        chapter_stats.append(stat)
-                        all_images.extend(images)
-                    except Exception as e:
-                        with self.print_lock:
-                            print(f"  [ERROR] Error en capítulo: {e}")
-        else:
-            for idx, chapter in enumerate(tqdm(chapters, desc=f"Tomo {tomo_number}", unit="cap"), start=1):
-                if self.cancelled:
-                    break
-                try:
-                    print(f"\n[Tomo {tomo_number}] [{idx}/{len(chapters)}] Procesando: {chapter['name']}")
-                    result = self.download_chapter_images(chapter['url'], chapter['name'], volume_dir)
-                    
-                    if len(result) == 5:
-                        images, total_found, total_downloaded, failed, skipped = result
-                    else:
-                        images, total_found, total_downloaded, failed = result
-                        skipped = 0
-                    
-                    all_images.extend(images)
-                    
-                    chapter_stats.append({
-                        'name': chapter['name'],
-                        'total_found': total_found,
-                        'total_downloaded': total_downloaded,
-                        'failed': len(failed),
-                        'skipped': skipped
-                    })
-                    
-                    if total_found > 0:
-                        if total_downloaded == total_found:
-                            print(f"  [OK] Verificación: {total_downloaded}/{total_found} imágenes descargadas correctamente")
-                        else:
-                            print(f"  [ADVERTENCIA] Verificación: {total_downloaded}/{total_found} imágenes descargadas ({total_found - total_downloaded} fallaron)")
-                            if failed:
-                                print(f"  [ERROR] URLs que fallaron: {len(failed)}")
-                    else:
-                        print(f"  [ADVERTENCIA] No se encontraron imágenes en este capítulo")
-                except Exception as e:
-                    print(f"  [ERROR] Error al procesar capítulo {chapter['name']}: {str(e)}")
-                    chapter_stats.append({
-                        'name': chapter['name'],
-                        'total_found': 0,
-                        'total_downloaded': 0,
-                        'failed': 1,
-                        'skipped': 0
-                    })
-                
-                time.sleep(self.config['delay_between_chapters'])
+        results = self.engine.run_chapters(chapters, download_single_chapter, cancel_check=lambda: self.cancelled, on_error=lambda chapter: (empty_stat(chapter['name'], failed=1), []))
+        chapter_stats = [stat for stat, images in results]
+        all_images = [image for stat, images in results for image in images]
+        
+        apply_recovered(chapter_stats, self.engine.drain_deferred(self.session, deferred_retry, cancel_check=lambda: self.cancelled))
         
         if all_images or any(stat.get('total_downloaded', 0) > 0 for stat in chapter_stats):
             print(f"\n{'='*60}")
@@ -901,23 +757,20 @@ class MangaDownloader:
             
             sorted_stats = sorted(chapter_stats, key=get_chapter_sort_key)
             
-            failed_chapters = []
             for stat in sorted_stats:
                 total_found = stat.get('total_found', 0)
                 total_downloaded = stat.get('total_downloaded', 0)
                 status_icon = "[OK]" if total_downloaded == total_found and total_found > 0 else "[ERROR]"
                 print(f"{status_icon} Tomo {tomo_number}, {stat['name']}: {total_downloaded}/{total_found}")
-                
-                if total_downloaded < total_found:
-                    failed_chapters.append({
-                        'tomo_number': tomo_number,
-                        'chapter_name': stat['name'],
-                        'downloaded': total_downloaded,
-                        'total': total_found
-                    })
+            
+            failed_chapters = collect_failed_chapters(sorted_stats, tomo_number)
             
             print(f"{'='*60}")
             print(f"\n[OK] Descarga completada: {os.path.abspath(volume_dir)}")
+            print(format_pool_stats(self.session))
+            wait_stats = format_wait_stats('inventario_oculto')
+            if wait_stats:
+                print(wait_stats)
             return {
                 'dir': volume_dir,
                 'failed_chapters': failed_chapters
@@ -952,18 +805,13 @@ def main():
     
     debug_mode = '--debug' in sys.argv or '-d' in sys.argv
     
-    use_selenium = True
-    
     if not SELENIUM_AVAILABLE:
-        print("[ERROR] Selenium no esta disponible.")
-        print("  Instala Selenium con: pip install selenium")
-        print("  Tambien necesitas tener Chrome/Chromium instalado")
-        sys.exit(1)
+        print("[ADVERTENCIA] Selenium no está disponible, solo se intentará por HTTP.")
     
-    html_content = downloader.get_page(url, use_selenium=use_selenium)
+    html_content = downloader.get_listing_page(url)
     
     if not html_content:
-        print("Error: No se pudo descargar la página con Selenium")
+        print("Error: No se pudo descargar la página ni por HTTP ni con Selenium")
         print("  Verifica que Chrome/Chromium esté instalado")
         print("  ChromeDriver se descarga automáticamente en versiones recientes de Selenium")
         sys.exit(1)
@@ -1140,7 +988,7 @@ def main():
                     print(f"\n[ERROR] No se pudieron descargar las imágenes para el Tomo {tomo_number}")
                 
                 if idx < total_tomos:
-                    time.sleep(config['delay_between_volumes'])
+                    downloader.pause('delay_between_volumes')
     except KeyboardInterrupt:
         print("\n[INFO] Descarga cancelada por el usuario (Ctrl+C)")
         downloader.cancel()
@@ -616,7 +616,7 @@ class MangaDownloaderGUI:
                 if self.is_loading_cancelled:
                     return
                 
-                html_content = self.downloader.get_page(url, use_selenium=True)
+                html_content = self.downloader.get_listing_page(url)
                 
                 if self.is_loading_cancelled:
                     return
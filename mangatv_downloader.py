@@ -4,28 +4,20 @@ import re
 import json
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
 import time
 import base64
-from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock, Semaphore
-
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
-
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+from threading import Lock
+from http_utils import create_session, format_pool_stats
+from rate_limit import get_rate_limiter
+from page_cache import get_page_cache
+from fetch_strategy import get_fetch_strategy, complete_listing
+from session_bridge import SessionBridge
+from download_engine import get_download_engine, chapter_plan, chapter_stat, collect_failed_chapters
+from browser_pool import SELENIUM_AVAILABLE, get_driver_pool, block_requests, NetworkRecorder
+from selenium_waits import WaitEngine, format_wait_stats
+from fast_extract import stream_matches, find_first, has_class, element_text
 
 
 def load_config():
@@ -116,12 +108,14 @@ class MangaTVDownloader:
     def __init__(self, base_url, config):
         self.base_url = base_url
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        max_connections = config.get('parallel_tomos', 1) * config.get('parallel_chapters', 1) * config.get('parallel_images', 1)
-        self.connection_semaphore = Semaphore(min(max_connections, 50))
+        self.rate_limiter = get_rate_limiter(config)
+        self.session = create_session(config, rate_limiter=self.rate_limiter)
+        self.page_cache = get_page_cache(config)
+        self.fetch_strategy = get_fetch_strategy(config)
+        self.session_bridge = SessionBridge(self.session, 'mangatv', config)
+        self.driver_pool = get_driver_pool(config, site='mangatv')
+        self.reader_pool = get_driver_pool(config, 'reader', 'mangatv')
+        self.engine = get_download_engine(config)
         self.print_lock = Lock()
         self.cancelled = False
         self.cancelled = False
@@ -129,11 +123,17 @@ class MangaTVDownloader:
     def cancel(self):
         self.cancelled = True
     
+    def pause(self, delay_key):
+        if not self.rate_limiter.has_limit(self.base_url):
+            time.sleep(self.config.get(delay_key, 0))
+    
     def get_page(self, url, use_selenium=False):
         if use_selenium and SELENIUM_AVAILABLE:
             return self.get_page_selenium(url)
         
         try:
+            if self.page_cache:
+                return self.page_cache.get(self.session, url, timeout=self.config['timeout'])
             response = self.session.get(url, timeout=self.config['timeout'])
             response.raise_for_status()
             return response.text
@@ -141,63 +141,38 @@ class MangaTVDownloader:
             print(f"Error al descargar la página: {e}")
             return None
     
+    def get_listing_page(self, url):
+        return self.fetch_strategy.fetch(
+            'mangatv', 'listado',
+            lambda use_selenium: self.get_page(url, use_selenium=use_selenium),
+            complete_listing(lambda html: self.parse_volumes(html).get('volumes'), r'id=["\']?chapterlist\b'),
+            selenium_available=SELENIUM_AVAILABLE,
+            bridge=self.session_bridge
+        )
+    
     def get_page_selenium(self, url):
         if not SELENIUM_AVAILABLE:
             print("[ERROR] Selenium no esta disponible. Instala con: pip install selenium")
             return None
         
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--disable-cache')
-        options.add_argument('--disable-application-cache')
-        options.add_argument('--disable-offline-load-stale-cache')
-        options.add_argument('--disk-cache-size=0')
-        options.add_argument('--media-cache-size=0')
-        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        
-        prefs = {
-            "profile.default_content_setting_values": {
-                "images": 2
-            },
-            "profile.managed_default_content_settings": {
-                "images": 2
-            }
-        }
-        options.add_experimental_option("prefs", prefs)
-        
         driver = None
         try:
-            driver = webdriver.Chrome(options=options)
-            driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': True})
+            driver = self.driver_pool.acquire()
+            block_requests(driver, self.config, 'mangatv')
             driver.get(url)
+            wait = WaitEngine(driver, 'mangatv', self.config)
             
-            try:
-                WebDriverWait(driver, self.config['selenium_wait_time']).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-            except:
-                pass
-            
-            time.sleep(self.config.get('selenium_extra_wait', 2))
-            
-            try:
-                WebDriverWait(driver, 10).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
-            except:
-                pass
+            wait.document_ready(timeout=self.config['selenium_wait_time'])
+            wait.network_idle(timeout=self.config.get('selenium_extra_wait', 2))
             
             html = driver.page_source
+            self.session_bridge.import_driver(driver)
             return html
         except Exception as e:
             print(f"Error con Selenium: {e}")
             return None
         finally:
-            if driver:
-                driver.quit()
+            self.driver_pool.release(driver)
     
     def get_manga_title(self, html_content):
         soup = BeautifulSoup(html_content, 'lxml')
@@ -251,8 +226,6 @@ class MangaTVDownloader:
         return "0"
     
     def parse_volumes(self, html_content, debug=False):
-        soup = BeautifulSoup(html_content, 'lxml')
-        
         if debug:
             script_dir = os.path.dirname(os.path.abspath(__file__))
             debug_file = os.path.join(script_dir, 'resources', 'debug', 'debug_html_mangatv.html')
@@ -262,6 +235,86 @@ class MangaTVDownloader:
             print(f"Tamaño del HTML: {len(html_content)} caracteres")
             print(f"  HTML guardado en '{debug_file}' para inspección")
         
+        chapters_by_number = None
+        if self.config.get('fast_extract', True):
+            chapters_by_number = self.collect_chapters_stream(html_content)
+            if debug and chapters_by_number:
+                print(f"\n[OK] div.eplister#chapterlist leído en streaming")
+        
+        if not chapters_by_number:
+            chapters_by_number = self.collect_chapters_soup(html_content, debug)
+        if chapters_by_number is None:
+            return {'volumes': [], 'common_scanlations': {}}
+        
+        return self.build_volumes(chapters_by_number, debug)
+    
+    def chapter_option(self, chapter_url, chapter_number_text, scanlation_text):
+        if not chapter_url.startswith('http'):
+            chapter_url = urljoin(self.base_url, chapter_url)
+        
+        chapter_num_match = re.search(r'Capítulo\s*(\d+\.?\d*)', chapter_number_text, re.IGNORECASE)
+        if not chapter_num_match:
+            chapter_num_match = re.search(r'(\d+\.?\d*)', chapter_number_text)
+        
+        if chapter_num_match:
+            try:
+                chapter_num = float(chapter_num_match.group(1))
+            except:
+                chapter_num = 0.0
+        else:
+            chapter_num = 0.0
+        
+        chapter_name = f"Capítulo {chapter_num:g}" if chapter_num % 1 == 0 else f"Capítulo {chapter_num}"
+        
+        return {
+            'name': chapter_name,
+            'scanlation': scanlation_text,
+            'url': chapter_url,
+            'number': chapter_num
+        }
+    
+    def chapter_from_element(self, li):
+        chbox = find_first(li, 'div', lambda node: has_class(node, 'chbox'))
+        if chbox is None:
+            return None
+        
+        dt = find_first(chbox, 'div', lambda node: has_class(node, 'dt'))
+        link = find_first(dt, 'a', lambda node: has_class(node, 'dload')) if dt is not None else None
+        if link is None or not link.get('href'):
+            return None
+        
+        eph_num = find_first(chbox, 'div', lambda node: has_class(node, 'eph-num'))
+        if eph_num is None:
+            return None
+        
+        chapternum_spans = [span for span in eph_num.iterdescendants('span') if has_class(span, 'chapternum')]
+        if len(chapternum_spans) < 2:
+            return None
+        
+        return self.chapter_option(link.get('href'), element_text(chapternum_spans[0]), element_text(chapternum_spans[1]))
+    
+    def collect_chapters_stream(self, html_content):
+        chapters_by_number = {}
+        
+        def is_chapter_list(element):
+            return element.tag == 'div' and element.get('id') == 'chapterlist' and has_class(element, 'eplister')
+        
+        def is_chapter_li(element):
+            parent = element.getparent()
+            return element.tag == 'li' and parent is not None and parent.tag == 'ul' and has_class(parent, 'clstyle')
+        
+        def add_chapter(li):
+            option = self.chapter_from_element(li)
+            if option:
+                chapters_by_number.setdefault(option['number'], []).append(option)
+        
+        if not stream_matches(html_content, is_chapter_list, is_chapter_li, add_chapter):
+            return None
+        return chapters_by_number
+    
+    def collect_chapters_soup(self, html_content, debug=False):
+        soup = BeautifulSoup(html_content, 'lxml')
+        
         chapter_list = soup.find('div', class_='eplister', id='chapterlist')
         if not chapter_list:
             if debug:
@@ -277,7 +330,7 @@ class MangaTVDownloader:
                 print(f"  Total de divs con 'chapter' en id: {len(chapterlist_divs)}")
                 for idx, div in enumerate(chapterlist_divs[:5]):
                     print(f"    {idx+1}. id={div.get('id')}, clases={div.get('class', [])}")
-            return {'volumes': [], 'common_scanlations': {}}
+            return None
         
         if debug:
             print(f"\n[OK] div.eplister#chapterlist encontrado")
@@ -293,7 +346,7 @@ class MangaTVDownloader:
                 
                 all_uls_doc = soup.find_all('ul', class_='clstyle')
                 print(f"  Total de ul.clstyle en todo el documento: {len(all_uls_doc)}")
-            return {'volumes': [], 'common_scanlations': {}}
+            return None
         
         if debug:
             print(f"[OK] ul.clstyle encontrado")
@@ -319,8 +372,6 @@ class MangaTVDownloader:
                 continue
             
             chapter_url = link.get('href')
-            if not chapter_url.startswith('http'):
-                chapter_url = urljoin(self.base_url, chapter_url)
             
             eph_num = chbox.find('div', class_='eph-num')
             if not eph_num:
@@ -334,35 +385,20 @@ class MangaTVDownloader:
             
             processed_count += 1
             
-            chapter_number_text = chapternum_spans[0].get_text(strip=True)
-            scanlation_text = chapternum_spans[1].get_text(strip=True)
-            
-            chapter_num_match = re.search(r'Capítulo\s*(\d+\.?\d*)', chapter_number_text, re.IGNORECASE)
-            if not chapter_num_match:
-                chapter_num_match = re.search(r'(\d+\.?\d*)', chapter_number_text)
-            
-            if chapter_num_match:
-                try:
-                    chapter_num = float(chapter_num_match.group(1))
-                except:
-                    chapter_num = 0.0
-            else:
-                chapter_num = 0.0
+            option = self.chapter_option(chapter_url, chapternum_spans[0].get_text(strip=True), chapternum_spans[1].get_text(strip=True))
             
-            chapter_name = f"Capítulo {chapter_num:g}" if chapter_num % 1 == 0 else f"Capítulo {chapter_num}"
+            if option['number'] not in chapters_by_number:
+                chapters_by_number[option['number']] = []
             
-            if chapter_num not in chapters_by_number:
-                chapters_by_number[chapter_num] = []
-            
-            chapters_by_number[chapter_num].append({
-                'name': chapter_name,
-                'scanlation': scanlation_text,
-                'url': chapter_url,
-                'number': chapter_num
-            })
+            chapters_by_number[option['number']].append(option)
         
         if debug:
             print(f"\n[DEBUG] Capítulos procesados: {processed_count}, omitidos: {skipped_count}")
+        
+        return chapters_by_number
+    
+    def build_volumes(self, chapters_by_number, debug=False):
+        if debug:
             print(f"  Capítulos únicos encontrados: {len(chapters_by_number)}")
             if chapters_by_number:
                 print(f"  Primeros 3 capítulos encontrados:")
@@ -434,6 +470,7 @@ class MangaTVDownloader:
         
         return result
     
+    
     def select_chapter_option(self, chapter_name, options):
         print(f"\n{'='*60}")
         print(f"Múltiples opciones encontradas para {chapter_name}:")
@@ -457,190 +494,113 @@ class MangaTVDownloader:
             except KeyboardInterrupt:
                 return None
     
-    def convert_webp_to_jpg(self, webp_path, jpg_path, quality=95):
-        try:
-            if not PIL_AVAILABLE:
-                return False
-            
-            img = Image.open(webp_path)
-            
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            img.save(jpg_path, 'JPEG', quality=quality, optimize=True)
-            return True
-        except Exception as e:
-            return False
-    
-    def download_image_with_retry(self, img_url, filepath, max_retries=None, referer_url=None):
-        if max_retries is None:
-            max_retries = self.config['retry_attempts']
+    def extract_images_from_html(self, html_content, chapter_url):
+        images = []
         
-        headers = {}
-        if referer_url:
-            headers['Referer'] = referer_url
+        base64_pattern = r'Ly9[a-zA-Z0-9+/=]{60,}'
+        base64_strings = re.findall(base64_pattern, html_content)
         
-        for attempt in range(max_retries):
-            if self.cancelled:
-                return False, 0, filepath
-            
+        for b64 in base64_strings:
             try:
-                response = self.session.get(img_url, timeout=self.config['timeout'], headers=headers)
-                response.raise_for_status()
-                
-                content = response.content
-                file_size = len(content)
-                
-                if file_size == 0:
-                    raise ValueError(f"Archivo vacío: {file_size} bytes")
+                if len(b64) % 4 != 0:
+                    padding = 4 - (len(b64) % 4)
+                    b64 = b64 + '=' * padding
+                decoded_url = base64.b64decode(b64).decode('utf-8')
                 
-                original_ext = os.path.splitext(filepath)[1].lower()
-                
-                with open(filepath, 'wb') as f:
-                    f.write(content)
-                
-                if original_ext == '.webp' and PIL_AVAILABLE:
-                    base_name = os.path.basename(filepath)
-                    if '-webp' in base_name:
-                        jpg_filename = base_name.replace('-webp', '').replace('.webp', '.jpg')
-                    else:
-                        jpg_filename = base_name.replace('.webp', '.jpg')
-                    jpg_filepath = os.path.join(os.path.dirname(filepath), jpg_filename)
-                    
-                    if self.convert_webp_to_jpg(filepath, jpg_filepath, quality=95):
-                        try:
-                            os.remove(filepath)
-                        except:
-                            pass
-                        filepath = jpg_filepath
-                        file_size = os.path.getsize(filepath)
-                
-                return True, file_size, filepath
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep(self.config['retry_delay'])
-                else:
-                    return False, 0, filepath
+                if decoded_url.startswith('//') and ('mangatv.net' in decoded_url or 'library' in decoded_url):
+                    if not decoded_url.startswith('http'):
+                        decoded_url = 'https:' + decoded_url
+                    if decoded_url not in images:
+                        images.append(decoded_url)
+            except:
+                continue
         
-        return False, 0, filepath
-    
-    def download_image_with_semaphore(self, img_url, filepath, img_index, total, referer_url=None):
-        with self.connection_semaphore:
-            if self.cancelled:
-                return (img_index, False, None, filepath)
-            
-            success, file_size, returned_filepath = self.download_image_with_retry(img_url, filepath, referer_url=referer_url)
-            
-            if success and file_size > 0:
-                return (img_index, True, file_size, returned_filepath)
-            else:
-                return (img_index, False, None, filepath)
+        if images:
+            images.reverse()
+            return images
+        
+        soup = BeautifulSoup(html_content, 'lxml')
+        reader_area = soup.find('div', id='readerarea')
+        
+        if reader_area:
+            img_tags = reader_area.find_all('img')
+            for img_tag in img_tags:
+                img_url = img_tag.get('src', '') or img_tag.get('data-src', '') or img_tag.get('data-lazy-src', '') or img_tag.get('data-original', '')
+                if img_url:
+                    if not img_url.startswith('http'):
+                        img_url = urljoin(chapter_url, img_url)
+                    if img_url not in images:
+                        images.append(img_url)
+        return images
     
     def download_chapter_images(self, chapter_url, chapter_name, output_dir):
         if self.cancelled:
             return ([], 0, 0, [], 0)
         
-        if not SELENIUM_AVAILABLE:
-            return ([], 0, 0, [{'url': chapter_url, 'error': "Selenium no está disponible", 'index': -1}], 0)
-        
-        driver = None
         images = []
+        methods = self.fetch_strategy.order('mangatv', 'capitulo', self.session_bridge)
         
-        try:
-            options = Options()
-            options.add_argument('--headless')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-gpu')
-            options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-            
-            driver = webdriver.Chrome(options=options)
-            driver.get(chapter_url)
+        if 'http' in methods:
+            html_content = self.get_page(chapter_url)
+            if html_content:
+                images = self.extract_images_from_html(html_content, chapter_url)
+            self.fetch_strategy.record('mangatv', 'capitulo', 'http', bool(images), self.session_bridge)
+        
+        if not images and 'selenium' in methods:
+            if not SELENIUM_AVAILABLE:
+                return ([], 0, 0, [{'url': chapter_url, 'error': "Selenium no está disponible", 'index': -1}], 0)
             
+            driver = None
             try:
-                WebDriverWait(driver, self.config['selenium_wait_time']).until(
-                    EC.presence_of_element_located((By.ID, "readerarea"))
-                )
-            except:
-                pass
-            
-            time.sleep(self.config.get('selenium_extra_wait', 3))
-            
-            html_content = driver.page_source
-            
-            base64_pattern = r'Ly9[a-zA-Z0-9+/=]{60,}'
-            base64_strings = re.findall(base64_pattern, html_content)
-            
-            base64_images = []
-            for b64 in base64_strings:
-                try:
-                    if len(b64) % 4 != 0:
-                        padding = 4 - (len(b64) % 4)
-                        b64 = b64 + '=' * padding
-                    decoded_url = base64.b64decode(b64).decode('utf-8')
-                    
-                    if decoded_url.startswith('//') and ('mangatv.net' in decoded_url or 'library' in decoded_url):
-                        if not decoded_url.startswith('http'):
-                            decoded_url = 'https:' + decoded_url
-                        if decoded_url not in base64_images:
-                            base64_images.append(decoded_url)
-                except:
-                    continue
-            
-            if base64_images:
-                base64_images.reverse()
-                images.extend(base64_images)
-            
-            if not images:
-                try:
-                    js_images = driver.execute_script("""
-                        var images = [];
-                        var readerArea = document.getElementById('readerarea');
-                        if (readerArea) {
-                            var imgs = readerArea.getElementsByTagName('img');
-                            for (var i = 0; i < imgs.length; i++) {
-                                var src = imgs[i].src || imgs[i].getAttribute('data-src') || imgs[i].getAttribute('data-lazy-src') || imgs[i].getAttribute('data-original');
-                                if (src && src.trim()) {
-                                    images.push(src);
+                driver = self.reader_pool.acquire()
+                block_requests(driver, self.config, 'mangatv', block_images=self.config.get('selenium_block_images', True))
+                recorder = NetworkRecorder(driver)
+                driver.get(chapter_url)
+                wait = WaitEngine(driver, 'mangatv', self.config, cancel_check=lambda: self.cancelled)
+                
+                wait.selector_present("#readerarea", timeout=self.config['selenium_wait_time'], stage='lector')
+                wait.count_stable("#readerarea img", timeout=self.config.get('selenium_extra_wait', 3))
+                
+                images = self.extract_images_from_html(driver.page_source, chapter_url)
+                
+                if not images:
+                    try:
+                        js_images = driver.execute_script("""
+                            var images = [];
+                            var readerArea = document.getElementById('readerarea');
+                            if (readerArea) {
+                                var imgs = readerArea.getElementsByTagName('img');
+                                for (var i = 0; i < imgs.length; i++) {
+                                    var src = imgs[i].src || imgs[i].getAttribute('data-src') || imgs[i].getAttribute('data-lazy-src') || imgs[i].getAttribute('data-original');
+                                    if (src && src.trim()) {
+                                        images.push(src);
+                                    }
                                 }
                             }
-                        }
-                        return images;
-                    """)
-                    if js_images:
-                        for img_url in js_images:
-                            if not img_url.startswith('http'):
-                                img_url = urljoin(chapter_url, img_url)
-                            if img_url not in images:
-                                images.append(img_url)
-                except:
-                    pass
-            
-            if not images:
-                soup = BeautifulSoup(html_content, 'lxml')
-                reader_area = soup.find('div', id='readerarea')
+                            return images;
+                        """)
+                        if js_images:
+                            for img_url in js_images:
+                                if not img_url.startswith('http'):
+                                    img_url = urljoin(chapter_url, img_url)
+                                if img_url not in images:
+                                    images.append(img_url)
+                    except:
+                        pass
                 
-                if reader_area:
-                    img_tags = reader_area.find_all('img')
-                    for img_tag in img_tags:
-                        img_url = img_tag.get('src', '') or img_tag.get('data-src', '') or img_tag.get('data-lazy-src', '') or img_tag.get('data-original', '')
-                        if img_url:
-                            if not img_url.startswith('http'):
-                                img_url = urljoin(chapter_url, img_url)
-                            if img_url not in images:
-                                images.append(img_url)
-            
-        except Exception as e:
-            return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al obtener HTML: {str(e)}", 'index': -1}], 0)
-        finally:
-            if driver:
-                driver.quit()
+                if not images:
+                    for img_url in recorder.image_urls():
+                        if ('mangatv.net' in img_url or 'library' in img_url) and img_url not in images:
+                            images.append(img_url)
+                
+                if images:
+                    self.session_bridge.import_driver(driver)
+                
+            except Exception as e:
+                return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al obtener HTML: {str(e)}", 'index': -1}], 0)
+            finally:
+                self.reader_pool.release(driver)
+            self.fetch_strategy.record('mangatv', 'capitulo', 'selenium', bool(images), self.session_bridge)
         
         safe_chapter_name = re.sub(r'[<>:"/\\|?*]', '_', chapter_name)
         output_basename = os.path.basename(output_dir)
@@ -650,162 +610,9 @@ class MangaTVDownloader:
             chapter_dir = output_dir
         else:
             chapter_dir = os.path.join(output_dir, safe_chapter_name)
-        os.makedirs(chapter_dir, exist_ok=True)
-        
-        total_found = len(images)
-        if total_found == 0:
-            return ([], 0, 0, [], 0)
-        
-        downloaded_files = [None] * total_found
-        failed_downloads = []
-        skipped_files = 0
-        
-        parallel_images = self.config.get('parallel_images', 1)
         
-        def prepare_download(img_index, img_url):
-            parsed_url = urlparse(img_url)
-            filename = os.path.basename(parsed_url.path)
-            
-            if not filename or '.' not in filename:
-                path_part = parsed_url.path
-                if '.' in path_part:
-                    ext = path_part.split('.')[-1].lower()
-                    if ext in ['png', 'jpg', 'jpeg', 'webp', 'gif']:
-                        filename = f"{img_index+1:03d}-webp.{ext}"
-                    else:
-                        filename = f"{img_index+1:03d}-webp.webp"
-                else:
-                    filename = f"{img_index+1:03d}-webp.webp"
-            else:
-                ext = filename.split('.')[-1].lower()
-                if ext not in ['png', 'jpg', 'jpeg', 'webp', 'gif']:
-                    ext = 'webp'
-                filename = f"{img_index+1:03d}-webp.{ext}"
-            
-            if '?' in filename:
-                filename = filename.split('?')[0]
-            
-            filepath = os.path.join(chapter_dir, filename)
-            return (img_index, img_url, filepath)
-        
-        download_tasks = []
-        for idx, img_url in enumerate(images):
-            img_index, img_url, filepath = prepare_download(idx, img_url)
-            
-            base_name = os.path.basename(filepath)
-            if '-webp' in base_name:
-                jpg_filename = base_name.replace('-webp', '').replace('.webp', '.jpg')
-            else:
-                jpg_filename = base_name.replace('.webp', '.jpg') if filepath.endswith('.webp') else base_name
-            jpg_filepath = os.path.join(chapter_dir, jpg_filename)
-            
-            if os.path.exists(jpg_filepath) and os.path.getsize(jpg_filepath) > 0:
-                downloaded_files[img_index] = jpg_filepath
-                skipped_files += 1
-            elif os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                if filepath.endswith('.webp') and PIL_AVAILABLE:
-                    if self.convert_webp_to_jpg(filepath, jpg_filepath, quality=95):
-                        try:
-                            os.remove(filepath)
-                        except:
-                            pass
-                        downloaded_files[img_index] = jpg_filepath
-                        skipped_files += 1
-                else:
-                    downloaded_files[img_index] = filepath
-                    skipped_files += 1
-            else:
-                download_tasks.append((img_index, img_url, filepath))
-        
-        if download_tasks:
-            if parallel_images > 1:
-                with ThreadPoolExecutor(max_workers=parallel_images) as executor:
-                    futures = {executor.submit(self.download_image_with_semaphore, img_url, filepath, idx, total_found, chapter_url): (idx, img_url) 
-                              for idx, img_url, filepath in download_tasks}
-                    
-                    for future in tqdm(as_completed(futures), total=len(download_tasks), desc=f"  {safe_chapter_name}", leave=False, unit="img"):
-                        if self.cancelled:
-                            executor.shutdown(wait=False, cancel_futures=True)
-                            return ([], total_found, 0, [], 0)
-                        idx, img_url = futures[future]
-                        try:
-                            img_index, success, result, filepath = future.result()
-                            if success:
-                                downloaded_files[img_index] = filepath
-                            else:
-                                failed_downloads.append({'url': img_url, 'error': 'Falló descarga', 'index': img_index})
-                        except Exception as e:
-                            failed_downloads.append({'url': img_url, 'error': str(e), 'index': img_index})
-            else:
-                for img_index, img_url, filepath in tqdm(download_tasks, desc=f"  {safe_chapter_name}", leave=False, unit="img"):
-                    if self.cancelled:
-                        return ([], total_found, 0, [], 0)
-                    success, file_size, returned_filepath = self.download_image_with_retry(img_url, filepath, referer_url=chapter_url)
-                    if success:
-                        downloaded_files[img_index] = returned_filepath
-                    else:
-                        failed_downloads.append({'url': img_url, 'error': 'Falló descarga', 'index': img_index})
-        
-        files_with_index = []
-        for idx, filepath in enumerate(downloaded_files):
-            if filepath is not None and os.path.exists(filepath):
-                files_with_index.append((idx, filepath))
-        
-        files_with_index.sort(key=lambda x: x[0])
-        
-        renamed_files = []
-        for original_idx, old_filepath in files_with_index:
-            if not os.path.exists(old_filepath):
-                continue
-            
-            file_ext = os.path.splitext(old_filepath)[1].lower()
-            if not file_ext or file_ext not in ['.png', '.jpg', '.jpeg', '.webp', '.gif']:
-                file_ext = '.jpg'
-            
-            seq_num = original_idx + 1
-            new_filename = f"{seq_num:03d}{file_ext}"
-            new_filepath = os.path.join(chapter_dir, new_filename)
-            
-            if old_filepath != new_filepath:
-                if os.path.exists(new_filepath):
-                    temp_name = f"temp_{seq_num:03d}_{hash(old_filepath) % 10000}{file_ext}"
-                    temp_filepath = os.path.join(chapter_dir, temp_name)
-                    try:
-                        os.rename(old_filepath, temp_filepath)
-                        old_filepath = temp_filepath
-                    except Exception as e:
-                        renamed_files.append(old_filepath)
-                        continue
-                
-                try:
-                    os.rename(old_filepath, new_filepath)
-                    renamed_files.append(new_filepath)
-                except Exception as e:
-                    renamed_files.append(old_filepath)
-            else:
-                renamed_files.append(new_filepath)
-        
-        downloaded_files = renamed_files
-        total_downloaded = len(downloaded_files)
-        
-        for file in os.listdir(chapter_dir):
-            file_path = os.path.join(chapter_dir, file)
-            if not os.path.isfile(file_path):
-                continue
-            
-            file_lower = file.lower()
-            if not file_lower.endswith(('.png', '.jpg', '.jpeg', '.webp', '.gif')):
-                continue
-            
-            base_name = os.path.splitext(file)[0]
-            if not re.match(r'^\d{3}$', base_name):
-                if file.startswith('temp_'):
-                    try:
-                        os.remove(file_path)
-                    except:
-                        pass
-        
-        return (downloaded_files, total_found, total_downloaded, failed_downloads, skipped_files)
+        plan = chapter_plan(chapter_name, chapter_dir, images, referer=chapter_url, convert_webp=True, source_url=chapter_url)
+        return self.engine.download_chapter(self.session, plan, cancel_check=lambda: self.cancelled, desc=f"  {safe_chapter_name}")
     
     def sort_chapters_by_number(self, chapters):
         def get_sort_key(chapter):
@@ -854,11 +661,6 @@ class MangaTVDownloader:
         print(f"Descargando: {volume_name}")
         print(f"{'='*60}\n")
         
-        all_images = []
-        chapter_stats = []
-        
-        parallel_chapters = self.config.get('parallel_chapters', 1)
-        
         def download_single_chapter(chapter, idx, total):
             if self.cancelled:
                 return ({'name': chapter['name'], 'total_found': 0, 'total_downloaded': 0, 'failed': 0, 'skipped': 0}, [])
@@ -881,19 +683,10 @@ class MangaTVDownloader:
                 
                 result = self.download_chapter_images(chapter['url'], chapter['name'], chapter_dir)
                 
-                if len(result) == 5:
-                    images, total_found, total_downloaded, failed, skipped = result
-                else:
-                    images, total_found, total_downloaded, failed = result
-                    skipped = 0
-                
-                stat = {
-                    'name': chapter['name'],
-                    'total_found': total_found,
-                    'total_downloaded': total_downloaded,
-                    'failed': len(failed),
-                    'skipped': skipped
-                }
+                images = result[0]
+                stat = chapter_stat(chapter['name'], result)
+                total_found = stat['total_found']
+                total_downloaded = stat['total_downloaded']
                 
                 if total_found > 0:
                     if total_downloaded == total_found:
@@ -906,7 +699,7 @@ class MangaTVDownloader:
                     with self.print_lock:
                         print(f"  [ADVERTENCIA] {chapter['name']}: No se encontraron imágenes")
                 
-                time.sleep(self.config['delay_between_chapters'])
+                self.pause('delay_between_chapters')
                 return (stat, images)
             except Exception as e:
                 with self.print_lock:
@@ -919,30 +712,9 @@ class MangaTVDownloader:
                     'skipped': 0
                 }, [])
         
-        if parallel_chapters > 1 and len(chapters) > 1:
-            with ThreadPoolExecutor(max_workers=parallel_chapters) as executor:
-                futures = {executor.submit(download_single_chapter, chapter, idx+1, len(chapters)): idx 
-                          for idx, chapter in enumerate(chapters)}
-                
-                for future in as_completed(futures):
-                    if self.cancelled:
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        break
-                    idx = futures[future]
-                    try:
-                        stat, images = future.result()
-                        chapter_stats.append(stat)
-                        all_images.extend(images)
-                    except Exception as e:
-                        with self.print_lock:
-                            print(f"[ERROR] Error al procesar capítulo: {e}")
-        else:
-            for idx, chapter in enumerate(chapters, start=1):
-                if self.cancelled:
-                    break
-                stat, images = download_single_chapter(chapter, idx, len(chapters))
-                chapter_stats.append(stat)
-                all_images.extend(images)
+        results = self.engine.run_chapters(chapters, download_single_chapter, cancel_check=lambda: self.cancelled)
+        chapter_stats = [stat for stat, images in results]
+        all_images = [image for stat, images in results for image in images]
         
         if all_images:
             print(f"\n{'='*60}")
@@ -958,7 +730,6 @@ class MangaTVDownloader:
             
             sorted_stats = sorted(chapter_stats, key=get_chapter_sort_key)
             
-            failed_chapters = []
             tomo_number = None
             if is_tomo_structure:
                 tomo_match = re.search(r'Tomo\s+(\d+)', volume_name)
@@ -970,19 +741,15 @@ class MangaTVDownloader:
                 total_downloaded = stat.get('total_downloaded', 0)
                 status_icon = "[OK]" if total_downloaded == total_found and total_found > 0 else "[ERROR]"
                 print(f"{status_icon} {stat['name']}: {total_downloaded}/{total_found}")
-                
-                if total_downloaded < total_found:
-                    failed_dict = {
-                        'chapter_name': stat['name'],
-                        'downloaded': total_downloaded,
-                        'total': total_found
-                    }
-                    if tomo_number is not None:
-                        failed_dict['tomo_number'] = tomo_number
-                    failed_chapters.append(failed_dict)
+            
+            failed_chapters = collect_failed_chapters(sorted_stats, tomo_number)
             
             print(f"{'='*60}")
             print(f"\n[OK] Descarga completada: {os.path.abspath(volume_dir)}")
+            print(format_pool_stats(self.session))
+            wait_stats = format_wait_stats('mangatv')
+            if wait_stats:
+                print(wait_stats)
             return {
                 'dir': volume_dir,
                 'failed_chapters': failed_chapters
@@ -1019,18 +786,13 @@ def main():
     
     print(f"\nDescargando información de: {url}")
     
-    use_selenium = True
-    
     if not SELENIUM_AVAILABLE:
-        print("[ERROR] Selenium no está disponible.")
-        print("  Instala Selenium con: pip install selenium")
-        print("  También necesitas tener Chrome/Chromium instalado")
-        sys.exit(1)
+        print("[ADVERTENCIA] Selenium no está disponible, solo se intentará por HTTP.")
     
-    html_content = downloader.get_page(url, use_selenium=use_selenium)
+    html_content = downloader.get_listing_page(url)
     
     if not html_content:
-        print("Error: No se pudo cargar la página con Selenium")
+        print("Error: No se pudo cargar la página ni por HTTP ni con Selenium")
         print("  Verifica que Chrome/Chromium esté instalado")
         sys.exit(1)
     
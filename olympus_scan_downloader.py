@@ -6,25 +6,18 @@ import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import time
-from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock, Semaphore
-
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
-
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+from threading import Lock
+from http_utils import create_session, format_pool_stats
+from rate_limit import get_rate_limiter
+from page_cache import get_page_cache
+from fetch_strategy import get_fetch_strategy, complete_listing
+from session_bridge import SessionBridge
+from deferred_retry import DeferredRetryPool
+from download_engine import get_download_engine, chapter_plan, chapter_stat, empty_stat, apply_recovered, collect_failed_chapters, manifest_status
+from fast_extract import OLYMPUS_IMAGES_XPATH, select_images
+from browser_pool import SELENIUM_AVAILABLE, get_driver_pool, block_requests
+from selenium_waits import WaitEngine, format_wait_stats
 
 
 def load_config():
@@ -97,23 +90,30 @@ class OlympusScanDownloader:
     def __init__(self, base_url, config):
         self.base_url = base_url
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        max_connections = config.get('parallel_tomos', 1) * config.get('parallel_chapters', 1) * config.get('parallel_images', 1)
-        self.connection_semaphore = Semaphore(min(max_connections, 50))
+        self.rate_limiter = get_rate_limiter(config)
+        self.session = create_session(config, rate_limiter=self.rate_limiter)
+        self.page_cache = get_page_cache(config)
+        self.fetch_strategy = get_fetch_strategy(config)
+        self.session_bridge = SessionBridge(self.session, 'olympus_scan', config)
+        self.driver_pool = get_driver_pool(config, site='olympus_scan')
+        self.engine = get_download_engine(config)
         self.print_lock = Lock()
         self.cancelled = False
     
     def cancel(self):
         self.cancelled = True
     
+    def pause(self, delay_key):
+        if not self.rate_limiter.has_limit(self.base_url):
+            time.sleep(self.config.get(delay_key, 0))
+    
     def get_page(self, url, use_selenium=False):
         if use_selenium and SELENIUM_AVAILABLE:
             return self.get_page_selenium(url)
         
         try:
+            if self.page_cache:
+                return self.page_cache.get(self.session, url, timeout=self.config['timeout'])
             response = self.session.get(url, timeout=self.config['timeout'])
             response.raise_for_status()
             return response.text
@@ -121,83 +121,39 @@ class OlympusScanDownloader:
             print(f"Error al descargar la página: {e}")
             return None
     
+    def get_listing_page(self, url):
+        return self.fetch_strategy.fetch(
+            'olympus_scan', 'listado',
+            lambda use_selenium: self.get_page(url, use_selenium=use_selenium),
+            complete_listing(self.parse_volumes, r'/capitulo/\d+'),
+            selenium_available=SELENIUM_AVAILABLE,
+            bridge=self.session_bridge
+        )
+    
     def get_page_selenium(self, url):
         if not SELENIUM_AVAILABLE:
             print("[ERROR] Selenium no esta disponible. Instala con: pip install selenium")
             return None
         
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--disable-cache')
-        options.add_argument('--disable-application-cache')
-        options.add_argument('--disable-offline-load-stale-cache')
-        options.add_argument('--disk-cache-size=0')
-        options.add_argument('--media-cache-size=0')
-        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        
-        prefs = {
-            "profile.default_content_setting_values": {
-                "images": 2
-            },
-            "profile.managed_default_content_settings": {
-                "images": 2
-            }
-        }
-        options.add_experimental_option("prefs", prefs)
-        
         driver = None
         try:
-            driver = webdriver.Chrome(options=options)
-            driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': True})
+            driver = self.driver_pool.acquire()
+            block_requests(driver, self.config, 'olympus_scan')
             driver.get(url)
+            wait = WaitEngine(driver, 'olympus_scan', self.config)
             
-            try:
-                WebDriverWait(driver, self.config['selenium_wait_time']).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-            except:
-                pass
-            
-            time.sleep(2)
-            
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            scroll_attempts = 0
-            max_scroll_attempts = 50
-            no_change_count = 0
-            
-            while scroll_attempts < max_scroll_attempts:
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1.5)
-                
-                new_height = driver.execute_script("return document.body.scrollHeight")
-                
-                if new_height == last_height:
-                    no_change_count += 1
-                    if no_change_count >= 3:
-                        break
-                else:
-                    no_change_count = 0
-                
-                last_height = new_height
-                scroll_attempts += 1
-            
-            driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(0.5)
-            
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
+            wait.document_ready(timeout=self.config['selenium_wait_time'])
+            wait.network_idle(timeout=2)
+            wait.scroll_to_end(max_scrolls=50)
             
             html = driver.page_source
+            self.session_bridge.import_driver(driver)
             return html
         except Exception as e:
             print(f"Error con Selenium: {e}")
             return None
         finally:
-            if driver:
-                driver.quit()
+            self.driver_pool.release(driver)
     
     def get_manhwa_title(self, html_content):
         soup = BeautifulSoup(html_content, 'lxml')
@@ -397,113 +353,16 @@ class OlympusScanDownloader:
         
         return volumes
     
-    def convert_webp_to_jpg(self, webp_path, jpg_path, quality=95):
-        try:
-            if not PIL_AVAILABLE:
-                return False
-            
-            img = Image.open(webp_path)
-            
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            img.save(jpg_path, 'JPEG', quality=quality, optimize=True)
-            return True
-        except Exception as e:
-            print(f"[ERROR] Error al convertir WebP a JPG: {e}")
-            return False
-    
-    def download_image_with_retry(self, img_url, filepath, max_retries=None):
-        if max_retries is None:
-            max_retries = self.config['retry_attempts']
-        
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(img_url, timeout=self.config['timeout'])
-                response.raise_for_status()
-                
-                content = response.content
-                file_size = len(content)
-                
-                if file_size == 0:
-                    raise ValueError(f"Archivo vacío: {file_size} bytes")
-                
-                temp_filepath = filepath
-                original_ext = os.path.splitext(filepath)[1].lower()
-                
-                with open(temp_filepath, 'wb') as f:
-                    f.write(content)
-                
-                if original_ext == '.webp' and PIL_AVAILABLE:
-                    base_name = os.path.basename(filepath)
-                    if '-webp' in base_name:
-                        jpg_filename = base_name.replace('-webp', '').replace('.webp', '.jpg')
-                    else:
-                        jpg_filename = base_name.replace('.webp', '.jpg')
-                    jpg_filepath = os.path.join(os.path.dirname(filepath), jpg_filename)
-                    
-                    if self.convert_webp_to_jpg(temp_filepath, jpg_filepath, quality=95):
-                        try:
-                            os.remove(temp_filepath)
-                        except:
-                            pass
-                        filepath = jpg_filepath
-                        file_size = os.path.getsize(filepath)
-                    else:
-                        if temp_filepath != filepath:
-                            os.rename(temp_filepath, filepath)
-                
-                return True, file_size
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep(self.config['retry_delay'])
-                else:
-                    return False, str(e)
-        
-        return False, "Max retries exceeded"
-    
-    def download_image_with_semaphore(self, img_url, filepath, img_index, total_images):
-        with self.connection_semaphore:
-            success, result = self.download_image_with_retry(img_url, filepath)
-            return (img_index, success, result, filepath)
-    
-    def download_chapter_images(self, chapter_url, chapter_name, output_dir):
-        try:
-            html_content = self.get_page(chapter_url)
-            if not html_content:
-                return ([], 0, 0, [])
-        except Exception as e:
-            return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al obtener HTML: {str(e)}", 'index': -1}])
+    def extract_images_soup(self, html_content, chapter_url):
+        soup = BeautifulSoup(html_content, 'lxml')
+        images = []
         
-        try:
-            soup = BeautifulSoup(html_content, 'lxml')
-            images = []
-            
-            section = soup.find('section')
-            if section:
-                img_divs = section.find_all('div', class_=lambda x: x and 'relative' in x)
-                for div in img_divs:
-                    img_tag = div.find('img')
-                    if img_tag:
-                        img_url = img_tag.get('src', '')
-                        if not img_url:
-                            continue
-                        
-                        if not img_url.startswith('http'):
-                            img_url = urljoin(chapter_url, img_url)
-                        
-                        if img_url not in images:
-                            images.append(img_url)
-            
-            if not images:
-                img_tags = soup.find_all('img', src=re.compile(r'\.webp'))
-                for img_tag in img_tags:
+        section = soup.find('section')
+        if section:
+            img_divs = section.find_all('div', class_=lambda x: x and 'relative' in x)
+            for div in img_divs:
+                img_tag = div.find('img')
+                if img_tag:
                     img_url = img_tag.get('src', '')
                     if not img_url:
                         continue
@@ -513,8 +372,38 @@ class OlympusScanDownloader:
                     
                     if img_url not in images:
                         images.append(img_url)
-        except Exception as e:
-            return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al parsear HTML: {str(e)}", 'index': -1}])
+        
+        if not images:
+            img_tags = soup.find_all('img', src=re.compile(r'\.webp'))
+            for img_tag in img_tags:
+                img_url = img_tag.get('src', '')
+                if not img_url:
+                    continue
+                
+                if not img_url.startswith('http'):
+                    img_url = urljoin(chapter_url, img_url)
+                
+                if img_url not in images:
+                    images.append(img_url)
+        
+        return images
+    
+    def extract_images_from_html(self, html_content, chapter_url):
+        images = []
+        if self.config.get('fast_extract', True):
+            for img_tag in select_images(html_content, OLYMPUS_IMAGES_XPATH):
+                img_url = img_tag.get('src', '')
+                if not img_url:
+                    continue
+                
+                if not img_url.startswith('http'):
+                    img_url = urljoin(chapter_url, img_url)
+                
+                if img_url not in images:
+                    images.append(img_url)
+        
+        if not images:
+            images = self.extract_images_soup(html_content, chapter_url)
         
         def extract_number(url):
             filename = os.path.basename(urlparse(url).path)
@@ -524,6 +413,20 @@ class OlympusScanDownloader:
             return 0
         
         images.sort(key=extract_number)
+        return images
+    
+    def download_chapter_images(self, chapter_url, chapter_name, output_dir, deferred_retry=None):
+        try:
+            html_content = self.get_page(chapter_url)
+            if not html_content:
+                return ([], 0, 0, [])
+        except Exception as e:
+            return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al obtener HTML: {str(e)}", 'index': -1}])
+        
+        try:
+            images = self.extract_images_from_html(html_content, chapter_url)
+        except Exception as e:
+            return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al parsear HTML: {str(e)}", 'index': -1}])
         
         safe_chapter_name = re.sub(r'[<>:"/\\|?*]', '_', chapter_name)
         output_basename = os.path.basename(output_dir)
@@ -533,218 +436,9 @@ class OlympusScanDownloader:
             chapter_dir = output_dir
         else:
             chapter_dir = os.path.join(output_dir, safe_chapter_name)
-        os.makedirs(chapter_dir, exist_ok=True)
-        
-        total_found = len(images)
-        if total_found == 0:
-            return ([], 0, 0, [])
-        
-        downloaded_files = [None] * total_found
-        failed_downloads = []
-        skipped_files = 0
-        
-        parallel_images = self.config.get('parallel_images', 1)
-        
-        def prepare_download(img_index, img_url):
-            parsed_url = urlparse(img_url)
-            filename = os.path.basename(parsed_url.path)
-            
-            if not filename or '.' not in filename:
-                path_part = parsed_url.path
-                if '.' in path_part:
-                    ext = path_part.split('.')[-1].lower()
-                    if ext in ['png', 'jpg', 'jpeg', 'webp', 'gif']:
-                        filename = f"{img_index+1:03d}-webp.{ext}"
-                    else:
-                        filename = f"{img_index+1:03d}-webp.webp"
-                else:
-                    filename = f"{img_index+1:03d}-webp.webp"
-            else:
-                ext = filename.split('.')[-1].lower()
-                if ext not in ['png', 'jpg', 'jpeg', 'webp', 'gif']:
-                    ext = 'webp'
-                filename = f"{img_index+1:03d}-webp.{ext}"
-            
-            if '?' in filename:
-                filename = filename.split('?')[0]
-            
-            filepath = os.path.join(chapter_dir, filename)
-            return (img_index, img_url, filepath)
-        
-        download_tasks = []
-        for idx, img_url in enumerate(images):
-            img_index, img_url, filepath = prepare_download(idx, img_url)
-            
-            base_name = os.path.basename(filepath)
-            if '-webp' in base_name:
-                jpg_filename = base_name.replace('-webp', '').replace('.webp', '.jpg')
-            else:
-                jpg_filename = base_name.replace('.webp', '.jpg') if filepath.endswith('.webp') else base_name
-            jpg_filepath = os.path.join(chapter_dir, jpg_filename)
-            
-            if os.path.exists(jpg_filepath) and os.path.getsize(jpg_filepath) > 0:
-                downloaded_files[img_index] = jpg_filepath
-                skipped_files += 1
-            elif os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                if filepath.endswith('.webp') and PIL_AVAILABLE:
-                    if self.convert_webp_to_jpg(filepath, jpg_filepath, quality=95):
-                        try:
-                            os.remove(filepath)
-                        except:
-                            pass
-                        downloaded_files[img_index] = jpg_filepath
-                        skipped_files += 1
-                else:
-                    downloaded_files[img_index] = filepath
-                    skipped_files += 1
-            else:
-                download_tasks.append((img_index, img_url, filepath))
-        
-        if download_tasks:
-            if parallel_images > 1:
-                with ThreadPoolExecutor(max_workers=parallel_images) as executor:
-                    futures = {executor.submit(self.download_image_with_semaphore, img_url, filepath, idx, total_found): (idx, img_url) 
-                              for idx, img_url, filepath in download_tasks}
-                    
-                    for future in tqdm(as_completed(futures), total=len(download_tasks), desc=f"  {safe_chapter_name}", leave=False, unit="img"):
-                        if self.cancelled:
-                            executor.shutdown(wait=False, cancel_futures=True)
-                            return ([], total_found, 0, [])
-                        idx, img_url = futures[future]
-                        try:
-                            img_index, success, result, filepath = future.result()
-                            if success:
-                                base_name = os.path.basename(filepath)
-                                if '-webp' in base_name:
-                                    jpg_filename = base_name.replace('-webp', '').replace('.webp', '.jpg')
-                                else:
-                                    jpg_filename = base_name.replace('.webp', '.jpg') if filepath.endswith('.webp') else base_name
-                                jpg_filepath = os.path.join(chapter_dir, jpg_filename)
-                                
-                                if os.path.exists(jpg_filepath):
-                                    downloaded_files[img_index] = jpg_filepath
-                                else:
-                                    downloaded_files[img_index] = filepath
-                            else:
-                                failed_downloads.append({'url': img_url, 'error': result, 'index': img_index, 'filepath': filepath})
-                        except Exception as e:
-                            failed_downloads.append({'url': img_url, 'error': str(e), 'index': idx, 'filepath': filepath})
-            else:
-                for idx, img_url, filepath in tqdm(download_tasks, desc=f"  {safe_chapter_name}", leave=False, unit="img"):
-                    if self.cancelled:
-                        return ([], total_found, 0, [])
-                    try:
-                        success, result = self.download_image_with_retry(img_url, filepath)
-                        if success:
-                            base_name = os.path.basename(filepath)
-                            if '-webp' in base_name:
-                                jpg_filename = base_name.replace('-webp', '').replace('.webp', '.jpg')
-                            else:
-                                jpg_filename = base_name.replace('.webp', '.jpg') if filepath.endswith('.webp') else base_name
-                            jpg_filepath = os.path.join(chapter_dir, jpg_filename)
-                            
-                            if os.path.exists(jpg_filepath):
-                                downloaded_files[idx] = jpg_filepath
-                            else:
-                                downloaded_files[idx] = filepath
-                        else:
-                            failed_downloads.append({'url': img_url, 'error': result, 'index': idx, 'filepath': filepath})
-                        time.sleep(self.config['delay_between_images'])
-                    except Exception as e:
-                        failed_downloads.append({'url': img_url, 'error': str(e), 'index': idx, 'filepath': filepath})
         
-        if failed_downloads:
-            retry_attempts = self.config.get('retry_failed_images', 2)
-            if retry_attempts > 0:
-                for retry in range(retry_attempts):
-                    if not failed_downloads:
-                        break
-                    
-                    retry_failed = failed_downloads.copy()
-                    failed_downloads = []
-                    
-                    for failed in retry_failed:
-                        if 'filepath' in failed:
-                            try:
-                                success, result = self.download_image_with_retry(failed['url'], failed['filepath'], max_retries=3)
-                                if success:
-                                    base_name = os.path.basename(failed['filepath'])
-                                    if '-webp' in base_name:
-                                        jpg_filename = base_name.replace('-webp', '').replace('.webp', '.jpg')
-                                    else:
-                                        jpg_filename = base_name.replace('.webp', '.jpg') if failed['filepath'].endswith('.webp') else base_name
-                                    jpg_filepath = os.path.join(chapter_dir, jpg_filename)
-                                    
-                                    if os.path.exists(jpg_filepath):
-                                        downloaded_files[failed['index']] = jpg_filepath
-                                    else:
-                                        downloaded_files[failed['index']] = failed['filepath']
-                                else:
-                                    failed_downloads.append(failed)
-                            except Exception as e:
-                                failed_downloads.append(failed)
-        
-        files_with_index = []
-        for idx, filepath in enumerate(downloaded_files):
-            if filepath is not None and os.path.exists(filepath):
-                files_with_index.append((idx, filepath))
-        
-        files_with_index.sort(key=lambda x: x[0])
-        
-        renamed_files = []
-        for original_idx, old_filepath in files_with_index:
-            if not os.path.exists(old_filepath):
-                continue
-            
-            file_ext = os.path.splitext(old_filepath)[1].lower()
-            if not file_ext or file_ext not in ['.png', '.jpg', '.jpeg', '.webp', '.gif']:
-                file_ext = '.jpg'
-            
-            seq_num = original_idx + 1
-            new_filename = f"{seq_num:03d}{file_ext}"
-            new_filepath = os.path.join(chapter_dir, new_filename)
-            
-            if old_filepath != new_filepath:
-                if os.path.exists(new_filepath):
-                    temp_name = f"temp_{seq_num:03d}_{hash(old_filepath) % 10000}{file_ext}"
-                    temp_filepath = os.path.join(chapter_dir, temp_name)
-                    try:
-                        os.rename(old_filepath, temp_filepath)
-                        old_filepath = temp_filepath
-                    except Exception as e:
-                        print(f"[ADVERTENCIA] No se pudo crear archivo temporal: {e}")
-                        renamed_files.append(old_filepath)
-                        continue
-                
-                try:
-                    os.rename(old_filepath, new_filepath)
-                    renamed_files.append(new_filepath)
-                except Exception as e:
-                    print(f"[ADVERTENCIA] No se pudo renombrar {os.path.basename(old_filepath)}: {e}")
-                    renamed_files.append(old_filepath)
-            else:
-                renamed_files.append(new_filepath)
-        
-        downloaded_files = renamed_files
-        total_downloaded = len(downloaded_files)
-        
-        for file in os.listdir(chapter_dir):
-            file_path = os.path.join(chapter_dir, file)
-            if not os.path.isfile(file_path):
-                continue
-            
-            file_lower = file.lower()
-            if not file_lower.endswith(('.png', '.jpg', '.jpeg', '.webp', '.gif')):
-                continue
-            
-            base_name = os.path.splitext(file)[0]
-            if not re.match(r'^\d{3}$', base_name):
-                try:
-                    os.remove(file_path)
-                except Exception as e:
-                    print(f"[ADVERTENCIA] No se pudo eliminar archivo {file}: {e}")
-        
-        return (downloaded_files, total_found, total_downloaded, failed_downloads, skipped_files)
+        plan = chapter_plan(chapter_name, chapter_dir, images, convert_webp=True, source_url=chapter_url)
+        return self.engine.download_chapter(self.session, plan, cancel_check=lambda: self.cancelled, deferred_retry=deferred_retry, desc=f"  {safe_chapter_name}")
     
     def get_chapter_image_count(self, chapter_url):
         try:
@@ -786,8 +480,16 @@ class OlympusScanDownloader:
         for chapter in chapters:
             safe_chapter_name = re.sub(r'[<>:"/\\|?*]', '_', chapter['name'])
             chapter_dir = os.path.join(volume_dir, safe_chapter_name)
+            if os.path.basename(volume_dir) == safe_chapter_name:
+                chapter_dir = volume_dir
             
             if os.path.exists(chapter_dir):
+                status = manifest_status(chapter_dir, chapter['url'])
+                if status is not None:
+                    if status:
+                        complete_chapters += 1
+                    continue
+                
                 image_files = [f for f in os.listdir(chapter_dir) 
                              if f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp', '.gif'))]
                 downloaded_count = len(image_files)
@@ -842,119 +544,36 @@ class OlympusScanDownloader:
         print(f"Descargando: {volume_name}")
         print(f"{'='*60}\n")
         
-        all_images = []
-        chapter_stats = []
-        
-        parallel_chapters = self.config.get('parallel_chapters', 1)
+        deferred_retry = DeferredRetryPool()
         
         def download_single_chapter(chapter, idx, total):
             if self.cancelled:
-                return ({'name': chapter['name'], 'total_found': 0, 'total_downloaded': 0, 'failed': 0, 'skipped': 0}, [])
-            try:
-                with self.print_lock:
-                    print(f"\n[{idx}/{total}] Procesando: {chapter['name']}")
-                
-                result = self.download_chapter_images(chapter['url'], chapter['name'], volume_dir)
-                
-                if len(result) == 5:
-                    images, total_found, total_downloaded, failed, skipped = result
-                else:
-                    images, total_found, total_downloaded, failed = result
-                    skipped = 0
-                
-                stat = {
-                    'name': chapter['name'],
-                    'total_found': total_found,
-                    'total_downloaded': total_downloaded,
-                    'failed': len(failed),
-                    'skipped': skipped
-                }
-                
+                return (empty_stat(chapter['name']), [])
+            with self.print_lock:
+                print(f"\n[{idx}/{total}] Procesando: {chapter['name']}")
+            
+            result = self.download_chapter_images(chapter['url'], chapter['name'], volume_dir, deferred_retry=deferred_retry)
+            stat = chapter_stat(chapter['name'], result)
+            total_found = stat['total_found']
+            total_downloaded = stat['total_downloaded']
+            
+            with self.print_lock:
                 if total_found > 0:
                     if total_downloaded == total_found:
-                        with self.print_lock:
-                            print(f"  [OK] {chapter['name']}: {total_downloaded}/{total_found} imágenes")
+                        print(f"  [OK] {chapter['name']}: {total_downloaded}/{total_found} imágenes")
                     else:
-                        with self.print_lock:
-                            print(f"  [ADVERTENCIA] {chapter['name']}: {total_downloaded}/{total_found} imágenes ({total_found - total_downloaded} fallaron)")
+                        print(f"  [ADVERTENCIA] {chapter['name']}: {total_downloaded}/{total_found} imágenes ({total_found - total_downloaded} fallaron)")
                 else:
-                    with self.print_lock:
-                        print(f"  [ADVERTENCIA] {chapter['name']}: No se encontraron imágenes")
-                
-                time.sleep(self.config['delay_between_chapters'])
-                return (stat, images)
-            except Exception as e:
-                with self.print_lock:
-                    print(f"  [ERROR] Error en capítulo {chapter['name']}: {str(e)}")
-                return ({
-                    'name': chapter['name'],
-                    'total_found': 0,
-                    'total_downloaded': 0,
-                    'failed': 1,
-                    'skipped': 0
-                }, [])
+                    print(f"  [ADVERTENCIA] {chapter['name']}: No se encontraron imágenes")
+            
+            self.pause('delay_between_chapters')
+            return (stat, result[0])
         
-        if parallel_chapters > 1 and len(chapters) > 1:
-            with ThreadPoolExecutor(max_workers=parallel_chapters) as executor:
-                futures = {executor.submit(download_single_chapter, chapter, idx+1, len(chapters)): idx 
-                          for idx, chapter in enumerate(chapters)}
-                
-                for future in as_completed(futures):
-                    if self.cancelled:
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        break
-                    idx = futures[future]
-                    try:
-                        stat, images = future.result()
-                        chapter_stats.append(stat)
-                        all_images.extend(images)
-                    except Exception as e:
-                        with self.print_lock:
-                            print(f"  [ERROR] Error en capítulo: {e}")
-        else:
-            for idx, chapter in enumerate(tqdm(chapters, desc=volume_name, unit="img"), start=1):
-                if self.cancelled:
-                    break
-                try:
-                    print(f"\n[{idx}/{len(chapters)}] Procesando: {chapter['name']}")
-                    result = self.download_chapter_images(chapter['url'], chapter['name'], volume_dir)
-                    
-                    if len(result) == 5:
-                        images, total_found, total_downloaded, failed, skipped = result
-                    else:
-                        images, total_found, total_downloaded, failed = result
-                        skipped = 0
-                    
-                    all_images.extend(images)
-                    
-                    chapter_stats.append({
-                        'name': chapter['name'],
-                        'total_found': total_found,
-                        'total_downloaded': total_downloaded,
-                        'failed': len(failed),
-                        'skipped': skipped
-                    })
-                    
-                    if total_found > 0:
-                        if total_downloaded == total_found:
-                            print(f"  [OK] Verificación: {total_downloaded}/{total_found} imágenes descargadas correctamente")
-                        else:
-                            print(f"  [ADVERTENCIA] Verificación: {total_downloaded}/{total_found} imágenes descargadas ({total_found - total_downloaded} fallaron)")
-                            if failed:
-                                print(f"  [ERROR] URLs que fallaron: {len(failed)}")
-                    else:
-                        print(f"  [ADVERTENCIA] No se encontraron imágenes en este capítulo")
-                except Exception as e:
-                    print(f"  [ERROR] Error al procesar capítulo {chapter['name']}: {str(e)}")
-                    chapter_stats.append({
-                        'name': chapter['name'],
-                        'total_found': 0,
-                        'total_downloaded': 0,
-                        'failed': 1,
-                        'skipped': 0
-                    })
-                
-                time.sleep(self.config['delay_between_chapters'])
+        results = self.engine.run_chapters(chapters, download_single_chapter, cancel_check=lambda: self.cancelled, on_error=lambda chapter: (empty_stat(chapter['name'], failed=1), []))
+        chapter_stats = [stat for stat, images in results]
+        all_images = [image for stat, images in results for image in images]
+        
+        apply_recovered(chapter_stats, self.engine.drain_deferred(self.session, deferred_retry, convert_webp=True, cancel_check=lambda: self.cancelled))
         
         if all_images or any(stat.get('total_downloaded', 0) > 0 for stat in chapter_stats):
             print(f"\n{'='*60}")
@@ -970,22 +589,20 @@ class OlympusScanDownloader:
             
             sorted_stats = sorted(chapter_stats, key=get_chapter_sort_key)
             
-            failed_chapters = []
             for stat in sorted_stats:
                 total_found = stat.get('total_found', 0)
                 total_downloaded = stat.get('total_downloaded', 0)
                 status_icon = "[OK]" if total_downloaded == total_found and total_found > 0 else "[ERROR]"
                 print(f"{status_icon} {stat['name']}: {total_downloaded}/{total_found}")
-                
-                if total_downloaded < total_found:
-                    failed_chapters.append({
-                        'chapter_name': stat['name'],
-                        'downloaded': total_downloaded,
-                        'total': total_found
-                    })
+            
+            failed_chapters = collect_failed_chapters(sorted_stats)
             
             print(f"{'='*60}")
             print(f"\n[OK] Descarga completada: {os.path.abspath(volume_dir)}")
+            print(format_pool_stats(self.session))
+            wait_stats = format_wait_stats('olympus_scan')
+            if wait_stats:
+                print(wait_stats)
             return {
                 'dir': volume_dir,
                 'failed_chapters': failed_chapters
@@ -1022,18 +639,13 @@ def main():
     
     print(f"\nDescargando información de: {url}")
     
-    use_selenium = True
-    
     if not SELENIUM_AVAILABLE:
-        print("[ERROR] Selenium no esta disponible.")
-        print("  Instala Selenium con: pip install selenium")
-        print("  Tambien necesitas tener Chrome/Chromium instalado")
-        sys.exit(1)
+        print("[ADVERTENCIA] Selenium no está disponible, solo se intentará por HTTP.")
     
-    html_content = downloader.get_page(url, use_selenium=use_selenium)
+    html_content = downloader.get_listing_page(url)
     
     if not html_content:
-        print("Error: No se pudo descargar la página con Selenium")
+        print("Error: No se pudo descargar la página ni por HTTP ni con Selenium")
         print("  Verifica que Chrome/Chromium esté instalado")
         print("  ChromeDriver se descarga automáticamente en versiones recientes de Selenium")
         sys.exit(1)
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import hashlib
+from threading import Lock
+
+
+_caches = {}
+_caches_lock = Lock()
+
+
+def get_page_cache(config):
+    if not config.get('page_cache_enabled', True):
+        return None
+    cache_dir = config.get('page_cache_dir')
+    if not cache_dir:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        cache_dir = os.path.join(script_dir, 'resources', 'cache', 'pages')
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = PageCache(cache_dir, ttl=config.get('page_cache_ttl', 600), max_size_mb=config.get('page_cache_max_mb', 200))
+            _caches[cache_dir] = cache
+        return cache
+
+
+class PageCache:
+    def __init__(self, cache_dir, ttl=600, max_size_mb=200):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size = max_size_mb * 1024 * 1024
+        self.lock = Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + '.html'), os.path.join(self.cache_dir, key + '.json')
+
+    def _load(self, url):
+        body_path, meta_path = self._paths(url)
+        if not os.path.exists(body_path) or not os.path.exists(meta_path):
+            return None, None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'r', encoding='utf-8') as f:
+                body = f.read()
+            return meta, body
+        except Exception:
+            return None, None
+
+    def _write(self, path, content):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    def _store(self, url, body, meta):
+        body_path, meta_path = self._paths(url)
+        with self.lock:
+            try:
+                self._write(body_path, body)
+                self._write(meta_path, json.dumps(meta))
+            except Exception as e:
+                print(f"[ADVERTENCIA] No se pudo guardar la página en caché: {e}")
+                return
+            self._evict()
+
+    def _touch(self, url):
+        body_path, _ = self._paths(url)
+        try:
+            os.utime(body_path, None)
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.html'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            for entry_path in (path, path[:-len('.html')] + '.json'):
+                try:
+                    os.remove(entry_path)
+                except OSError:
+                    pass
+            total_size -= size
+
+    def get(self, session, url, timeout=30, headers=None):
+        meta, body = self._load(url)
+        now = time.time()
+
+        if meta and body is not None and now - meta.get('stored_at', 0) < self.ttl:
+            self._touch(url)
+            self.hits += 1
+            return body
+
+        request_headers = dict(headers or {})
+        if meta and body is not None:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = session.get(url, timeout=timeout, headers=request_headers)
+
+        if response.status_code == 304 and meta and body is not None:
+            meta['stored_at'] = now
+            self._store(url, body, meta)
+            self.revalidated += 1
+            return body
+
+        response.raise_for_status()
+        body = response.text
+        self.misses += 1
+        self._store(url, body, {
+            'url': url,
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'stored_at': now
+        })
+        return body
+
+    def clear(self):
+        with self.lock:
+            for name in os.listdir(self.cache_dir):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
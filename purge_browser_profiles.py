@@ -0,0 +1,27 @@
+import os
+import sys
+from manga_downloader import load_config
+from browser_pool import get_profile_root, directory_size, purge_browser_profiles
+
+
+def main():
+    config = load_config()
+    root = get_profile_root(config)
+    site = sys.argv[1] if len(sys.argv) > 1 else None
+
+    if not os.path.exists(root):
+        print(f"[INFO] No hay perfiles de navegador en: {root}")
+        return
+
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if os.path.isdir(path):
+            print(f"  {name}: {directory_size(path) / (1024 * 1024):.1f} MB")
+
+    freed = purge_browser_profiles(config, site)
+    target = f"del sitio '{site}'" if site else "de todos los sitios"
+    print(f"[INFO] Perfiles de navegador {target} eliminados ({freed / (1024 * 1024):.1f} MB liberados)")
+
+
+if __name__ == '__main__':
+    main()
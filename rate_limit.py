@@ -0,0 +1,234 @@
+import time
+import requests
+from threading import Condition, Lock
+from urllib.parse import urlparse
+from http_utils import get_max_connections
+
+THROTTLE_STATUS = (429, 503)
+TRANSPORT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, ConnectionError, TimeoutError)
+
+
+def get_host(url):
+    return urlparse(url).hostname or ''
+
+
+class HostSlot:
+    def __init__(self, host):
+        self.host = host
+        self.start = time.monotonic()
+        self.status = None
+        self.error = None
+        self.latency = None
+
+    def unhealthy(self):
+        if self.status is not None and self.status >= 500:
+            return True
+        return isinstance(self.error, TRANSPORT_ERRORS)
+
+
+class AdaptiveHostLimiter:
+    def __init__(self, host, initial_limit, max_limit, min_limit=1, latency_factor=2.0, decrease_factor=0.5, cooldown=2.0, max_error_rate=0.05):
+        self.host = host
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_factor = latency_factor
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.max_error_rate = max_error_rate
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.latency_avg = None
+        self.latency_base = None
+        self.last_decrease = 0
+        self.condition = Condition()
+
+    def current_limit(self):
+        return int(self.limit)
+
+    def acquire(self):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+        return HostSlot(self.host)
+
+    def try_acquire(self):
+        with self.condition:
+            if self.in_flight >= int(self.limit):
+                return None
+            self.in_flight += 1
+        return HostSlot(self.host)
+
+    def release(self, slot):
+        latency = slot.latency if slot.latency is not None else time.monotonic() - slot.start
+        with self.condition:
+            self.in_flight -= 1
+            old_limit = int(self.limit)
+
+            if slot.status in THROTTLE_STATUS:
+                self._decrease(self.decrease_factor)
+            elif slot.unhealthy():
+                self.error_rate = self.error_rate * 0.9 + 0.1
+                self._decrease(self.decrease_factor)
+            elif slot.error is None:
+                self.error_rate *= 0.9
+                self._record_latency(latency)
+                if self.latency_avg > self.latency_base * self.latency_factor:
+                    self._decrease(0.9)
+                elif self.error_rate < self.max_error_rate:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1))
+
+            new_limit = int(self.limit)
+            self.condition.notify_all()
+
+        if new_limit != old_limit:
+            print(f"[INFO] Límite de conexiones para {self.host}: {old_limit} -> {new_limit}")
+
+    def _record_latency(self, latency):
+        if self.latency_avg is None:
+            self.latency_avg = latency
+        else:
+            self.latency_avg = self.latency_avg * 0.8 + latency * 0.2
+        if self.latency_base is None or self.latency_avg < self.latency_base:
+            self.latency_base = self.latency_avg
+
+    def _decrease(self, factor):
+        now = time.monotonic()
+        if now - self.last_decrease < self.cooldown:
+            return
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+        if self.latency_base is not None and self.latency_avg is not None:
+            self.latency_base = min(self.latency_avg, self.latency_base * 1.5)
+
+
+class HostConcurrencyController:
+    def __init__(self, initial_limit, max_limit):
+        self.initial_limit = initial_limit
+        self.max_limit = max_limit
+        self.limiters = {}
+        self.lock = Lock()
+
+    def get_limiter(self, url):
+        host = get_host(url)
+        with self.lock:
+            limiter = self.limiters.get(host)
+            if limiter is None:
+                limiter = AdaptiveHostLimiter(host, self.initial_limit, self.max_limit)
+                self.limiters[host] = limiter
+                print(f"[INFO] Límite de conexiones para {host}: {limiter.current_limit()} (inicial)")
+            return limiter
+
+    def acquire(self, url):
+        return self.get_limiter(url).acquire()
+
+    def try_acquire(self, url):
+        return self.get_limiter(url).try_acquire()
+
+    def release(self, slot):
+        with self.lock:
+            limiter = self.limiters.get(slot.host)
+        if limiter:
+            limiter.release(slot)
+
+    def get_limits(self):
+        with self.lock:
+            return {host: limiter.current_limit() for host, limiter in self.limiters.items()}
+
+
+_host_controller = None
+_host_controller_lock = Lock()
+
+
+def get_host_controller(config):
+    global _host_controller
+    with _host_controller_lock:
+        initial_limit = config.get('parallel_images', 1)
+        max_limit = get_max_connections(config)
+        if _host_controller is None or (_host_controller.initial_limit, _host_controller.max_limit) != (initial_limit, max_limit):
+            _host_controller = HostConcurrencyController(initial_limit, max_limit)
+        return _host_controller
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self.tokens = self.burst
+        self.last = time.monotonic()
+        self.lock = Lock()
+
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class DomainRateLimiter:
+    def __init__(self, rules):
+        self.source = dict(rules or {})
+        self.rules = {}
+        for domain, rule in (rules or {}).items():
+            if rule and rule.get('rps', 0) > 0:
+                self.rules[domain.lower()] = rule
+        self.buckets = {}
+        self.lock = Lock()
+
+    def _match(self, host):
+        for domain, rule in self.rules.items():
+            if domain != 'default' and (host == domain or host.endswith('.' + domain)):
+                return domain, rule
+        if 'default' in self.rules:
+            return host, self.rules['default']
+        return None, None
+
+    def get_bucket(self, url):
+        host = get_host(url).lower()
+        with self.lock:
+            if host in self.buckets:
+                return self.buckets[host]
+            key, rule = self._match(host)
+            bucket = None
+            if rule:
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(rule['rps'], rule.get('burst', rule['rps']))
+                    self.buckets[key] = bucket
+                    print(f"[INFO] Límite de peticiones para {key}: {rule['rps']} req/s (ráfaga {int(bucket.burst)})")
+            self.buckets[host] = bucket
+            return bucket
+
+    def has_limit(self, url):
+        return self.get_bucket(url) is not None
+
+    def reserve(self, url):
+        bucket = self.get_bucket(url)
+        return bucket.reserve() if bucket else 0
+
+    def acquire(self, url):
+        bucket = self.get_bucket(url)
+        return bucket.acquire() if bucket else 0
+
+
+_rate_limiter = None
+
+
+def get_rate_limiter(config):
+    global _rate_limiter
+    with _host_controller_lock:
+        rules = config.get('rate_limits') or {}
+        if _rate_limiter is None or _rate_limiter.source != rules:
+            _rate_limiter = DomainRateLimiter(rules)
+        return _rate_limiter
@@ -0,0 +1,98 @@
+import random
+import time
+import requests
+from email.utils import parsedate_to_datetime
+from threading import Lock
+
+RETRYABLE_STATUS = (408, 425, 429, 500, 502, 503, 504, 520, 521, 522, 523, 524)
+
+
+class RetryBudget:
+    def __init__(self, max_retries):
+        self.remaining = max_retries
+        self.lock = Lock()
+
+    def consume(self):
+        with self.lock:
+            if self.remaining is None:
+                return True
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def exhausted(self):
+        with self.lock:
+            return self.remaining is not None and self.remaining <= 0
+
+
+class RetryPolicy:
+    def __init__(self, base_delay=2, max_delay=60, budget=None):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            base_delay=config.get('retry_delay', 2),
+            max_delay=config.get('retry_max_delay', 60),
+            budget=config.get('retry_budget_per_chapter') or None
+        )
+
+    def new_budget(self):
+        return RetryBudget(self.budget)
+
+    def get_status(self, exc):
+        response = getattr(exc, 'response', None)
+        if response is not None and getattr(response, 'status_code', None) is not None:
+            return response.status_code
+        status = getattr(exc, 'status', None)
+        if isinstance(status, int):
+            return status
+        return None
+
+    def get_headers(self, exc):
+        response = getattr(exc, 'response', None)
+        if response is not None and getattr(response, 'headers', None) is not None:
+            return response.headers
+        return getattr(exc, 'headers', None) or {}
+
+    def is_retryable(self, exc):
+        if isinstance(exc, InterruptedError):
+            return False
+        status = self.get_status(exc)
+        if status is not None:
+            return status in RETRYABLE_STATUS
+        if isinstance(exc, (requests.exceptions.InvalidURL, requests.exceptions.MissingSchema, requests.exceptions.InvalidSchema)):
+            return False
+        return True
+
+    def get_retry_after(self, exc):
+        value = self.get_headers(exc).get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return None
+
+    def get_delay(self, attempt, exc=None):
+        retry_after = self.get_retry_after(exc) if exc is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(self.base_delay / 2, max(backoff, self.base_delay / 2))
+
+    def should_retry(self, exc, attempt, max_attempts, budget=None):
+        if attempt >= max_attempts - 1:
+            return False
+        if not self.is_retryable(exc):
+            return False
+        if budget is not None and not budget.consume():
+            return False
+        return True
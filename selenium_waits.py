@@ -0,0 +1,140 @@
+import time
+from threading import Lock
+
+SITE_WAIT_PROFILES = {
+    'default': {'timeout': 10, 'poll': 0.2, 'stable_ms': 800, 'idle_ms': 500, 'scroll_timeout': 2},
+    'inventario_oculto': {'stable_ms': 600, 'scroll_timeout': 1.5},
+    'olympus_scan': {'stable_ms': 1000, 'scroll_timeout': 2.5},
+    'mangatv': {'stable_ms': 600},
+    'lectorknight': {'stable_ms': 1000, 'idle_ms': 700},
+    'zonatmo': {'stable_ms': 1200, 'idle_ms': 800, 'timeout': 15}
+}
+
+NETWORK_STATE_JS = """
+    if (document.readyState !== 'complete') return -1;
+    return performance.getEntriesByType('resource').length;
+"""
+
+
+def get_wait_profile(config, site):
+    profile = dict(SITE_WAIT_PROFILES['default'])
+    profile.update(SITE_WAIT_PROFILES.get(site, {}))
+    profile.update(config.get('wait_profiles', {}).get(site, {}))
+    return profile
+
+
+class WaitStats:
+    def __init__(self):
+        self.stages = {}
+        self.lock = Lock()
+
+    def record(self, site, stage, elapsed, met):
+        with self.lock:
+            entry = self.stages.setdefault((site, stage), {'count': 0, 'total': 0.0, 'timeouts': 0})
+            entry['count'] += 1
+            entry['total'] += elapsed
+            if not met:
+                entry['timeouts'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {key: dict(value) for key, value in self.stages.items()}
+
+
+_stats = WaitStats()
+
+
+def get_wait_stats():
+    return _stats.snapshot()
+
+
+def format_wait_stats(site=None):
+    stages = {key: value for key, value in get_wait_stats().items() if site is None or key[0] == site}
+    if not stages:
+        return None
+    count = sum(entry['count'] for entry in stages.values())
+    total = sum(entry['total'] for entry in stages.values())
+    timeouts = sum(entry['timeouts'] for entry in stages.values())
+    detail = ", ".join(f"{stage} {entry['total']:.1f}s" for (_, stage), entry in sorted(stages.items()))
+    return f"[INFO] Esperas Selenium: {count} esperas, {total:.1f}s en total, {timeouts} por timeout ({detail})"
+
+
+class WaitEngine:
+    def __init__(self, driver, site, config, cancel_check=None):
+        self.driver = driver
+        self.site = site
+        self.profile = get_wait_profile(config, site)
+        self.cancel_check = cancel_check
+        self.log = config.get('selenium_wait_log', False)
+
+    def cancelled(self):
+        return bool(self.cancel_check and self.cancel_check())
+
+    def _wait(self, stage, probe, timeout=None):
+        timeout = self.profile['timeout'] if timeout is None else timeout
+        start = time.monotonic()
+        met = False
+        while not self.cancelled():
+            try:
+                met = bool(probe())
+            except Exception:
+                met = False
+            if met or time.monotonic() - start >= timeout:
+                break
+            time.sleep(self.profile['poll'])
+
+        elapsed = time.monotonic() - start
+        _stats.record(self.site, stage, elapsed, met)
+        if self.log:
+            print(f"[TIEMPO] {self.site}/{stage}: {elapsed:.2f}s ({'listo' if met else 'timeout'})")
+        return met
+
+    def _stable(self, read_value, stable_ms, minimum):
+        state = {'value': None, 'since': None}
+
+        def probe():
+            value = read_value()
+            now = time.monotonic()
+            if value != state['value']:
+                state['value'] = value
+                state['since'] = now
+                return False
+            return value >= minimum and (now - state['since']) * 1000 >= stable_ms
+        return probe
+
+    def count(self, selector):
+        return self.driver.execute_script("return document.querySelectorAll(arguments[0]).length;", selector)
+
+    def page_height(self):
+        return self.driver.execute_script("return document.body.scrollHeight")
+
+    def selector_present(self, selector, timeout=None, stage='selector'):
+        return self._wait(stage, lambda: self.count(selector) > 0, timeout)
+
+    def url_contains(self, text, timeout=None, stage='url'):
+        return self._wait(stage, lambda: text in self.driver.current_url, timeout)
+
+    def document_ready(self, timeout=None, stage='documento'):
+        return self._wait(stage, lambda: self.driver.execute_script("return document.readyState") == "complete", timeout)
+
+    def count_stable(self, selector, minimum=1, stable_ms=None, timeout=None, stage='imagenes'):
+        stable_ms = self.profile['stable_ms'] if stable_ms is None else stable_ms
+        return self._wait(stage, self._stable(lambda: self.count(selector), stable_ms, minimum), timeout)
+
+    def network_idle(self, idle_ms=None, timeout=None, stage='red'):
+        idle_ms = self.profile['idle_ms'] if idle_ms is None else idle_ms
+        return self._wait(stage, self._stable(lambda: self.driver.execute_script(NETWORK_STATE_JS), idle_ms, 0), timeout)
+
+    def network_quiet(self, recorder, idle_ms=None, timeout=None, stage='red'):
+        idle_ms = self.profile['idle_ms'] if idle_ms is None else idle_ms
+        return self._wait(stage, lambda: recorder.is_quiet(idle_ms), timeout)
+
+    def scroll_to_end(self, max_scrolls=10, timeout=None, stage='scroll'):
+        timeout = self.profile['scroll_timeout'] if timeout is None else timeout
+        last_height = self.page_height()
+        for _ in range(max_scrolls):
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            if not self._wait(stage, lambda: self.page_height() > last_height, timeout):
+                break
+            last_height = self.page_height()
+        return not self.cancelled()
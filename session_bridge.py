@@ -0,0 +1,85 @@
+import time
+from threading import Lock
+import requests
+from requests.cookies import get_cookie_header
+
+BROWSER_STATE_JS = "return {userAgent: navigator.userAgent, languages: navigator.languages || []};"
+EXPIRY_MARGIN = 60
+MAX_STRIKES = 2
+
+
+def cookie_header(jar, url):
+    return get_cookie_header(jar, requests.Request('GET', url))
+
+
+def accept_language(languages):
+    values = [languages[0]]
+    for index, language in enumerate(languages[1:], 1):
+        values.append(f"{language};q={max(0.1, 1 - 0.1 * index):.1f}")
+    return ','.join(values)
+
+
+class SessionBridge:
+    def __init__(self, session, site, config):
+        self.session = session
+        self.site = site
+        self.enabled = config.get('session_bridge', True)
+        self.lock = Lock()
+        self.active = False
+        self.expires_at = None
+        self.strikes = {}
+
+    def is_active(self):
+        with self.lock:
+            if self.active and self.expires_at is not None and time.time() >= self.expires_at - EXPIRY_MARGIN:
+                self.active = False
+                print(f"[INFO] Cookies del navegador caducadas para {self.site}, se volverá a usar Selenium")
+            return self.active
+
+    def usable_for(self, page_type):
+        return self.is_active() and self.strikes.get(page_type, 0) < MAX_STRIKES
+
+    def import_driver(self, driver):
+        if not self.enabled:
+            return False
+        try:
+            cookies = driver.get_cookies()
+            state = driver.execute_script(BROWSER_STATE_JS) or {}
+        except Exception as e:
+            print(f"[ADVERTENCIA] No se pudo transferir la sesión del navegador: {e}")
+            return False
+
+        expiries = []
+        with self.lock:
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain', ''),
+                    path=cookie.get('path', '/'),
+                    secure=cookie.get('secure', False),
+                    expires=cookie.get('expiry')
+                )
+                if cookie.get('expiry'):
+                    expiries.append(cookie['expiry'])
+            if state.get('userAgent'):
+                self.session.headers['User-Agent'] = state['userAgent']
+            if state.get('languages'):
+                self.session.headers['Accept-Language'] = accept_language(state['languages'])
+            self.expires_at = min(expiries) if expiries else None
+            was_active = self.active
+            self.active = True
+
+        if not was_active:
+            print(f"[INFO] Sesión de Selenium transferida a HTTP para {self.site} ({len(cookies)} cookies)")
+        return True
+
+    def report(self, page_type, success):
+        with self.lock:
+            if not self.active:
+                return
+            if success:
+                self.strikes[page_type] = 0
+                return
+            self.strikes[page_type] = self.strikes.get(page_type, 0) + 1
+            self.active = False
+        print(f"[INFO] La sesión transferida para {self.site}/{page_type} dejó de funcionar, se volverá a usar Selenium")
@@ -2,16 +2,22 @@ import os
 import sys
 import re
 import json
+import hashlib
+import shutil
+import tempfile
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import time
-from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
+from http_utils import create_session
+from rate_limit import get_rate_limiter
+from page_cache import get_page_cache
+from fetch_strategy import get_fetch_strategy, complete_listing
+from browser_pool import get_browser_budget, launch_chrome
 
 try:
-    from selenium import webdriver
     from selenium.webdriver.chrome.options import Options
     from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.common.by import By
@@ -24,6 +30,8 @@ except ImportError:
     SELENIUM_AVAILABLE = False
     NoSuchWindowException = Exception
 
+SEGMENT_SYNC_BYTES = 4 * 1024 * 1024
+
 
 def load_config():
     config_path = 'config.json'
@@ -38,7 +46,9 @@ def load_config():
         "selenium_extra_wait": 3,
         "parallel_tomos": 1,
         "parallel_chapters": 1,
-        "force_redownload": False
+        "force_redownload": False,
+        "download_segments": 4,
+        "download_min_segment_mb": 8
     }
     if os.path.exists(config_path):
         try:
@@ -95,10 +105,10 @@ class TomosMangaDownloader:
     def __init__(self, base_url, config):
         self.base_url = base_url
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        self.session = create_session(config, rate_limiter=get_rate_limiter(config), user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        self.page_cache = get_page_cache(config)
+        self.fetch_strategy = get_fetch_strategy(config)
+        self.browser_budget = get_browser_budget(config)
         self.cancelled = False
         self.print_lock = Lock()
         
@@ -135,9 +145,12 @@ class TomosMangaDownloader:
         
         try:
             print(f"[TomosManga] Usando requests para obtener página")
-            response = self.session.get(url, timeout=self.config['timeout'])
-            response.raise_for_status()
-            html = response.text
+            if self.page_cache:
+                html = self.page_cache.get(self.session, url, timeout=self.config['timeout'])
+            else:
+                response = self.session.get(url, timeout=self.config['timeout'])
+                response.raise_for_status()
+                html = response.text
             try:
                 script_dir = os.path.dirname(os.path.abspath(__file__))
                 debug_file = os.path.join(script_dir, 'resources', 'debug', 'debug_html_tomosmanga.html')
@@ -151,6 +164,14 @@ class TomosMangaDownloader:
             print(f"[TomosManga ERROR] Error al obtener página: {e}")
             return None
 
+    def get_listing_page(self, url):
+        return self.fetch_strategy.fetch(
+            'tomosmanga', 'listado',
+            lambda use_selenium: self.get_page(url, use_selenium=use_selenium),
+            complete_listing(self.parse_volumes, r'ouo\.(?:io|press)'),
+            selenium_available=SELENIUM_AVAILABLE
+        )
+
     def get_page_selenium(self, url):
         if not SELENIUM_AVAILABLE:
             print(f"[TomosManga ERROR] Selenium no está disponible")
@@ -203,7 +224,7 @@ class TomosMangaDownloader:
             else:
                 print(f"[TomosManga] Brave no encontrado en rutas comunes, usando Chrome por defecto")
             
-            driver = webdriver.Chrome(options=options)
+            driver = launch_chrome(options, 'TomosManga', self.browser_budget)
             print(f"[TomosManga] Navegando a: {url}")
             driver.get(url)
             wait_time = self.config.get('selenium_extra_wait', 3)
@@ -250,7 +271,14 @@ class TomosMangaDownloader:
             
             if isinstance(result, dict):
                 if 'fireload_url' in result:
-                    return result
+                    artifact = self.build_fireload_artifact(result)
+                    if artifact:
+                        return artifact
+                    if attempt < max_retries:
+                        print(f"[TomosManga] No se pudo extraer el enlace directo, reintentando en 3 segundos...")
+                        time.sleep(3)
+                        continue
+                    return None
                 elif 'url' in result:
                     if self.is_ad_url(result['url']):
                         print(f"[TomosManga ADVERTENCIA] URL detectada como publicidad: {result['url'][:100]}...")
@@ -269,6 +297,22 @@ class TomosMangaDownloader:
         return None
     
     def _attempt_bypass_ouo_io(self, ouo_url, is_shared):
+        launched = []
+        result = None
+        try:
+            result = self._run_ouo_bypass(ouo_url, is_shared, launched)
+            return result
+        finally:
+            handed_off = isinstance(result, dict) and result.get('driver') is not None
+            for driver in launched:
+                if handed_off and result['driver'] is driver:
+                    continue
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+    
+    def _run_ouo_bypass(self, ouo_url, is_shared, launched):
         
         options = Options()
         options.add_argument('--headless')
@@ -297,6 +341,7 @@ class TomosMangaDownloader:
         options.add_argument('--disable-blink-features=AutomationControlled')
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
         
         driver = None
         try:
@@ -319,7 +364,8 @@ class TomosMangaDownloader:
             else:
                 print(f"[TomosManga] Brave no encontrado en rutas comunes, usando Chrome por defecto")
             
-            driver = webdriver.Chrome(options=options)
+            driver = launch_chrome(options, 'TomosManga ouo.io', self.browser_budget)
+            launched.append(driver)
             
             if self.cancelled:
                 if driver:
@@ -1246,433 +1292,420 @@ class TomosMangaDownloader:
             print(f"[TomosManga ERROR] Traceback: {traceback.format_exc()}")
             return None
     
-    def download_file_with_selenium(self, driver, download_button, download_dir, expected_filename, total_size=None, chapter_name=None):
-        if not driver or not download_button:
-            print(f"[TomosManga ERROR] No hay navegador o botón disponible para descargar")
-            return False
-        
+    def capture_download_url(self, driver, download_button):
+        download_dir = tempfile.mkdtemp(prefix='fireload_')
         try:
-            os.makedirs(download_dir, exist_ok=True)
-            
+            driver.execute_cdp_cmd('Browser.setDownloadBehavior', {'behavior': 'allow', 'downloadPath': download_dir, 'eventsEnabled': True})
+            driver.get_log('performance')
+            driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", download_button)
+            deadline = time.time() + 20
+            while time.time() < deadline and not self.cancelled:
+                for entry in driver.get_log('performance'):
+                    try:
+                        message = json.loads(entry['message'])['message']
+                    except (ValueError, KeyError):
+                        continue
+                    if message.get('method') in ('Page.downloadWillBegin', 'Browser.downloadWillBegin'):
+                        self.stop_browser_download(driver, message['params'].get('guid'))
+                        return message['params'].get('url')
+                time.sleep(0.5)
+            return None
+        except Exception as e:
+            print(f"[TomosManga ERROR] No se pudo capturar la URL de descarga: {e}")
+            return None
+        finally:
+            self.stop_browser_download(driver)
+            shutil.rmtree(download_dir, ignore_errors=True)
+
+    def stop_browser_download(self, driver, guid=None):
+        try:
+            driver.execute_cdp_cmd('Browser.setDownloadBehavior', {'behavior': 'deny'})
+            if guid:
+                driver.execute_cdp_cmd('Browser.cancelDownload', {'guid': guid})
+        except Exception:
+            pass
+
+    def build_fireload_artifact(self, result):
+        driver = result.get('driver')
+        if not driver:
+            return None
+        try:
+            download_button = result['download_button']
+            direct_url = download_button.get_attribute('data-dlink-value') or download_button.get_attribute('href')
+            if not direct_url or direct_url.startswith('javascript:') or direct_url.split('#')[0] == driver.current_url.split('#')[0]:
+                print(f"[TomosManga] El botón no expone un enlace directo, capturando la descarga...")
+                direct_url = self.capture_download_url(driver, download_button)
+            if not direct_url:
+                print(f"[TomosManga ERROR] No se obtuvo la URL directa de fireload")
+                return None
+            referer = driver.current_url
+            artifact = {
+                'fireload_url': result['fireload_url'],
+                'direct_url': urljoin(referer, direct_url),
+                'cookies': {cookie['name']: cookie['value'] for cookie in driver.get_cookies()},
+                'referer': referer,
+                'user_agent': driver.execute_script("return navigator.userAgent"),
+                'file_size': result.get('file_size')
+            }
+            print(f"[TomosManga] ✓ Enlace directo obtenido: {artifact['direct_url'][:100]}")
+            return artifact
+        except Exception as e:
+            print(f"[TomosManga ERROR] Error al extraer el enlace de fireload: {e}")
+            return None
+        finally:
             try:
-                driver.execute_cdp_cmd('Page.setDownloadBehavior', {
-                    'behavior': 'allow',
-                    'downloadPath': os.path.abspath(download_dir)
-                })
-            except Exception:
+                driver.quit()
+            except:
                 pass
-            
-            files_before = set(os.listdir(download_dir)) if os.path.exists(download_dir) else set()
-            
-            download_url = download_button.get_attribute('data-dlink-value') or download_button.get_attribute('href')
-            if download_url and download_url.startswith('javascript:'):
-                download_url = None
-            
-            time.sleep(2)
-            
-            initial_button_text = download_button.text.strip().lower()
-            
-            current_window_before = driver.current_window_handle
-            all_windows_before = driver.window_handles
-            
-            # Intentar hacer clic múltiples veces si es necesario
-            max_click_attempts = 5
-            click_attempt = 0
-            download_started = False
-            
-            while click_attempt < max_click_attempts and not download_started:
-                click_attempt += 1
-                
+
+    def _load_part_meta(self, meta_path):
+        if not os.path.exists(meta_path):
+            return {}
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except:
+            return {}
+    
+    def _save_part_meta(self, meta_path, meta):
+        try:
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+        except Exception as e:
+            print(f"[TomosManga] No se pudo guardar estado de descarga: {e}")
+    
+    def _verify_etag(self, filepath, etag):
+        if not etag:
+            return True
+        etag_value = etag.strip().strip('"')
+        if etag.startswith('W/') or not re.fullmatch(r'[0-9a-fA-F]{32}', etag_value):
+            return True
+        md5 = hashlib.md5()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(block)
+        return md5.hexdigest().lower() == etag_value.lower()
+    
+    def _probe_range_support(self, url, cookies=None, headers=None):
+        request_headers = dict(headers or {})
+        request_headers['Range'] = 'bytes=0-0'
+        try:
+            with self.session.get(url, stream=True, timeout=self.config['timeout'], cookies=cookies, headers=request_headers) as response:
+                if response.status_code != 206:
+                    return None
+                match = re.match(r'bytes\s+0-0/(\d+)', response.headers.get('content-range', ''))
+                if not match:
+                    return None
+                return {
+                    'total_size': int(match.group(1)),
+                    'etag': response.headers.get('etag'),
+                    'last_modified': response.headers.get('last-modified')
+                }
+        except Exception as e:
+            print(f"[TomosManga] No se pudo comprobar soporte de rangos: {e}")
+            return None
+    
+    def download_file_segmented(self, url, filepath, cookies=None, headers=None, chapter_name=None):
+        segments_count = self.config.get('download_segments', 4)
+        min_segment_size = self.config.get('download_min_segment_mb', 8) * 1024 * 1024
+        part_path = filepath + '.part'
+        meta_path = filepath + '.part.json'
+        meta = self._load_part_meta(meta_path)
+        
+        if os.path.exists(part_path) and meta and not meta.get('segments'):
+            return None
+        
+        probe = self._probe_range_support(url, cookies=cookies, headers=headers)
+        if not probe:
+            if meta.get('segments') and os.path.exists(part_path):
+                print(f"[TomosManga ERROR] No se pudo reanudar la descarga segmentada, el progreso se conserva")
+                return False
+            print(f"[TomosManga] El servidor no admite rangos, usando descarga simple")
+            return None
+        
+        total_size = probe['total_size']
+        if total_size < min_segment_size * 2:
+            return None
+        
+        same_file = (meta.get('segments') and meta.get('total_size') == total_size
+                     and meta.get('etag') == probe['etag'] and meta.get('last_modified') == probe['last_modified'])
+        if not same_file or not os.path.exists(part_path):
+            segments_count = max(1, min(segments_count, total_size // min_segment_size))
+            segment_size = total_size // segments_count
+            segments = []
+            for i in range(segments_count):
+                start = i * segment_size
+                end = total_size - 1 if i == segments_count - 1 else start + segment_size - 1
+                segments.append([start, end, 0])
+            meta = {
+                'url': url,
+                'etag': probe['etag'],
+                'last_modified': probe['last_modified'],
+                'total_size': total_size,
+                'segments': segments
+            }
+            with open(part_path, 'wb') as f:
+                f.truncate(total_size)
+            self._save_part_meta(meta_path, meta)
+            print(f"[TomosManga] Descarga segmentada: {segments_count} segmentos de {segment_size / (1024 * 1024):.2f} MB")
+        else:
+            print(f"[TomosManga] Reanudando descarga segmentada ({len(meta['segments'])} segmentos)")
+        
+        segments = meta['segments']
+        validator = meta.get('etag') or meta.get('last_modified')
+        state_lock = Lock()
+        progress = {'downloaded': sum(seg[2] for seg in segments), 'changed': False}
+        initial_downloaded = progress['downloaded']
+        max_attempts = self.config.get('retry_attempts', 5)
+        
+        def download_segment(segment):
+            attempt = 0
+            while segment[0] + segment[2] <= segment[1]:
+                if self.cancelled or progress['changed']:
+                    return False
+                request_headers = dict(headers or {})
+                request_headers['Range'] = f"bytes={segment[0] + segment[2]}-{segment[1]}"
+                if validator:
+                    request_headers['If-Range'] = validator
                 try:
-                    wait = WebDriverWait(driver, 10)
-                    download_button = wait.until(
-                        EC.presence_of_element_located((By.ID, "downloadButton"))
-                    )
-                except:
-                    try:
-                        download_button = driver.find_element(By.XPATH, "//a[@id='downloadButton'] | //a[contains(@class, 'download-button')] | //a[contains(@data-dlink-value, 'fireload')] | //a[contains(text(), 'Download File')]")
-                    except:
-                        print(f"[TomosManga] No se pudo encontrar el botón en intento {click_attempt}")
-                        if click_attempt < max_click_attempts:
-                            time.sleep(3)
-                            continue
-                        else:
+                    with self.session.get(url, stream=True, timeout=self.config['timeout'], cookies=cookies, headers=request_headers) as response:
+                        response.raise_for_status()
+                        if response.status_code != 206:
+                            progress['changed'] = True
                             return False
-                
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView(true);", download_button)
-                    time.sleep(0.5)
-                    driver.execute_script("arguments[0].click();", download_button)
+                        with open(part_path, 'r+b') as f:
+                            f.seek(segment[0] + segment[2])
+                            pending = 0
+                            try:
+                                for chunk in response.iter_content(chunk_size=64 * 1024):
+                                    if self.cancelled or progress['changed']:
+                                        return False
+                                    if chunk:
+                                        remaining = segment[1] - (segment[0] + segment[2] + pending) + 1
+                                        chunk = chunk[:remaining]
+                                        f.write(chunk)
+                                        pending += len(chunk)
+                                        with state_lock:
+                                            progress['downloaded'] += len(chunk)
+                                        if pending >= SEGMENT_SYNC_BYTES:
+                                            f.flush()
+                                            os.fsync(f.fileno())
+                                            with state_lock:
+                                                segment[2] += pending
+                                            pending = 0
+                            finally:
+                                f.flush()
+                                os.fsync(f.fileno())
+                                with state_lock:
+                                    segment[2] += pending
                 except Exception as e:
-                    print(f"[TomosManga] Clic con JavaScript falló: {e}, intentando clic normal...")
-                    try:
-                        download_button.click()
-                    except Exception as e2:
-                        print(f"[TomosManga] Clic normal también falló: {e2}")
-                        if click_attempt < max_click_attempts:
-                            time.sleep(3)
-                            continue
-                        else:
-                            return False
-                
-                # Monitorear cambios en el botón y archivos nuevos
-                button_changed = False
-                files_changed = False
-                
-                # Esperar hasta 20 segundos para detectar inicio de descarga
-                for check in range(20):
-                    if self.cancelled:
+                    attempt += 1
+                    if attempt >= max_attempts:
+                        print(f"[TomosManga ERROR] Segmento {segment[0]}-{segment[1]} falló: {e}")
                         return False
-                    
-                    time.sleep(1)
-                    
-                    # Verificar cambio en el botón
-                    try:
-                        current_text = download_button.text.strip().lower()
-                        if current_text != initial_button_text:
-                            if 'starting' in current_text or 'iniciando' in current_text or 'download' in current_text or 'descarga' in current_text or 'wait' in current_text or 'espera' in current_text:
-                                button_changed = True
-                                download_started = True
-                                break
-                    except Exception as e:
-                        pass
-                    
-                    if os.path.exists(download_dir):
-                        files_after_check = set(os.listdir(download_dir))
-                        new_files_check = files_after_check - files_before
-                        if new_files_check:
-                            for filename in new_files_check:
-                                filepath = os.path.join(download_dir, filename)
-                                if os.path.isfile(filepath):
-                                    try:
-                                        file_size = os.path.getsize(filepath)
-                                        if file_size > 0:
-                                            files_changed = True
-                                            download_started = True
-                                            break
-                                    except:
-                                        pass
-                        if files_changed:
-                            break
-                
-                if download_started:
-                    break
-                else:
-                    if click_attempt < max_click_attempts:
-                        time.sleep(3)
-                        try:
-                            wait = WebDriverWait(driver, 5)
-                            download_button = wait.until(
-                                EC.presence_of_element_located((By.ID, "downloadButton"))
-                            )
-                            print(f"[TomosManga] Botón encontrado nuevamente, continuando monitoreo...")
-                        except:
-                            print(f"[TomosManga] No se pudo encontrar el botón, pero continuando monitoreo de archivos...")
-            
-            all_windows_after = driver.window_handles
-            
-            if len(all_windows_after) > len(all_windows_before):
-                    print(f"[TomosManga] Se detectaron nuevas ventanas, cerrando ventanas de publicidad...")
-                    windows_to_close = []
-                    for window in all_windows_after:
-                        if window not in all_windows_before:
-                            try:
-                                driver.switch_to.window(window)
-                                new_url = driver.current_url
-                                print(f"[TomosManga] Nueva ventana {window}: {new_url[:80]}...")
-                                if self.is_ad_url(new_url):
-                                    windows_to_close.append(window)
-                                    print(f"[TomosManga] Ventana de publicidad detectada, será cerrada...")
-                                else:
-                                    print(f"[TomosManga] Ventana válida, manteniendo abierta...")
-                            except Exception as e:
-                                print(f"[TomosManga] Error al verificar ventana {window}: {e}")
-                    
-                    for window in windows_to_close:
-                        try:
-                            if window in driver.window_handles:
-                                driver.switch_to.window(window)
-                                driver.close()
-                                print(f"[TomosManga] ✓ Ventana de publicidad cerrada: {window}")
-                        except NoSuchWindowException:
-                            print(f"[TomosManga] Ventana {window} ya fue cerrada")
-                        except Exception as e:
-                            print(f"[TomosManga] Error al cerrar ventana {window}: {e}")
-                    
-                    try:
-                        if current_window_before in driver.window_handles:
-                            driver.switch_to.window(current_window_before)
-                        elif driver.window_handles:
-                            driver.switch_to.window(driver.window_handles[0])
-                    except NoSuchWindowException:
-                        if driver.window_handles:
-                            driver.switch_to.window(driver.window_handles[0])
-            
-            waited = 0
-            downloaded_file = None
-            last_size = 0
-            stable_count = 0
-            temp_file = None
-            max_stable_checks = 10
-            previous_sizes = []
-            size_history_window = 10
-            last_callback_time = 0
-            callback_interval = 2
-            
-            pbar = None
-            if total_size and total_size > 0:
-                pbar = tqdm(total=total_size, unit='B', unit_scale=True, unit_divisor=1024, desc=f"  {expected_filename}", leave=True, ncols=100, miniters=1024*1024, mininterval=0.5, file=sys.stdout)
-            
-            while True:
-                if self.cancelled:
-                    if pbar:
-                        pbar.close()
-                    print(f"[TomosManga] Descarga cancelada")
-                    if temp_file and os.path.exists(temp_file):
-                        try:
-                            os.remove(temp_file)
-                        except:
-                            pass
-                    return False
-                
+                    time.sleep(self.config.get('retry_delay', 2))
+            return True
+        
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+            futures = [executor.submit(download_segment, segment) for segment in segments if segment[0] + segment[2] <= segment[1]]
+            while any(not future.done() for future in futures):
                 time.sleep(1)
-                waited += 1
-                
-                if not os.path.exists(download_dir):
-                    continue
-                
-                if temp_file and os.path.exists(temp_file) and self.callbacks['on_download_progress'] and (waited - last_callback_time) >= callback_interval:
-                    try:
-                        current_check_size = os.path.getsize(temp_file)
-                        if current_check_size > 0:
-                            percent = 0
-                            speed_mb = 0
-                            if total_size and total_size > 0:
-                                percent = (current_check_size / total_size) * 100
-                                if len(previous_sizes) >= 2:
-                                    time_diff = waited - previous_sizes[-1][0] if previous_sizes else 1
-                                    size_diff = current_check_size - previous_sizes[-1][1] if previous_sizes else current_check_size
-                                    if time_diff > 0:
-                                        speed_mb = (size_diff / (1024 * 1024)) / time_diff
-                            self.callbacks['on_download_progress'](chapter_name or expected_filename, percent, speed_mb, current_check_size, total_size or current_check_size)
-                            last_callback_time = waited
-                    except:
-                        pass
-                
-                    
-                files_after = set(os.listdir(download_dir))
-                new_files = files_after - files_before
-                
-                if new_files:
-                    for filename in new_files:
-                        filepath = os.path.join(download_dir, filename)
-                        if os.path.isfile(filepath):
-                            try:
-                                file_size = os.path.getsize(filepath)
-                                if file_size > 0:
-                                    if filename.endswith('.tmp') or filename.endswith('.crdownload'):
-                                        temp_file = filepath
-                                        if file_size != last_size:
-                                            if pbar and file_size > last_size:
-                                                pbar.update(file_size - last_size)
-                                                pbar.refresh()
-                                            
-                                            if self.callbacks['on_download_progress']:
-                                                try:
-                                                    percent = 0
-                                                    speed_mb = 0
-                                                    if total_size and total_size > 0:
-                                                        percent = (file_size / total_size) * 100
-                                                        if len(previous_sizes) >= 2:
-                                                            time_diff = waited - previous_sizes[-1][0] if previous_sizes else 1
-                                                            size_diff = file_size - previous_sizes[-1][1] if previous_sizes else file_size
-                                                            if time_diff > 0:
-                                                                speed_mb = (size_diff / (1024 * 1024)) / time_diff
-                                                    self.callbacks['on_download_progress'](chapter_name or expected_filename, percent, speed_mb, file_size, total_size or file_size)
-                                                except Exception as e:
-                                                    print(f"[DEBUG] Error en callback on_download_progress: {e}")
-                                            
-                                            last_size = file_size
-                                            stable_count = 0
-                                            if len(previous_sizes) >= size_history_window:
-                                                previous_sizes.pop(0)
-                                            previous_sizes.append((waited, file_size))
-                                        else:
-                                            stable_count += 1
-                                        
-                                        if stable_count >= max_stable_checks:
-                                            if pbar:
-                                                pbar.n = total_size if total_size else file_size
-                                                pbar.refresh()
-                                                pbar.close()
-                                            base_name = os.path.basename(temp_file).rsplit('.', 1)[0]
-                                            if download_url:
-                                                if '.rar' in download_url.lower():
-                                                    final_name = base_name + '.rar'
-                                                elif '.zip' in download_url.lower():
-                                                    final_name = base_name + '.zip'
-                                                else:
-                                                    final_name = base_name + '.rar'
-                                            else:
-                                                final_name = base_name + '.rar'
-                                            final_path = os.path.join(download_dir, final_name)
-                                            if not os.path.exists(final_path):
-                                                os.rename(temp_file, final_path)
-                                                print(f"[TomosManga] ✓ Archivo completado y renombrado: {final_name} ({file_size / (1024 * 1024):.2f} MB)")
-                                                return final_path
-                                    else:
-                                        downloaded_file = filepath
-                                        if pbar:
-                                            pbar.n = total_size if total_size else file_size
-                                            pbar.refresh()
-                                            pbar.close()
-                                        print(f"[TomosManga] ✓ Archivo descargado encontrado: {filename} ({file_size / (1024 * 1024):.2f} MB)")
-                                        time.sleep(2)
-                                        final_size = os.path.getsize(downloaded_file)
-                                        if final_size == file_size:
-                                            print(f"[TomosManga] ✓ Descarga completada: {os.path.basename(downloaded_file)}")
-                                            return downloaded_file
-                            except Exception as e:
-                                continue
-                
-                
-                if temp_file and os.path.exists(temp_file):
+                with state_lock:
+                    downloaded = progress['downloaded']
+                    self._save_part_meta(meta_path, meta)
+                elapsed = time.time() - start_time
+                speed_mb = ((downloaded - initial_downloaded) / (1024 * 1024)) / elapsed if elapsed > 0 else 0
+                percent = (downloaded / total_size) * 100
+                if self.callbacks['on_download_progress']:
                     try:
-                        current_size = os.path.getsize(temp_file)
-                        if current_size != last_size:
-                            if pbar and current_size > last_size:
-                                pbar.update(current_size - last_size)
-                                pbar.refresh()
-                            
-                            if self.callbacks['on_download_progress']:
-                                try:
-                                    percent = 0
-                                    speed_mb = 0
-                                    if total_size and total_size > 0:
-                                        percent = (current_size / total_size) * 100
-                                        if len(previous_sizes) >= 2:
-                                            time_diff = waited - previous_sizes[-1][0] if previous_sizes else 1
-                                            size_diff = current_size - previous_sizes[-1][1] if previous_sizes else current_size
-                                            if time_diff > 0:
-                                                speed_mb = (size_diff / (1024 * 1024)) / time_diff
-                                    self.callbacks['on_download_progress'](chapter_name or expected_filename, percent, speed_mb, current_size, total_size or current_size)
-                                except Exception as e:
-                                    print(f"[DEBUG] Error en callback on_download_progress: {e}")
-                            
-                            last_size = current_size
-                            if len(previous_sizes) >= size_history_window:
-                                previous_sizes.pop(0)
-                            previous_sizes.append((waited, current_size))
-                            stable_count = 0
-                        elif current_size > 0 and current_size == last_size:
-                            if stable_count >= max_stable_checks:
-                                if pbar:
-                                    pbar.n = total_size if total_size else current_size
-                                    pbar.refresh()
-                                    pbar.close()
-                                base_name = os.path.basename(temp_file).rsplit('.', 1)[0]
-                                if download_url:
-                                    if '.rar' in download_url.lower():
-                                        final_name = base_name + '.rar'
-                                    elif '.zip' in download_url.lower():
-                                        final_name = base_name + '.zip'
-                                    else:
-                                        final_name = base_name + '.rar'
-                                else:
-                                    final_name = base_name + '.rar'
-                                final_path = os.path.join(download_dir, final_name)
-                                if not os.path.exists(final_path):
-                                    os.rename(temp_file, final_path)
-                                    if not pbar:
-                                        print(f"[TomosManga] ✓ Archivo descargado completamente: {final_name} ({current_size / (1024 * 1024):.2f} MB)")
-                                    return final_path
+                        self.callbacks['on_download_progress'](chapter_name or os.path.basename(filepath), percent, speed_mb, downloaded, total_size)
                     except:
                         pass
-            
-            if pbar:
-                pbar.close()
-            
-            if downloaded_file:
-                if not pbar:
-                    print(f"[TomosManga] ✓ Archivo descargado: {os.path.basename(downloaded_file)}")
-                return downloaded_file
-            elif temp_file and os.path.exists(temp_file):
-                try:
-                    base_name = os.path.basename(temp_file).rsplit('.', 1)[0]
-                    final_name = base_name + ('.rar' if download_url and '.rar' in download_url.lower() else '.zip')
-                    final_path = os.path.join(download_dir, final_name)
-                    if not os.path.exists(final_path):
-                        os.rename(temp_file, final_path)
-                        if not pbar:
-                            print(f"[TomosManga] ✓ Archivo renombrado al finalizar: {final_name}")
-                        return final_path
-                except Exception as e:
-                    pass
-            
-            if not downloaded_file and not temp_file:
-                if pbar:
-                    pbar.close()
-                print(f"[TomosManga ERROR] No se detectó ningún archivo descargado")
-                return False
-                
-        except Exception as e:
-            print(f"[TomosManga ERROR] Error al descargar archivo con Selenium: {e}")
-            import traceback
-            print(f"[TomosManga ERROR] Traceback: {traceback.format_exc()}")
+            results = [future.result() for future in futures]
+        
+        with state_lock:
+            self._save_part_meta(meta_path, meta)
+        
+        if progress['changed']:
+            print(f"[TomosManga] El archivo cambió en el servidor, reiniciando con descarga simple")
+            for path in (part_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return None
+        
+        if self.cancelled:
+            print(f"[TomosManga] Descarga cancelada (progreso conservado en {part_path})")
             return False
-
-    def download_file(self, url, filepath, cookies=None):
+        
+        if not all(results) or progress['downloaded'] != total_size:
+            print(f"[TomosManga ERROR] Descarga segmentada incompleta, el progreso se conserva para reanudar más tarde")
+            return False
+        
+        if not self._verify_etag(part_path, meta.get('etag')):
+            print(f"[TomosManga ERROR] El archivo no coincide con el ETag del servidor, se descartará")
+            for path in (part_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return False
+        
+        os.replace(part_path, filepath)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        print(f"[TomosManga] ✓ Archivo descargado correctamente ({total_size / (1024 * 1024):.2f} MB)")
+        return True
+    
+    def download_file(self, url, filepath, cookies=None, headers=None, chapter_name=None, expected_size=None):
         print(f"[TomosManga] Iniciando descarga de archivo...")
         print(f"[TomosManga] URL: {url}")
         print(f"[TomosManga] Guardando en: {filepath}")
         
-        try:
-            print(f"[TomosManga] Enviando solicitud HTTP...")
-            if cookies:
-                print(f"[TomosManga] Usando {len(cookies)} cookies del navegador")
-                response = self.session.get(url, stream=True, timeout=self.config['timeout'], cookies=cookies)
-            else:
-                response = self.session.get(url, stream=True, timeout=self.config['timeout'])
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            if total_size > 0:
-                size_mb = total_size / (1024 * 1024)
-                print(f"[TomosManga] Tamaño del archivo: {size_mb:.2f} MB")
-            else:
-                print(f"[TomosManga] Tamaño del archivo: desconocido")
+        if self.config.get('download_segments', 4) > 1:
+            result = self.download_file_segmented(url, filepath, cookies=cookies, headers=headers, chapter_name=chapter_name)
+            if result is not None:
+                return result
+        
+        part_path = filepath + '.part'
+        meta_path = filepath + '.part.json'
+        meta = self._load_part_meta(meta_path)
+        
+        if meta.get('segments'):
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            meta = {}
+        
+        if meta.get('url') and meta.get('url') != url:
+            print(f"[TomosManga] La URL cambió desde la descarga parcial, conservando progreso si el servidor lo valida")
+        
+        if cookies:
+            print(f"[TomosManga] Usando {len(cookies)} cookies del navegador")
+        
+        max_attempts = self.config.get('retry_attempts', 5)
+        attempt = 0
+        
+        while attempt < max_attempts:
+            if self.cancelled:
+                print(f"[TomosManga] Descarga cancelada (progreso conservado en {part_path})")
+                return False
             
-            print(f"[TomosManga] Descargando archivo...")
-            with open(filepath, 'wb') as f:
-                if total_size == 0:
-                    f.write(response.content)
-                    print(f"[TomosManga] Archivo descargado (sin tamaño conocido)")
-                else:
-                    downloaded = 0
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if self.cancelled:
-                            print(f"[TomosManga] Descarga cancelada")
-                            return False
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            if total_size > 0:
-                                percent = (downloaded / total_size) * 100
-                                if downloaded % (1024 * 1024) == 0:
-                                    print(f"[TomosManga] Progreso: {percent:.1f}% ({downloaded / (1024 * 1024):.2f} MB / {total_size / (1024 * 1024):.2f} MB)")
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            request_headers = dict(headers or {})
+            validator = meta.get('etag') or meta.get('last_modified')
+            known_size = meta.get('total_size') or expected_size or 0
+            if offset > 0 and (validator or known_size):
+                request_headers['Range'] = f"bytes={offset}-"
+                if validator:
+                    request_headers['If-Range'] = validator
+                print(f"[TomosManga] Reanudando descarga desde {offset / (1024 * 1024):.2f} MB")
+            elif offset > 0:
+                offset = 0
             
-            file_size = os.path.getsize(filepath)
-            if file_size > 0:
-                print(f"[TomosManga] ✓ Archivo descargado correctamente ({file_size / (1024 * 1024):.2f} MB)")
-                return True
-            else:
-                print(f"[TomosManga ERROR] Archivo descargado está vacío")
-                return False
-        except Exception as e:
-            print(f"[TomosManga ERROR] Error al descargar archivo: {e}")
-            import traceback
-            print(f"[TomosManga ERROR] Traceback: {traceback.format_exc()}")
+            try:
+                print(f"[TomosManga] Enviando solicitud HTTP...")
+                with self.session.get(url, stream=True, timeout=self.config['timeout'], cookies=cookies, headers=request_headers) as response:
+                    if response.status_code == 416 and offset > 0:
+                        total_size = meta.get('total_size') or 0
+                        if total_size and offset == total_size:
+                            break
+                        print(f"[TomosManga] Rango no válido, reiniciando descarga")
+                        os.remove(part_path)
+                        meta = {}
+                        continue
+                    response.raise_for_status()
+                    
+                    if response.status_code == 206:
+                        content_range = response.headers.get('content-range', '')
+                        match = re.match(r'bytes\s+(\d+)-(\d+)/(\d+|\*)', content_range)
+                        unverified = not validator and match and match.group(3) != str(known_size)
+                        if not match or int(match.group(1)) != offset or unverified:
+                            print(f"[TomosManga] Content-Range inesperado ({content_range}), reiniciando descarga")
+                            os.remove(part_path)
+                            meta = {}
+                            continue
+                        if match.group(3) != '*':
+                            meta['total_size'] = int(match.group(3))
+                        mode = 'ab'
+                    else:
+                        if offset > 0:
+                            print(f"[TomosManga] El servidor no aceptó el rango, reiniciando desde cero")
+                        offset = 0
+                        content_length = int(response.headers.get('content-length', 0))
+                        meta = {
+                            'url': url,
+                            'etag': response.headers.get('etag'),
+                            'last_modified': response.headers.get('last-modified'),
+                            'total_size': content_length or expected_size or 0
+                        }
+                        mode = 'wb'
+                    self._save_part_meta(meta_path, meta)
+                    
+                    total_size = meta.get('total_size') or 0
+                    if total_size > 0:
+                        print(f"[TomosManga] Tamaño del archivo: {total_size / (1024 * 1024):.2f} MB")
+                    else:
+                        print(f"[TomosManga] Tamaño del archivo: desconocido")
+                    
+                    print(f"[TomosManga] Descargando archivo...")
+                    downloaded = offset
+                    start_time = time.time()
+                    last_report = start_time
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size=64 * 1024):
+                            if self.cancelled:
+                                print(f"[TomosManga] Descarga cancelada (progreso conservado en {part_path})")
+                                return False
+                            if chunk:
+                                f.write(chunk)
+                                downloaded += len(chunk)
+                                now = time.time()
+                                if now - last_report >= 1:
+                                    last_report = now
+                                    elapsed = now - start_time
+                                    speed_mb = ((downloaded - offset) / (1024 * 1024)) / elapsed if elapsed > 0 else 0
+                                    percent = (downloaded / total_size) * 100 if total_size > 0 else 0
+                                    if self.callbacks['on_download_progress']:
+                                        try:
+                                            self.callbacks['on_download_progress'](chapter_name or os.path.basename(filepath), percent, speed_mb, downloaded, total_size or downloaded)
+                                        except:
+                                            pass
+                break
+            except Exception as e:
+                attempt += 1
+                print(f"[TomosManga ERROR] Error al descargar archivo (intento {attempt}/{max_attempts}): {e}")
+                if attempt < max_attempts:
+                    time.sleep(self.config.get('retry_delay', 2))
+        else:
+            print(f"[TomosManga ERROR] Descarga incompleta, el progreso se conserva para reanudar más tarde")
+            return False
+        
+        if not os.path.exists(part_path):
+            print(f"[TomosManga ERROR] Archivo descargado está vacío")
+            return False
+        
+        file_size = os.path.getsize(part_path)
+        total_size = meta.get('total_size') or 0
+        if file_size == 0:
+            print(f"[TomosManga ERROR] Archivo descargado está vacío")
+            return False
+        if total_size and file_size != total_size:
+            print(f"[TomosManga ERROR] Tamaño incorrecto: {file_size} bytes, se esperaban {total_size} bytes")
+            if file_size > total_size:
+                os.remove(part_path)
+                if os.path.exists(meta_path):
+                    os.remove(meta_path)
+            return False
+        if not self._verify_etag(part_path, meta.get('etag')):
+            print(f"[TomosManga ERROR] El archivo no coincide con el ETag del servidor, se descartará")
+            os.remove(part_path)
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
             return False
+        
+        os.replace(part_path, filepath)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        print(f"[TomosManga] ✓ Archivo descargado correctamente ({file_size / (1024 * 1024):.2f} MB)")
+        return True
 
     def get_manga_title(self, html_content):
         print(f"[TomosManga] Extrayendo título del manga...")
@@ -1845,18 +1878,16 @@ class TomosMangaDownloader:
         return "0"
 
     def _get_single_fireload_url(self, volume, idx, total):
-        if self.cancelled:
-            return {
-                'chapter_name': volume['name'],
-                'fireload_url': None,
-                'driver': None,
-                'download_button': None,
-                'tab_handle': None,
-                'index': idx - 1
-            }
-        
         chapter_name = volume['name']
-        chapter_url = volume['url']
+        failed = {
+            'chapter_name': chapter_name,
+            'fireload_url': None,
+            'direct_url': None,
+            'index': idx - 1
+        }
+        
+        if self.cancelled:
+            return failed
         
         with self.print_lock:
             print(f"[{idx}/{total}] Obteniendo URL de fireload para: {chapter_name}")
@@ -1867,163 +1898,40 @@ class TomosMangaDownloader:
             except:
                 pass
         
-        result = self.bypass_ouo_io(chapter_url)
+        result = self.bypass_ouo_io(volume['url'])
         
         if self.cancelled:
-            if result and result.get('driver'):
-                try:
-                    result['driver'].quit()
-                except:
-                    pass
-            return {
-                'chapter_name': chapter_name,
-                'fireload_url': None,
-                'driver': None,
-                'download_button': None,
-                'tab_handle': None,
-                'index': idx - 1
-            }
+            return failed
         
-        if result and result.get('fireload_url') and result.get('driver') and result.get('download_button'):
+        if result and result.get('direct_url'):
             with self.print_lock:
                 print(f"[TomosManga] ✓ URL de fireload obtenida para {chapter_name}")
-            return {
-                'chapter_name': chapter_name,
-                'fireload_url': result['fireload_url'],
-                'driver': result['driver'],
-                'download_button': result['download_button'],
-                'tab_handle': result.get('tab_handle'),
-                'file_size': result.get('file_size'),
-                'index': idx - 1
-            }
-        else:
-            with self.print_lock:
-                print(f"[TomosManga ERROR] No se pudo obtener URL de fireload para {chapter_name}")
-            return {
-                'chapter_name': chapter_name,
-                'fireload_url': None,
-                'driver': None,
-                'download_button': None,
-                'tab_handle': None,
-                'index': idx - 1
-            }
-    
-    def get_fireload_urls(self, volumes):
-        print(f"\n{'='*60}")
-        print(f"[TomosManga] Obteniendo URLs de fireload para {len(volumes)} tomos...")
-        print(f"{'='*60}\n")
-        
-        parallel_tomos = self.config.get('parallel_tomos', 1)
-        fireload_data = [None] * len(volumes)
-        
-        if self.callbacks['on_fireload_progress']:
-            try:
-                self.callbacks['on_fireload_progress'](0, len(volumes), "Iniciando...")
-            except:
-                pass
-        
-        if parallel_tomos > 1 and len(volumes) > 1:
-            with self.print_lock:
-                print(f"[TomosManga] Obteniendo URLs en paralelo (máximo {parallel_tomos} simultáneos)")
-            with ThreadPoolExecutor(max_workers=parallel_tomos) as executor:
-                futures = {executor.submit(self._get_single_fireload_url, volume, idx, len(volumes)): idx 
-                          for idx, volume in enumerate(volumes, start=1)}
-                
-                for future in as_completed(futures):
-                    if self.cancelled:
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        for result in fireload_data:
-                            if result and result.get('driver'):
-                                try:
-                                    result['driver'].quit()
-                                except:
-                                    pass
-                        break
-                    try:
-                        result = future.result()
-                        if result:
-                            fireload_data[result['index']] = result
-                    except Exception as e:
-                        idx = futures[future]
-                        with self.print_lock:
-                            print(f"[TomosManga ERROR] Error al obtener URL para tomo {idx}: {e}")
-                        fireload_data[idx - 1] = {
-                            'chapter_name': volumes[idx - 1]['name'],
-                            'fireload_url': None,
-                            'driver': None,
-                            'download_button': None,
-                            'tab_handle': None,
-                            'index': idx - 1
-                        }
-        else:
-            for idx, volume in enumerate(volumes, start=1):
-                if self.cancelled:
-                    for result in fireload_data:
-                        if result and result.get('driver'):
-                            try:
-                                result['driver'].quit()
-                            except:
-                                pass
-                    break
-                result = self._get_single_fireload_url(volume, idx, len(volumes))
-                if result:
-                    fireload_data[result['index']] = result
-                if idx < len(volumes):
-                    time.sleep(self.config.get('delay_between_chapters', 2))
-        
-        if self.cancelled:
-            for result in fireload_data:
-                if result and result.get('driver'):
-                    try:
-                        result['driver'].quit()
-                    except:
-                        pass
+            return dict(result, chapter_name=chapter_name, index=idx - 1)
         
-        return fireload_data
+        with self.print_lock:
+            print(f"[TomosManga ERROR] No se pudo obtener URL de fireload para {chapter_name}")
+        return failed
     
     def download_chapter(self, chapter_name, fireload_data, output_dir):
         if self.cancelled:
             print(f"[TomosManga] Descarga cancelada para: {chapter_name}")
-            if fireload_data and fireload_data.get('driver'):
-                try:
-                    fireload_data['driver'].quit()
-                except:
-                    pass
             return ([], 0, 0, [])
         
-        if not fireload_data or not fireload_data.get('fireload_url') or not fireload_data.get('driver') or not fireload_data.get('download_button'):
+        if not fireload_data or not fireload_data.get('direct_url'):
             print(f"[TomosManga ERROR] No hay datos de fireload para: {chapter_name}")
-            if fireload_data and fireload_data.get('driver'):
-                try:
-                    fireload_data['driver'].quit()
-                except:
-                    pass
             return ([], 0, 0, [{'url': '', 'error': "No hay datos de fireload", 'index': -1}])
         
         safe_chapter_name = re.sub(r'[<>:"/\\|?*]', '_', chapter_name)
         os.makedirs(output_dir, exist_ok=True)
         
-        driver = fireload_data['driver']
-        download_button = fireload_data['download_button']
-        
         url_ext = '.zip'
         archive_path = os.path.join(output_dir, f"{safe_chapter_name}{url_ext}")
         
         if os.path.exists(archive_path) and not self.config.get('force_redownload', False):
             file_size = os.path.getsize(archive_path) / (1024 * 1024)
             print(f"[TomosManga] ✓ Archivo ya existe: {archive_path} ({file_size:.2f} MB)")
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
             return ([archive_path], 1, 1, [])
         
-        temp_download_dir = os.path.abspath(
-            os.path.join(os.path.dirname(__file__), "downloads", "temp", safe_chapter_name)
-        )
-        os.makedirs(temp_download_dir, exist_ok=True)
-        
         file_size = fireload_data.get('file_size')
         if file_size:
             size_mb = file_size / (1024 * 1024)
@@ -2035,44 +1943,26 @@ class TomosMangaDownloader:
             except:
                 pass
         
-        downloaded_file = None
-        try:
-            downloaded_file = self.download_file_with_selenium(driver, download_button, temp_download_dir, safe_chapter_name, total_size=file_size, chapter_name=chapter_name)
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+        headers = {'Referer': fireload_data.get('referer') or fireload_data['fireload_url']}
+        if fireload_data.get('user_agent'):
+            headers['User-Agent'] = fireload_data['user_agent']
+        
+        downloaded = self.download_file(
+            fireload_data['direct_url'],
+            archive_path,
+            cookies=fireload_data.get('cookies'),
+            headers=headers,
+            chapter_name=chapter_name,
+            expected_size=file_size
+        )
         
         if self.cancelled:
-            if downloaded_file and os.path.exists(downloaded_file):
-                try:
-                    os.remove(downloaded_file)
-                except:
-                    pass
             return ([], 0, 0, [])
         
-        if not downloaded_file:
+        if not downloaded:
             print(f"[TomosManga ERROR] Error al descargar archivo")
             return ([], 0, 0, [{'url': fireload_data['fireload_url'], 'error': "Error al descargar archivo", 'index': -1}])
         
-        print(f"[TomosManga] Moviendo archivo descargado a destino final...")
-        try:
-            if os.path.exists(archive_path):
-                os.remove(archive_path)
-            os.rename(downloaded_file, archive_path)
-            print(f"[TomosManga] ✓ Archivo movido exitosamente")
-        except Exception as e:
-            print(f"[TomosManga ERROR] Error al mover archivo: {e}")
-            import shutil
-            try:
-                shutil.copy2(downloaded_file, archive_path)
-                print(f"[TomosManga] ✓ Archivo copiado exitosamente")
-            except Exception as e2:
-                print(f"[TomosManga ERROR] Error al copiar archivo: {e2}")
-                return ([], 0, 0, [{'url': fireload_data['fireload_url'], 'error': f"Error al mover archivo: {e2}", 'index': -1}])
-        
         file_size = os.path.getsize(archive_path) / (1024 * 1024)
         print(f"[TomosManga] ✓ Archivo descargado exitosamente: {os.path.basename(archive_path)} ({file_size:.2f} MB)")
         print(f"{'='*60}\n")
@@ -2108,18 +1998,11 @@ class TomosMangaDownloader:
         
         result = self.bypass_ouo_io(chapter_url)
         
-        if not result or not result.get('fireload_url') or not result.get('driver') or not result.get('download_button'):
-            print(f"[TomosManga ERROR] No se pudo obtener botón de descarga")
+        if not result or not result.get('direct_url'):
+            print(f"[TomosManga ERROR] No se pudo obtener el enlace de descarga")
             return {'dir': None, 'failed_chapters': [{'chapter_name': chapter_name, 'downloaded': 0, 'total': 1}]}
         
-        fireload_data = {
-            'chapter_name': chapter_name,
-            'fireload_url': result['fireload_url'],
-            'driver': result['driver'],
-            'download_button': result['download_button'],
-            'tab_handle': result.get('tab_handle'),
-            'file_size': result.get('file_size')
-        }
+        fireload_data = dict(result, chapter_name=chapter_name)
         
         downloaded, total, success, failed = self.download_chapter(chapter_name, fireload_data, manga_dir)
         
@@ -2162,7 +2045,7 @@ def main():
     
     print(f"\nDescargando información de: {url}")
     
-    html_content = downloader.get_page(url, use_selenium=True)
+    html_content = downloader.get_listing_page(url)
     if not html_content:
         print("Error: No se pudo descargar la página")
         sys.exit(1)
@@ -2225,16 +2108,11 @@ def main():
     
     save_metadata(manga_title, [{'name': v['name'], 'chapters': [{'name': v['name'], 'url': v['url']}]} for v in volumes], manga_dir)
     
-    print(f"\n{'='*60}")
-    print("OBTENIENDO URLs DE FIRELOAD")
-    print(f"{'='*60}\n")
-    
-    fireload_data_list = downloader.get_fireload_urls(selected_volumes)
-    
     print(f"\n{'='*60}")
     print("INICIANDO DESCARGA")
     print(f"{'='*60}\n")
     
+    parallel_tomos = config.get('parallel_tomos', 1)
     parallel_chapters = config.get('parallel_chapters', 1)
     
     def download_single_chapter(idx, volume, fireload_data):
@@ -2247,12 +2125,26 @@ def main():
             'volume_name': volume['name']
         }
     
-    if parallel_chapters > 1 and len(selected_volumes) > 1:
+    if (parallel_tomos > 1 or parallel_chapters > 1) and len(selected_volumes) > 1:
         with downloader.print_lock:
-            print(f"[TomosManga] Descargando en paralelo (máximo {parallel_chapters} simultáneos)")
-        with ThreadPoolExecutor(max_workers=parallel_chapters) as executor:
-            futures = {executor.submit(download_single_chapter, idx, volume, fireload_data): idx 
-                      for idx, (volume, fireload_data) in enumerate(zip(selected_volumes, fireload_data_list), start=1)}
+            print(f"[TomosManga] Resolviendo enlaces en paralelo (máximo {parallel_tomos}) y descargando en paralelo (máximo {parallel_chapters})")
+        with ThreadPoolExecutor(max_workers=parallel_tomos) as resolver, ThreadPoolExecutor(max_workers=parallel_chapters) as executor:
+            resolving = {resolver.submit(downloader._get_single_fireload_url, volume, idx, len(selected_volumes)): (idx, volume)
+                         for idx, volume in enumerate(selected_volumes, start=1)}
+            futures = {}
+            
+            for future in as_completed(resolving):
+                if downloader.cancelled:
+                    resolver.shutdown(wait=False, cancel_futures=True)
+                    break
+                idx, volume = resolving[future]
+                try:
+                    fireload_data = future.result()
+                except Exception as e:
+                    with downloader.print_lock:
+                        print(f"[ERROR] Error al obtener URL para tomo {idx}: {e}")
+                    continue
+                futures[executor.submit(download_single_chapter, idx, volume, fireload_data)] = idx
             
             for future in as_completed(futures):
                 if downloader.cancelled:
@@ -2270,9 +2162,10 @@ def main():
                     with downloader.print_lock:
                         print(f"[ERROR] Error al descargar tomo {idx}: {e}")
     else:
-        for idx, (volume, fireload_data) in enumerate(zip(selected_volumes, fireload_data_list), start=1):
+        for idx, volume in enumerate(selected_volumes, start=1):
             if downloader.cancelled:
                 break
+            fireload_data = downloader._get_single_fireload_url(volume, idx, len(selected_volumes))
             result = download_single_chapter(idx, volume, fireload_data)
             if result['success']:
                 print(f"[OK] Archivo descargado")
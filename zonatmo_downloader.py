@@ -4,28 +4,25 @@ import re
 import json
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
 import time
-from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock, Semaphore
+from threading import Lock
+from http_utils import create_session, format_pool_stats
+from rate_limit import get_host, get_rate_limiter
+from page_cache import get_page_cache
+from fetch_strategy import get_fetch_strategy, complete_listing
+from session_bridge import SessionBridge
+from download_engine import get_download_engine, chapter_plan, chapter_stat, collect_failed_chapters
+from browser_pool import get_driver_pool, block_requests, NetworkRecorder, expand_viewport, harvest_until_complete
+from selenium_waits import WaitEngine, format_wait_stats
+from fast_extract import stream_matches, find_first, has_class, element_text
 
 try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
     from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
 
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-
 
 def load_config():
     config_path = 'config.json'
@@ -110,112 +107,70 @@ class ZonaTMODownloader:
     def __init__(self, base_url, config):
         self.base_url = base_url
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        max_connections = config.get('parallel_tomos', 1) * config.get('parallel_chapters', 1) * config.get('parallel_images', 1)
-        self.connection_semaphore = Semaphore(min(max_connections, 50))
+        self.rate_limiter = get_rate_limiter(config)
+        self.session = create_session(config, rate_limiter=self.rate_limiter)
+        self.page_cache = get_page_cache(config)
+        self.fetch_strategy = get_fetch_strategy(config)
+        self.session_bridge = SessionBridge(self.session, 'zonatmo', config)
+        self.driver_pool = get_driver_pool(config, site='zonatmo')
+        self.reader_pool = get_driver_pool(config, 'reader', 'zonatmo')
+        self.engine = get_download_engine(config)
         self.print_lock = Lock()
         self.cancelled = False
 
     def cancel(self):
         self.cancelled = True
 
-    def _sleep_with_cancel(self, seconds):
-        end = time.time() + max(0, float(seconds))
-        while time.time() < end:
-            if self.cancelled:
-                return False
-            time.sleep(min(0.1, end - time.time()))
-        return not self.cancelled
+    def pause(self, delay_key):
+        if not self.rate_limiter.has_limit(self.base_url):
+            time.sleep(self.config.get(delay_key, 0))
 
     def get_page(self, url, use_selenium=False):
         if use_selenium and SELENIUM_AVAILABLE:
             return self.get_page_selenium(url)
         try:
+            if self.page_cache:
+                return self.page_cache.get(self.session, url, timeout=self.config['timeout'])
             response = self.session.get(url, timeout=self.config['timeout'])
             response.raise_for_status()
             return response.text
         except requests.RequestException:
             return None
 
+    def get_listing_page(self, url):
+        return self.fetch_strategy.fetch(
+            'zonatmo', 'listado',
+            lambda use_selenium: self.get_page(url, use_selenium=use_selenium),
+            complete_listing(lambda html: self.parse_volumes(html).get('volumes'), r'id=["\']?chapters\b'),
+            selenium_available=SELENIUM_AVAILABLE,
+            bridge=self.session_bridge
+        )
+
     def get_page_selenium(self, url):
         if not SELENIUM_AVAILABLE:
             return None
         if self.cancelled:
             return None
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--disable-cache')
-        options.add_argument('--disable-application-cache')
-        options.add_argument('--disable-offline-load-stale-cache')
-        options.add_argument('--disk-cache-size=0')
-        options.add_argument('--media-cache-size=0')
-        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        prefs = {
-            "profile.default_content_setting_values": {
-                "images": 2
-            },
-            "profile.managed_default_content_settings": {
-                "images": 2
-            }
-        }
-        options.add_experimental_option("prefs", prefs)
         driver = None
         try:
-            driver = webdriver.Chrome(options=options)
+            driver = self.driver_pool.acquire()
+            block_requests(driver, self.config, 'zonatmo')
             driver.get(url)
+            wait = WaitEngine(driver, 'zonatmo', self.config, cancel_check=lambda: self.cancelled)
             
-            if not self._sleep_with_cancel(self.config.get('selenium_wait_time', 10)):
-                if driver:
-                    driver.quit()
-                return None
-            
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            scroll_attempts = 0
-            max_scrolls = 10
-            
-            while scroll_attempts < max_scrolls:
-                if self.cancelled:
-                    if driver:
-                        driver.quit()
-                    return None
-                
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                
-                if not self._sleep_with_cancel(2):
-                    if driver:
-                        driver.quit()
-                    return None
-                
-                new_height = driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
-                scroll_attempts += 1
-            
-            if not self._sleep_with_cancel(2):
-                if driver:
-                    driver.quit()
+            wait.document_ready(timeout=self.config.get('selenium_wait_time', 10))
+            wait.network_idle()
+            if not wait.scroll_to_end():
                 return None
             
             try:
                 show_all_btn = driver.find_element(By.ID, "show-chapters")
                 if show_all_btn:
                     print(f"[ZonaTMO] Botón 'Ver todo' encontrado, haciendo click...")
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", show_all_btn)
-                    if not self._sleep_with_cancel(1):
-                        if driver:
-                            driver.quit()
-                        return None
+                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", show_all_btn)
                     driver.execute_script("arguments[0].click();", show_all_btn)
-                    if not self._sleep_with_cancel(2):
-                        if driver:
-                            driver.quit()
+                    wait.network_idle(timeout=2, stage='ver_todo')
+                    if self.cancelled:
                         return None
             except Exception as e:
                 print(f"[ZonaTMO] Botón 'Ver todo' no disponible o no necesario: {e}")
@@ -231,9 +186,8 @@ class ZonaTMODownloader:
                 
                 if show_all_result:
                     print(f"[ZonaTMO] Ejecutado showAllChapters()")
-                    if not self._sleep_with_cancel(2):
-                        if driver:
-                            driver.quit()
+                    wait.network_idle(timeout=2, stage='ver_todo')
+                    if self.cancelled:
                         return None
                 
                 result = driver.execute_script(r"""
@@ -292,52 +246,29 @@ class ZonaTMODownloader:
                     print(f"[ZonaTMO] Clicked en {result.get('clicked', 0)} botones de {result.get('totalButtons', 0)}")
                     print(f"[ZonaTMO] Expandidos manualmente {result.get('expanded', 0)} divs de {result.get('total', 0)} totales")
                 
-                if not self._sleep_with_cancel(2):
-                    if driver:
-                        driver.quit()
+                wait.network_idle(timeout=2, stage='expandir')
+                if self.cancelled:
                     return None
                 
-                try:
-                    chapters_element = WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located((By.ID, "chapters"))
-                    )
+                if wait.selector_present("#chapters", timeout=20, stage='capitulos'):
                     print(f"[ZonaTMO] div#chapters encontrado después de expansión")
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'start'});", chapters_element)
-                    if not self._sleep_with_cancel(2):
-                        if driver:
-                            driver.quit()
-                        return None
-                except Exception:
-                    try:
-                        chapters_element = WebDriverWait(driver, 5).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, "div.chapters, div[class*='chapters']"))
-                        )
-                        print(f"[ZonaTMO] div.chapters encontrado después de expansión (por CSS)")
-                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'start'});", chapters_element)
-                        if not self._sleep_with_cancel(2):
-                            if driver:
-                                driver.quit()
-                            return None
-                    except Exception as e:
-                        print(f"[ZonaTMO] No se encontró div#chapters después de expansión, intentando con JavaScript: {e}")
-                        try:
-                            driver.execute_script("""
-                                var chaptersDiv = document.getElementById('chapters');
-                                if (!chaptersDiv) {
-                                    chaptersDiv = document.querySelector('div.chapters, div[class*="chapters"]');
-                                }
-                                if (chaptersDiv) {
-                                    chaptersDiv.scrollIntoView({behavior: 'smooth', block: 'start'});
-                                }
-                            """)
-                        except:
-                            pass
-                
-                if not self._sleep_with_cancel(1):
-                    if driver:
-                        driver.quit()
+                elif wait.selector_present("div.chapters, div[class*='chapters']", timeout=5, stage='capitulos'):
+                    print(f"[ZonaTMO] div.chapters encontrado después de expansión (por CSS)")
+                else:
+                    print(f"[ZonaTMO] No se encontró div#chapters después de expansión")
+                if self.cancelled:
                     return None
                 
+                driver.execute_script("""
+                    var chaptersDiv = document.getElementById('chapters');
+                    if (!chaptersDiv) {
+                        chaptersDiv = document.querySelector('div.chapters, div[class*="chapters"]');
+                    }
+                    if (chaptersDiv) {
+                        chaptersDiv.scrollIntoView({block: 'start'});
+                    }
+                """)
+                
                 last_count = 0
                 for scroll_attempt in range(3):
                     chapters_check = driver.execute_script("""
@@ -374,27 +305,20 @@ class ZonaTMODownloader:
                     
                     if scroll_attempt < 2:
                         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                        if not self._sleep_with_cancel(1):
-                            if driver:
-                                driver.quit()
+                        wait.count_stable("#chapters li.upload-link, #chapters li[class*='upload-link']", timeout=2, stage='verificacion')
+                        if self.cancelled:
                             return None
                     
             except Exception as e:
                 print(f"[ZonaTMO] Error al expandir capítulos: {e}")
             
-            html_content = driver.page_source
-            
-            if driver:
-                driver.quit()
-            
-            return html_content
+            html = driver.page_source
+            self.session_bridge.import_driver(driver)
+            return html
         except Exception as e:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
             return None
+        finally:
+            self.driver_pool.release(driver)
 
     def get_manga_title(self, html_content):
         soup = BeautifulSoup(html_content, 'lxml')
@@ -471,6 +395,138 @@ class ZonaTMODownloader:
             print(f"[ZonaTMO ERROR] HTML vacío o muy corto")
             return {'volumes': [], 'common_scanlations': {}}
         
+        collected = None
+        if self.config.get('fast_extract', True):
+            collected = self.collect_chapters_stream(html_content)
+            if collected and collected[0]:
+                print(f"[ZonaTMO] Listado leído en streaming: {collected[1]['total_upload_links']} capítulos")
+            else:
+                collected = None
+        
+        if collected is None:
+            collected = self.collect_chapters_soup(html_content)
+        if collected is None:
+            return {'volumes': [], 'common_scanlations': {}}
+        
+        chapters_by_number, stats = collected
+        return self.build_volumes(chapters_by_number, stats, script_dir)
+    
+    def chapter_from_element(self, li):
+        chapter_link = find_first(li, 'a', lambda node: has_class(node, 'btn-collapse'))
+        if chapter_link is None:
+            return None
+        
+        chapter_text = element_text(chapter_link)
+        if not chapter_text:
+            return None
+        
+        chapter_num_match = re.search(r'Capítulo\s*(\d+\.?\d*)', chapter_text, re.IGNORECASE)
+        if not chapter_num_match:
+            chapter_num_match = re.search(r'(\d+\.?\d*)', chapter_text)
+        if not chapter_num_match:
+            return None
+        
+        try:
+            chapter_num = float(chapter_num_match.group(1))
+        except:
+            chapter_num = 0.0
+        
+        chapter_name = f"Capítulo {chapter_num:g}" if chapter_num % 1 == 0 else f"Capítulo {chapter_num}"
+        
+        match = re.search(r"collapseChapter\('([^']+)'\)", chapter_link.get('onclick', ''))
+        collapsible_id = match.group(1) if match else f"collapsible{chapter_num}"
+        
+        collapsible_div = find_first(li, 'div', lambda node: node.get('id') == collapsible_id)
+        if collapsible_div is None:
+            collapsible_div = find_first(li, 'div', lambda node: 'collapsible' in (node.get('id') or ''))
+        if collapsible_div is None:
+            return None
+        
+        chapter_list_element = find_first(collapsible_div, 'div', lambda node: has_class(node, 'chapter-list-element'))
+        if chapter_list_element is None:
+            chapter_list_element = find_first(collapsible_div, 'div', lambda node: 'chapter-list-element' in (node.get('class') or ''))
+        
+        chapter_list_ul = None
+        if chapter_list_element is not None:
+            chapter_list_ul = find_first(chapter_list_element, 'ul', lambda node: has_class(node, 'chapter-list'))
+        if chapter_list_ul is None:
+            chapter_list_ul = find_first(collapsible_div, 'ul', lambda node: has_class(node, 'chapter-list'))
+        if chapter_list_ul is None:
+            chapter_list_ul = find_first(collapsible_div, 'ul', lambda node: 'chapter-list' in (node.get('class') or ''))
+        if chapter_list_ul is None:
+            return None
+        
+        scanlation_options = []
+        for item in chapter_list_ul.iterdescendants('li'):
+            if not has_class(item, 'list-group-item'):
+                continue
+            
+            group_link = find_first(item, 'a', lambda node: re.search(r'/groups/\d+/', node.get('href') or ''))
+            if group_link is None:
+                continue
+            
+            scanlation_name = element_text(group_link)
+            if not scanlation_name:
+                continue
+            
+            upload_link = find_first(item, 'a', lambda node: re.search(r'/view_uploads/\d+', node.get('href') or ''))
+            if upload_link is None:
+                continue
+            
+            chapter_url = upload_link.get('href')
+            if not chapter_url.startswith('http'):
+                chapter_url = urljoin(self.base_url, chapter_url)
+            
+            scanlation_options.append({
+                'name': chapter_name,
+                'scanlation': scanlation_name,
+                'url': chapter_url,
+                'number': chapter_num
+            })
+        
+        return scanlation_options
+    
+    def collect_chapters_stream(self, html_content):
+        main_chapters = []
+        collapsed_chapters = []
+        
+        def is_chapters_container(element):
+            return element.tag == 'div' and element.get('id') in ('chapters', 'chapters-collapsed')
+        
+        def is_chapter_li(element):
+            if element.tag != 'li':
+                return False
+            if 'upload-link' in (element.get('class') or ''):
+                return True
+            return element.get('data-index') is not None and find_first(element, 'a', lambda node: has_class(node, 'btn-collapse')) is not None
+        
+        def add_chapter(li):
+            if self.cancelled:
+                return
+            in_collapsed = any(div.get('id') == 'chapters-collapsed' for div in li.iterancestors('div'))
+            (collapsed_chapters if in_collapsed else main_chapters).append(self.chapter_from_element(li))
+        
+        if not stream_matches(html_content, is_chapters_container, is_chapter_li, add_chapter):
+            return None
+        
+        chapters_by_number = {}
+        processed_count = 0
+        skipped_count = 0
+        for scanlation_options in main_chapters + collapsed_chapters:
+            if not scanlation_options:
+                skipped_count += 1
+                continue
+            processed_count += 1
+            chapters_by_number.setdefault(scanlation_options[0]['number'], []).extend(scanlation_options)
+        
+        stats = {
+            'total_upload_links': len(main_chapters) + len(collapsed_chapters),
+            'processed_chapters': processed_count,
+            'skipped_count': skipped_count
+        }
+        return chapters_by_number, stats
+    
+    def collect_chapters_soup(self, html_content):
         soup = BeautifulSoup(html_content, 'lxml')
         
         chapters_container = soup.find('div', id='chapters')
@@ -479,7 +535,7 @@ class ZonaTMODownloader:
         
         if not chapters_container:
             print(f"[ZonaTMO ERROR] No se encontró div#chapters")
-            return {'volumes': [], 'common_scanlations': {}}
+            return None
         
         print(f"[ZonaTMO] Contenedor div#chapters encontrado")
         
@@ -551,7 +607,7 @@ class ZonaTMODownloader:
                 print(f"[ZonaTMO] Total encontrados por btn-collapse: {len(upload_links)}")
             else:
                 print(f"[ZonaTMO] No se encontraron capítulos incluso buscando por btn-collapse")
-                return {'volumes': [], 'common_scanlations': {}}
+                return None
         
         chapters_by_number = {}
         processed_count = 0
@@ -803,7 +859,15 @@ class ZonaTMODownloader:
             
             chapters_by_number[chapter_num].extend(scanlation_options)
         
-        print(f"[ZonaTMO] Procesados: {processed_count}, omitidos: {skipped_count}")
+        stats = {
+            'total_upload_links': len(upload_links),
+            'processed_chapters': processed_count,
+            'skipped_count': skipped_count
+        }
+        return chapters_by_number, stats
+    
+    def build_volumes(self, chapters_by_number, stats, script_dir):
+        print(f"[ZonaTMO] Procesados: {stats['processed_chapters']}, omitidos: {stats['skipped_count']}")
         print(f"[ZonaTMO] Capítulos únicos encontrados: {len(chapters_by_number)}")
         
         if chapters_by_number:
@@ -858,9 +922,9 @@ class ZonaTMODownloader:
             debug_links_file = os.path.join(script_dir, 'resources', 'debug', 'debug_links_zonatmo.json')
             with open(debug_links_file, 'w', encoding='utf-8') as f:
                 json.dump({
-                    'total_upload_links': len(upload_links),
-                    'processed_chapters': processed_count,
-                    'skipped_count': skipped_count,
+                    'total_upload_links': stats['total_upload_links'],
+                    'processed_chapters': stats['processed_chapters'],
+                    'skipped_count': stats['skipped_count'],
                     'final_chapters_count': len(chapters_by_number),
                     'all_scanlations': sorted(list(all_scanlations)),
                     'common_scanlations': common_scanlations,
@@ -879,276 +943,208 @@ class ZonaTMODownloader:
         
         return result
 
-    def convert_webp_to_jpg(self, webp_path, jpg_path, quality=95):
-        try:
-            if not PIL_AVAILABLE:
-                return False
-            
-            img = Image.open(webp_path)
-            
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            img.save(jpg_path, 'JPEG', quality=quality, optimize=True)
-            return True
-        except Exception as e:
-            return False
+    def harvest_images(self, driver, recorder, wait):
+        min_size = self.config.get('network_image_min_kb', 5) * 1024
+        
+        def collect():
+            urls = []
+            for image in recorder.image_responses(min_size):
+                lower_url = image['url'].lower()
+                if not any(word in lower_url for word in ('logo', 'avatar', 'icon', 'banner')):
+                    urls.append(image['url'])
+            if urls:
+                hosts = [get_host(url) for url in urls]
+                main_host = max(set(hosts), key=hosts.count)
+                urls = [url for url in urls if get_host(url) == main_host]
+            return urls
+        
+        reader_selector = ".reading-content img, .reader-area img, #readerarea img, .chapter-content img, .viewer-content img, .viewer-container img, .img-container img"
+        return harvest_until_complete(driver, recorder, wait, collect, reader_selector, self.config['selenium_wait_time'])
 
-    def download_image_with_retry(self, img_url, filepath, max_retries=None, referer_url=None):
-        if max_retries is None:
-            max_retries = self.config['retry_attempts']
-        
-        headers = {}
-        if referer_url:
-            headers['Referer'] = referer_url
+    def extract_images_from_html(self, html_content, page_url):
+        images = []
+        soup = BeautifulSoup(html_content, 'lxml')
+        reader_area = soup.find('div', class_=['reading-content', 'reader-area']) or soup.find('div', id='readerarea') or soup.find('div', class_='chapter-content') or soup.find('div', class_='viewer-content') or soup.find('div', class_=lambda x: x and ('viewer' in (' '.join(x) if isinstance(x, list) else str(x))) if x else False)
         
-        for attempt in range(max_retries):
-            if self.cancelled:
-                return False, 0, filepath
-            
-            try:
-                response = self.session.get(img_url, timeout=self.config['timeout'], headers=headers)
-                response.raise_for_status()
-                
-                content = response.content
-                file_size = len(content)
-                
-                if file_size == 0:
-                    raise ValueError(f"Archivo vacío: {file_size} bytes")
-                
-                original_ext = os.path.splitext(filepath)[1].lower()
-                
-                with open(filepath, 'wb') as f:
-                    f.write(content)
-                
-                if original_ext == '.webp' and PIL_AVAILABLE:
-                    base_name = os.path.basename(filepath)
-                    if '-webp' in base_name:
-                        jpg_filename = base_name.replace('-webp', '').replace('.webp', '.jpg')
+        if reader_area:
+            img_tags = reader_area.find_all('img')
+        else:
+            img_tags = soup.find_all('img')
+        
+        for img_tag in img_tags:
+            img_url = img_tag.get('src', '') or img_tag.get('data-src', '') or img_tag.get('data-lazy-src', '') or img_tag.get('data-original', '') or img_tag.get('data-url', '') or img_tag.get('data-srcset', '')
+            if img_url and 'logo' not in img_url.lower() and 'avatar' not in img_url.lower() and 'icon' not in img_url.lower() and 'banner' not in img_url.lower():
+                if not img_url.startswith('http'):
+                    if img_url.startswith('//'):
+                        img_url = 'https:' + img_url
                     else:
-                        jpg_filename = base_name.replace('.webp', '.jpg')
-                    jpg_filepath = os.path.join(os.path.dirname(filepath), jpg_filename)
-                    
-                    if self.convert_webp_to_jpg(filepath, jpg_filepath, quality=95):
-                        try:
-                            os.remove(filepath)
-                        except:
-                            pass
-                        filepath = jpg_filepath
-                        file_size = os.path.getsize(filepath)
-                
-                return True, file_size, filepath
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep(self.config['retry_delay'])
-                else:
-                    return False, 0, filepath
-        
-        return False, 0, filepath
-
-    def download_image_with_semaphore(self, img_url, filepath, img_index, total, referer_url=None):
-        with self.connection_semaphore:
-            if self.cancelled:
-                return (img_index, False, None, filepath)
-            
-            success, file_size, returned_filepath = self.download_image_with_retry(img_url, filepath, referer_url=referer_url)
-            
-            if success and file_size > 0:
-                return (img_index, True, file_size, returned_filepath)
-            else:
-                return (img_index, False, None, filepath)
+                        img_url = urljoin(page_url, img_url)
+                if img_url not in images and ('.jpg' in img_url.lower() or '.jpeg' in img_url.lower() or '.png' in img_url.lower() or '.webp' in img_url.lower() or '/image' in img_url.lower()):
+                    images.append(img_url)
+        return images
 
     def download_chapter_images(self, chapter_url, chapter_name, output_dir):
         if self.cancelled:
             return ([], 0, 0, [], 0)
         
-        if not SELENIUM_AVAILABLE:
-            return ([], 0, 0, [{'url': chapter_url, 'error': "Selenium no está disponible", 'index': -1}], 0)
-        
-        driver = None
         images = []
         current_url = chapter_url
+        methods = self.fetch_strategy.order('zonatmo', 'capitulo', self.session_bridge)
         
-        try:
-            print(f"[ZonaTMO] URL original del capítulo: {chapter_url}")
-            
-            options = Options()
-            options.add_argument('--headless')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-gpu')
-            options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            driver = webdriver.Chrome(options=options)
-            
-            print(f"[ZonaTMO] Accediendo a URL con Selenium: {chapter_url}")
-            driver.get(chapter_url)
-            
-            if not self._sleep_with_cancel(2):
-                if driver:
-                    driver.quit()
-                return ([], 0, 0, [], 0)
+        if 'http' in methods:
+            try:
+                response = self.session.get(chapter_url, timeout=self.config['timeout'])
+                response.raise_for_status()
+                current_url = response.url
+                images = self.extract_images_from_html(response.text, current_url)
+            except requests.RequestException:
+                images = []
+            if len(images) < 2:
+                images = []
+                current_url = chapter_url
+            else:
+                print(f"[ZonaTMO] {len(images)} imágenes obtenidas por HTTP")
+            self.fetch_strategy.record('zonatmo', 'capitulo', 'http', bool(images), self.session_bridge)
+        
+        if not images and 'selenium' in methods:
+            if not SELENIUM_AVAILABLE:
+                return ([], 0, 0, [{'url': chapter_url, 'error': "Selenium no está disponible", 'index': -1}], 0)
             
+            driver = None
             try:
-                print(f"[ZonaTMO] Esperando a que la URL contenga '/viewer/' (timeout: 10s)...")
-                WebDriverWait(driver, 10).until(EC.url_contains("/viewer/"))
-                final_url = driver.current_url
-                print(f"[ZonaTMO] ✓ Redirección 302 detectada y confirmada:")
-                print(f"[ZonaTMO]   URL original: {chapter_url}")
-                print(f"[ZonaTMO]   URL final: {final_url}")
-                current_url = final_url
-            except Exception as e:
-                selenium_url = driver.current_url
-                print(f"[ZonaTMO] No se detectó URL con '/viewer/' después de 10s")
-                print(f"[ZonaTMO] URL actual en navegador: {selenium_url}")
+                print(f"[ZonaTMO] URL original del capítulo: {chapter_url}")
+                
+                harvest = self.config.get('network_image_harvest', True)
+                driver = self.reader_pool.acquire()
+                block_requests(driver, self.config, 'zonatmo', block_images=self.config.get('selenium_block_images', True) and not harvest)
+                recorder = NetworkRecorder(driver)
+                if harvest:
+                    expand_viewport(driver)
+                
+                print(f"[ZonaTMO] Accediendo a URL con Selenium: {chapter_url}")
+                driver.get(chapter_url)
+                wait = WaitEngine(driver, 'zonatmo', self.config, cancel_check=lambda: self.cancelled)
                 
-                if selenium_url != chapter_url:
-                    print(f"[ZonaTMO] ✓ URL cambió (redirección detectada):")
+                print(f"[ZonaTMO] Esperando a que la URL contenga '/viewer/' (timeout: 10s)...")
+                if wait.url_contains("/viewer/", timeout=10, stage='redireccion'):
+                    final_url = driver.current_url
+                    print(f"[ZonaTMO] ✓ Redirección 302 detectada y confirmada:")
                     print(f"[ZonaTMO]   URL original: {chapter_url}")
-                    print(f"[ZonaTMO]   URL final: {selenium_url}")
-                    current_url = selenium_url
+                    print(f"[ZonaTMO]   URL final: {final_url}")
+                    current_url = final_url
+                elif self.cancelled:
+                    return ([], 0, 0, [], 0)
                 else:
-                    print(f"[ZonaTMO] URL no cambió, usando URL original")
-                    current_url = chapter_url
+                    selenium_url = driver.current_url
+                    print(f"[ZonaTMO] No se detectó URL con '/viewer/' después de 10s")
+                    print(f"[ZonaTMO] URL actual en navegador: {selenium_url}")
                     
-                    try:
-                        print(f"[ZonaTMO] Intentando obtener header Location con requests...")
-                        response_no_redirect = self.session.get(chapter_url, allow_redirects=False, timeout=self.config['timeout'])
+                    if selenium_url != chapter_url:
+                        print(f"[ZonaTMO] ✓ URL cambió (redirección detectada):")
+                        print(f"[ZonaTMO]   URL original: {chapter_url}")
+                        print(f"[ZonaTMO]   URL final: {selenium_url}")
+                        current_url = selenium_url
+                    else:
+                        print(f"[ZonaTMO] URL no cambió, usando URL original")
+                        current_url = chapter_url
                         
-                        if response_no_redirect.status_code in [301, 302, 303, 307, 308]:
-                            location = response_no_redirect.headers.get('Location', '')
-                            if location:
-                                if location.startswith('/'):
-                                    current_url = urljoin(chapter_url, location)
-                                elif location.startswith('http'):
-                                    current_url = location
-                                else:
-                                    current_url = urljoin(chapter_url, '/' + location.lstrip('/'))
-                                print(f"[ZonaTMO] ✓ Redirección 302 detectada en header Location: {current_url}")
-                                driver.get(current_url)
-                                if not self._sleep_with_cancel(2):
-                                    if driver:
-                                        driver.quit()
-                                    return ([], 0, 0, [], 0)
-                    except Exception as req_e:
-                        print(f"[ZonaTMO] Error al intentar obtener Location header: {req_e}")
-            
-            page_title = driver.title
-            print(f"[ZonaTMO] Título de la página: {page_title}")
-            print(f"[ZonaTMO] URL final después de redirección: {driver.current_url}")
-            
-            if not self._sleep_with_cancel(2):
-                if driver:
-                    driver.quit()
-                return ([], 0, 0, [], 0)
-            
-            try:
-                WebDriverWait(driver, 15).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "img"))
-                )
-                print(f"[ZonaTMO] Imágenes encontradas en la página")
-            except Exception as e:
-                print(f"[ZonaTMO] Advertencia: No se encontraron imágenes inmediatamente: {e}")
-            
-            if not self._sleep_with_cancel(self.config.get('selenium_extra_wait', 5)):
-                if driver:
-                    driver.quit()
-                return ([], 0, 0, [], 0)
-            
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            scroll_attempts = 0
-            max_scrolls = 10
-            
-            while scroll_attempts < max_scrolls:
-                if self.cancelled:
-                    if driver:
-                        driver.quit()
-                    return ([], 0, 0, [], 0)
+                        try:
+                            print(f"[ZonaTMO] Intentando obtener header Location con requests...")
+                            response_no_redirect = self.session.get(chapter_url, allow_redirects=False, timeout=self.config['timeout'])
+                            
+                            if response_no_redirect.status_code in [301, 302, 303, 307, 308]:
+                                location = response_no_redirect.headers.get('Location', '')
+                                if location:
+                                    if location.startswith('/'):
+                                        current_url = urljoin(chapter_url, location)
+                                    elif location.startswith('http'):
+                                        current_url = location
+                                    else:
+                                        current_url = urljoin(chapter_url, '/' + location.lstrip('/'))
+                                    print(f"[ZonaTMO] ✓ Redirección 302 detectada en header Location: {current_url}")
+                                    driver.get(current_url)
+                                    wait.document_ready()
+                        except Exception as req_e:
+                            print(f"[ZonaTMO] Error al intentar obtener Location header: {req_e}")
                 
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                page_title = driver.title
+                print(f"[ZonaTMO] Título de la página: {page_title}")
+                print(f"[ZonaTMO] URL final después de redirección: {driver.current_url}")
                 
-                if not self._sleep_with_cancel(2):
-                    if driver:
-                        driver.quit()
+                if wait.selector_present("img", timeout=15, stage='imagenes'):
+                    print(f"[ZonaTMO] Imágenes encontradas en la página")
+                else:
+                    print(f"[ZonaTMO] Advertencia: No se encontraron imágenes inmediatamente")
+                
+                if harvest:
+                    images = self.harvest_images(driver, recorder, wait)
+                    if images:
+                        print(f"[ZonaTMO] {len(images)} imágenes obtenidas del registro de red")
+                
+                if not images:
+                    wait.count_stable("img", timeout=self.config.get('selenium_extra_wait', 5))
+                    if not wait.scroll_to_end():
+                        return ([], 0, 0, [], 0)
+                    
+                    driver.execute_script("window.scrollTo(0, 0);")
+                    wait.network_idle(timeout=1)
+                if self.cancelled:
                     return ([], 0, 0, [], 0)
                 
-                new_height = driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
-                scroll_attempts += 1
-            
-            driver.execute_script("window.scrollTo(0, 0);")
-            if not self._sleep_with_cancel(1):
-                if driver:
-                    driver.quit()
-                return ([], 0, 0, [], 0)
-            
-            html_content = driver.page_source
-            
-            js_images = driver.execute_script("""
-                var images = [];
-                var readerArea = document.querySelector('.reading-content, .reader-area, #readerarea, .chapter-content, .manga-reader, .viewer-content, [class*="viewer"], [class*="reader"]');
-                if (!readerArea) {
-                    readerArea = document.body;
-                }
-                var imgs = readerArea.getElementsByTagName('img');
-                for (var i = 0; i < imgs.length; i++) {
-                    var src = imgs[i].src || imgs[i].getAttribute('data-src') || imgs[i].getAttribute('data-lazy-src') || imgs[i].getAttribute('data-original') || imgs[i].getAttribute('data-url') || imgs[i].getAttribute('data-srcset');
-                    if (src && src.trim() && !src.includes('logo') && !src.includes('avatar') && !src.includes('icon') && !src.includes('banner')) {
-                        if (src.startsWith('//')) {
-                            src = 'https:' + src;
-                        }
-                        if (!src.startsWith('http')) {
-                            src = window.location.origin + src;
+                html_content = driver.page_source
+                
+                if not images:
+                    js_images = driver.execute_script("""
+                        var images = [];
+                        var readerArea = document.querySelector('.reading-content, .reader-area, #readerarea, .chapter-content, .manga-reader, .viewer-content, [class*="viewer"], [class*="reader"]');
+                        if (!readerArea) {
+                            readerArea = document.body;
                         }
-                        if (images.indexOf(src) === -1 && (src.includes('jpg') || src.includes('jpeg') || src.includes('png') || src.includes('webp') || src.includes('image'))) {
-                            images.push(src);
+                        var imgs = readerArea.getElementsByTagName('img');
+                        for (var i = 0; i < imgs.length; i++) {
+                            var src = imgs[i].src || imgs[i].getAttribute('data-src') || imgs[i].getAttribute('data-lazy-src') || imgs[i].getAttribute('data-original') || imgs[i].getAttribute('data-url') || imgs[i].getAttribute('data-srcset');
+                            if (src && src.trim() && !src.includes('logo') && !src.includes('avatar') && !src.includes('icon') && !src.includes('banner')) {
+                                if (src.startsWith('//')) {
+                                    src = 'https:' + src;
+                                }
+                                if (!src.startsWith('http')) {
+                                    src = window.location.origin + src;
+                                }
+                                if (images.indexOf(src) === -1 && (src.includes('jpg') || src.includes('jpeg') || src.includes('png') || src.includes('webp') || src.includes('image'))) {
+                                    images.push(src);
+                                }
+                            }
                         }
-                    }
-                }
-                return images;
-            """)
-            
-            if js_images:
-                for img_url in js_images:
-                    if img_url and img_url not in images:
-                        images.append(img_url)
-            
-            if not images:
-                soup = BeautifulSoup(html_content, 'lxml')
-                reader_area = soup.find('div', class_=['reading-content', 'reader-area']) or soup.find('div', id='readerarea') or soup.find('div', class_='chapter-content') or soup.find('div', class_='viewer-content') or soup.find('div', class_=lambda x: x and ('viewer' in (' '.join(x) if isinstance(x, list) else str(x))) if x else False)
+                        return images;
+                    """)
                 
-                if reader_area:
-                    img_tags = reader_area.find_all('img')
-                else:
-                    img_tags = soup.find_all('img')
+                    if js_images:
+                        for img_url in js_images:
+                            if img_url and img_url not in images:
+                                images.append(img_url)
                 
-                for img_tag in img_tags:
-                    img_url = img_tag.get('src', '') or img_tag.get('data-src', '') or img_tag.get('data-lazy-src', '') or img_tag.get('data-original', '') or img_tag.get('data-url', '') or img_tag.get('data-srcset', '')
-                    if img_url and 'logo' not in img_url.lower() and 'avatar' not in img_url.lower() and 'icon' not in img_url.lower() and 'banner' not in img_url.lower():
-                        if not img_url.startswith('http'):
-                            if img_url.startswith('//'):
-                                img_url = 'https:' + img_url
-                            else:
-                                img_url = urljoin(current_url, img_url)
-                        if img_url not in images and ('.jpg' in img_url.lower() or '.jpeg' in img_url.lower() or '.png' in img_url.lower() or '.webp' in img_url.lower() or '/image' in img_url.lower()):
+                if not images:
+                    for img_url in recorder.image_urls():
+                        lower_url = img_url.lower()
+                        if not any(word in lower_url for word in ('logo', 'avatar', 'icon', 'banner')) and img_url not in images:
                             images.append(img_url)
-        
-        except Exception as e:
-            import traceback
-            print(f"[ZonaTMO ERROR] Error al descargar imágenes del capítulo: {e}")
-            print(f"[ZonaTMO ERROR] Traceback: {traceback.format_exc()}")
-            return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al obtener HTML: {str(e)}", 'index': -1}], 0)
-        finally:
-            if driver:
-                driver.quit()
+                    if images:
+                        print(f"[ZonaTMO] {len(images)} imágenes obtenidas del registro de red")
+                
+                if not images:
+                    images = self.extract_images_from_html(html_content, current_url)
+                
+                if images:
+                    self.session_bridge.import_driver(driver)
+            
+            except Exception as e:
+                import traceback
+                print(f"[ZonaTMO ERROR] Error al descargar imágenes del capítulo: {e}")
+                print(f"[ZonaTMO ERROR] Traceback: {traceback.format_exc()}")
+                return ([], 0, 0, [{'url': chapter_url, 'error': f"Error al obtener HTML: {str(e)}", 'index': -1}], 0)
+            finally:
+                self.reader_pool.release(driver)
+            self.fetch_strategy.record('zonatmo', 'capitulo', 'selenium', bool(images), self.session_bridge)
         
         if not images:
             print(f"[ZonaTMO] No se encontraron imágenes en: {chapter_url}")
@@ -1164,93 +1160,9 @@ class ZonaTMODownloader:
             chapter_dir = output_dir
         else:
             chapter_dir = os.path.join(output_dir, safe_chapter_name)
-            os.makedirs(chapter_dir, exist_ok=True)
-        
-        output_dir_abs = os.path.abspath(chapter_dir)
-        
-        downloaded_files = []
-        failed_downloads = []
-        
-        def prepare_download(img_url, index):
-            if self.cancelled:
-                return None
-            
-            url_ext = os.path.splitext(urlparse(img_url).path)[1].lower() or '.jpg'
-            if url_ext not in ['.jpg', '.jpeg', '.png', '.webp', '.gif']:
-                url_ext = '.jpg'
-            
-            original_filename = f"img_{index:04d}{url_ext}"
-            if url_ext == '.webp':
-                original_filename = f"img_{index:04d}-webp{url_ext}"
-            
-            filepath = os.path.join(output_dir_abs, original_filename)
-            
-            if os.path.exists(filepath) and not self.config.get('force_redownload', False):
-                if url_ext == '.webp':
-                    jpg_path = filepath.replace('-webp.webp', '.jpg').replace('.webp', '.jpg')
-                    if os.path.exists(jpg_path):
-                        return None
-            
-            return (img_url, filepath, index)
-        
-        download_tasks = []
-        for idx, img_url in enumerate(images, start=1):
-            if self.cancelled:
-                break
-            task = prepare_download(img_url, idx)
-            if task:
-                download_tasks.append(task)
-        
-        if not download_tasks:
-            existing_files = [f for f in os.listdir(output_dir_abs) if os.path.isfile(os.path.join(output_dir_abs, f)) and f.lower().endswith(('.jpg', '.jpeg', '.png', '.webp'))]
-            if existing_files:
-                return (existing_files, len(existing_files), sum(os.path.getsize(os.path.join(output_dir_abs, f)) for f in existing_files), [], len(existing_files))
-            return ([], 0, 0, [], 0)
-        
-        with ThreadPoolExecutor(max_workers=self.config.get('parallel_images', 8)) as executor:
-            futures = {executor.submit(self.download_image_with_semaphore, img_url, filepath, idx, len(download_tasks), referer_url=current_url): (img_url, filepath, idx) for img_url, filepath, idx in download_tasks}
-            
-            for future in as_completed(futures):
-                if self.cancelled:
-                    break
-                
-                img_url, filepath, idx = futures[future]
-                try:
-                    result_index, success, file_size, returned_filepath = future.result()
-                    if success and returned_filepath:
-                        downloaded_files.append(returned_filepath)
-                    else:
-                        failed_downloads.append({'url': img_url, 'error': 'Falló la descarga', 'index': idx})
-                except Exception as e:
-                    failed_downloads.append({'url': img_url, 'error': str(e), 'index': idx})
-        
-        downloaded_files.sort()
-        
-        for idx, old_path in enumerate(downloaded_files, start=1):
-            if self.cancelled:
-                break
-            
-            ext = os.path.splitext(old_path)[1].lower()
-            if ext == '.webp':
-                ext = '.jpg'
-            
-            new_name = f"{idx:03d}{ext}"
-            new_path = os.path.join(output_dir_abs, new_name)
-            
-            if old_path != new_path:
-                try:
-                    if os.path.exists(new_path):
-                        os.remove(new_path)
-                    os.rename(old_path, new_path)
-                except Exception as e:
-                    pass
-        
-        final_files = [f for f in os.listdir(output_dir_abs) if os.path.isfile(os.path.join(output_dir_abs, f)) and f.lower().endswith(('.jpg', '.jpeg', '.png'))]
-        final_files.sort()
         
-        total_size = sum(os.path.getsize(os.path.join(output_dir_abs, f)) for f in final_files)
-        
-        return (final_files, len(final_files), total_size, failed_downloads, len(images))
+        plan = chapter_plan(chapter_name, os.path.abspath(chapter_dir), images, referer=current_url, convert_webp=True, source_url=chapter_url)
+        return self.engine.download_chapter(self.session, plan, cancel_check=lambda: self.cancelled, desc=f"  {safe_chapter_name}")
 
     def sort_chapters_by_number(self, chapters):
         return sorted(chapters, key=lambda x: float(self.extract_chapter_numbers(x.get('name', x.get('url', '0')))))
@@ -1290,12 +1202,6 @@ class ZonaTMODownloader:
             volume_dir = os.path.join(manga_dir, safe_name)
             os.makedirs(volume_dir, exist_ok=True)
         
-        all_images = []
-        chapter_stats = []
-        failed_chapters = []
-        
-        parallel_chapters = self.config.get('parallel_chapters', 1)
-        
         def download_single_chapter(chapter, idx, total):
             if self.cancelled:
                 return ({'name': chapter['name'], 'total_found': 0, 'total_downloaded': 0, 'failed': 0, 'skipped': 0}, [])
@@ -1311,63 +1217,24 @@ class ZonaTMODownloader:
                 
                 result = self.download_chapter_images(chapter['url'], chapter['name'], chapter_dir)
                 
-                if len(result) == 5:
-                    images, total_found, total_downloaded, failed, skipped = result
-                else:
-                    images, total_found, total_downloaded, failed = result
-                    skipped = 0
-                
-                stat = {
-                    'name': chapter['name'],
-                    'total_found': total_found,
-                    'total_downloaded': total_downloaded,
-                    'failed': len(failed),
-                    'skipped': skipped
-                }
-                
-                return (stat, images)
+                return (chapter_stat(chapter['name'], result), result[0])
             except Exception as e:
                 return ({'name': chapter.get('name', 'Desconocido'), 'total_found': 0, 'total_downloaded': 0, 'failed': 1, 'skipped': 0}, [])
         
-        if parallel_chapters > 1 and len(chapters) > 1:
-            with ThreadPoolExecutor(max_workers=parallel_chapters) as executor:
-                futures = {executor.submit(download_single_chapter, chapter, idx, len(chapters)): (idx, chapter) for idx, chapter in enumerate(chapters, start=1)}
-                
-                for future in as_completed(futures):
-                    if self.cancelled:
-                        break
-                    
-                    idx, chapter = futures[future]
-                    try:
-                        stat, images = future.result()
-                        chapter_stats.append(stat)
-                        all_images.extend(images)
-                    except Exception as e:
-                        chapter_stats.append({'name': chapter.get('name', 'Desconocido'), 'total_found': 0, 'total_downloaded': 0, 'failed': 1, 'skipped': 0})
-        else:
-            for idx, chapter in enumerate(chapters, start=1):
-                if self.cancelled:
-                    break
-                stat, images = download_single_chapter(chapter, idx, len(chapters))
-                chapter_stats.append(stat)
-                all_images.extend(images)
-        
-        for stat in chapter_stats:
-            total_found = stat.get('total_found', 0)
-            total_downloaded = stat.get('total_downloaded', 0)
-            
-            if total_downloaded < total_found:
-                failed_chapter_data = {
-                    'chapter_name': stat['name'],
-                    'downloaded': total_downloaded,
-                    'total': total_found
-                }
-                if is_tomo_structure:
-                    tomo_number_match = re.search(r'Tomo\s+(\d+)', volume_name)
-                    if tomo_number_match:
-                        failed_chapter_data['tomo_number'] = int(tomo_number_match.group(1))
-                failed_chapters.append(failed_chapter_data)
+        results = self.engine.run_chapters(chapters, download_single_chapter, cancel_check=lambda: self.cancelled)
+        chapter_stats = [stat for stat, images in results]
         
+        tomo_number = None
+        if is_tomo_structure:
+            tomo_number_match = re.search(r'Tomo\s+(\d+)', volume_name)
+            if tomo_number_match:
+                tomo_number = int(tomo_number_match.group(1))
+        failed_chapters = collect_failed_chapters(chapter_stats, tomo_number)
+        
+        print(f"[ZonaTMO] {format_pool_stats(self.session)}")
+        wait_stats = format_wait_stats('zonatmo')
+        if wait_stats:
+            print(f"[ZonaTMO] {wait_stats}")
         return {
             'dir': volume_dir,
             'failed_chapters': failed_chapters
@@ -1386,7 +1253,7 @@ def main():
     downloader = ZonaTMODownloader(url, config)
     
     print("Obteniendo información de la serie...")
-    html_content = downloader.get_page_selenium(url)
+    html_content = downloader.get_listing_page(url)
     
     if not html_content:
         print("Error al obtener el contenido de la página")